@@ -8,6 +8,7 @@ application flow.
 
 from user import User
 from course import Course
+from catalog import write_course_table
 
 
 class Admin(User):
@@ -16,24 +17,28 @@ class Admin(User):
     # OOP - Abstraction:
     # Admin provides higher-level operations (create_course, delete_course,
     # view_all_courses) that encapsulate the underlying Course operations.
+    __slots__ = ()
+
     def __init__(self, username, password, admin_id):
         super().__init__(username, password, admin_id)
 
     def create_course(self, course_id, course_name, instructor, schedule, max_students):
         return Course(course_id, course_name, instructor, schedule, max_students)
 
-    def delete_course(self, courses, course_id):
-        for course in courses:
-            if course.get_course_id() == course_id:
-                if not course.get_enrolled_students():
-                    courses.remove(course)
-                    return True
-                else:
-                    print("Cannot delete course with enrolled students.")
-                    return False
+    def delete_course(self, system, course_id, force=False):
+        # With `force` a course with enrolled students is deleted too; the
+        # system drops them, clears the waitlist and updates its indexes.
+        course = system.find_course_by_id(course_id)
+        if course is None:
+            print("Course not found.")
+            return False
+
+        if course.get_enrolled_students() and not force:
+            print("Cannot delete course with enrolled students.")
+            return False
 
-        print("Course not found.")
-        return False
+        system.remove_course(course)
+        return True
 
     def view_all_courses(self, courses):
         if not courses:
@@ -41,18 +46,6 @@ class Admin(User):
             return
 
         print("\nAll Available Courses:")
-        print("------------------------------------------------------------------")
-        print(f"{'Course ID':<15} {'Course Name':<20} {'Instructor':<15} "
-              f"{'Schedule':<15} {'Capacity':<10} {'Enrolled':<10}")
-        print("------------------------------------------------------------------")
-
-        for course in courses:
-            print(f"{course.get_course_id():<15} "
-                  f"{course.get_course_name():<20} "
-                  f"{course.get_instructor():<15} "
-                  f"{course.get_schedule():<15} "
-                  f"{course.get_max_students():<10} "
-                  f"{len(course.get_enrolled_students()):<10}")
-
-        print("------------------------------------------------------------------")
+        # Rows are written in buffered chunks rather than one print each.
+        write_course_table(courses, show_enrolled=True)
         print(f"Total courses: {len(courses)}")
\ No newline at end of file
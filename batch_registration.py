@@ -0,0 +1,148 @@
+"""
+batch_registration.py
+Bulk registration for registration day: advisor-prepared schedules,
+block enrollments and cohort transfers arrive as many
+(student_id, course_id) requests at once instead of one menu action at a
+time.
+
+`register_batch` resolves every id once, groups the requests by course,
+and rejects everything aimed at a course that has no seats left before
+looking at a single student. The remaining requests are then applied in
+a deterministic priority order (lower `priority` first, ties in input
+order). Capacity comes from a per-course seat counter, conflicts from
+each student's interval index, and prerequisites, credit limits and the
+other course rules from the precompiled checks in rules.py. The result
+is one `BatchResult` per request, returned in input order; nothing is
+printed. All applied enrollments are recorded to storage in a single
+write.
+
+A course with a waitlist only gives its free seats to the students at
+the front of it; other requests for it are refused as full, as they
+would be at the menu.
+
+    python batch_registration.py requests.csv [--data data.json] [--out results.csv]
+
+The CSV needs `student_id` and `course_id` columns and may have a
+`priority` column.
+"""
+
+import argparse
+import csv
+from collections import namedtuple
+
+from student import Student, COURSE_FULL, TIME_CONFLICT, ALREADY_REGISTERED
+from registration_service import OK, UNKNOWN_STUDENT, UNKNOWN_COURSE
+from rules import check_rules
+
+BatchRequest = namedtuple("BatchRequest", "student_id course_id priority", defaults=(0,))
+BatchResult = namedtuple("BatchResult", "index student_id course_id status")
+
+
+def read_batch_csv(path):
+    # Stream BatchRequest rows from a CSV file.
+    with open(path, newline="") as file:
+        for row in csv.DictReader(file):
+            priority = row.get("priority") or 0
+            yield BatchRequest(row["student_id"].strip(), row["course_id"].strip(), int(priority))
+
+
+def write_results_csv(path, results):
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(BatchResult._fields)
+        writer.writerows(results)
+
+
+def register_batch(system, requests):
+    requests = [r if isinstance(r, BatchRequest) else BatchRequest(*r) for r in requests]
+    statuses = [None] * len(requests)
+    resolved = [None] * len(requests)
+
+    # Resolve every distinct id once.
+    students = {}
+    courses = {}
+    by_course = {}
+    for i, (student_id, course_id, _) in enumerate(requests):
+        student = students.get(student_id, False)
+        if student is False:
+            student = system.index.find_user_by_id(student_id)
+            student = students[student_id] = student if isinstance(student, Student) else None
+        course = courses.get(course_id, False)
+        if course is False:
+            course = courses[course_id] = system.find_course_by_id(course_id)
+        if student is None:
+            statuses[i] = UNKNOWN_STUDENT
+        elif course is None:
+            statuses[i] = UNKNOWN_COURSE
+        else:
+            resolved[i] = (student, course)
+            by_course.setdefault(course, []).append(i)
+
+    # Seats left per course; whole groups aimed at full courses are refused
+    # without touching any student.
+    seats = {}
+    pending = []
+    for course, indexes in by_course.items():
+        remaining = course.get_max_students() - len(course.get_enrolled_students())
+        if remaining <= 0:
+            for i in indexes:
+                statuses[i] = COURSE_FULL
+        else:
+            seats[course] = remaining
+            pending.extend(indexes)
+
+    pending.sort(key=lambda i: (requests[i].priority, i))
+    applied = []
+    for i in pending:
+        student, course = resolved[i]
+        # A freed seat belongs to the first student on the waitlist, as in
+        # Student.check_registration.
+        if seats[course] <= 0 or course.has_waitlist_ahead_of(student):
+            statuses[i] = COURSE_FULL
+        elif course in student.registered_courses:
+            statuses[i] = ALREADY_REGISTERED
+        elif student.has_time_conflict(course):
+            statuses[i] = TIME_CONFLICT
+        else:
+            reason = check_rules(student, course)
+            if reason is not None:
+                statuses[i] = reason
+                continue
+            student.enroll(course)
+            seats[course] -= 1
+            statuses[i] = OK
+            applied.append(("register", student.get_user_id(), course.get_course_id()))
+
+    if applied:
+        system.storage.record_many(applied)
+        if system.storage.needs_checkpoint():
+            system.storage.checkpoint(system)
+
+    return [BatchResult(i, r.student_id, r.course_id, statuses[i]) for i, r in enumerate(requests)]
+
+
+def main():
+    from registration_system import RegistrationSystem
+    from storage import open_storage
+
+    parser = argparse.ArgumentParser(description="Apply a CSV of registration requests.")
+    parser.add_argument("requests", help="CSV with student_id, course_id[, priority] columns")
+    parser.add_argument("--data", default=RegistrationSystem.DATA_FILE)
+    parser.add_argument("--out", help="write per-request results to this CSV")
+    args = parser.parse_args()
+
+    system = RegistrationSystem(storage=open_storage(args.data))
+    results = register_batch(system, read_batch_csv(args.requests))
+    system.storage.checkpoint(system)
+    system.storage.close()
+
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    print(f"{len(results)} requests: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+    if args.out:
+        write_results_csv(args.out, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+benchmarks
+Standalone performance scripts for the registration system. Run them
+from the project root so the application modules are importable, e.g.
+
+    python -m benchmarks.bench_lookup
+"""
@@ -0,0 +1,63 @@
+"""
+benchmarks/bench_batch.py
+Times `RegistrationSystem.register_batch` on a registration-day sized
+import: a 500k-row CSV of requests against 60k students and 8k sections,
+with popularity skew so some sections fill up and many requests collide.
+
+    python -m benchmarks.bench_batch [rows]
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+from batch_registration import read_batch_csv
+from benchmarks.common import empty_system
+from course import Course
+from student import Student
+
+STUDENTS = 60_000
+SECTIONS = 8_000
+PATTERNS = ["MWF", "TTH", "MW", "TH", "F"]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    rng = random.Random(11)
+    system = empty_system()
+    system.storage.COMPACT_EVERY = 10 ** 9
+    for i in range(SECTIONS):
+        hour = 8 + i % 10
+        system.add_course(Course(f"SEC{i:05}", f"Section {i}", f"Prof {i % 900}",
+                                 f"{PATTERNS[i % len(PATTERNS)]} {hour}-{hour + 1}", rng.choice([30, 60, 120, 300])))
+    for i in range(STUDENTS):
+        system.add_student(Student(f"user{i}", "password", f"S{i:06}"))
+
+    path = os.path.join(tempfile.mkdtemp(prefix="unireg-bench-"), "requests.csv")
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["student_id", "course_id", "priority"])
+        for _ in range(rows):
+            # Popularity skew: 30% of requests go to the first 200 sections.
+            section = rng.randrange(200) if rng.random() < 0.3 else rng.randrange(SECTIONS)
+            writer.writerow([f"S{rng.randrange(STUDENTS):06}", f"SEC{section:05}", rng.randrange(4)])
+
+    start = time.perf_counter()
+    results = system.register_batch(read_batch_csv(path))
+    elapsed = time.perf_counter() - start
+    system.storage.close()
+
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    print(f"{rows} requests in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s): "
+          + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+    over = [c for c in system.courses if len(c.get_enrolled_students()) > c.get_max_students()]
+    print("sections over capacity:", len(over))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+benchmarks/bench_catalog.py
+Catalog display and query benchmark on 20k sections. Compares:
+
+- rendering the whole catalog with one `print` per row (the old
+  `view_all_courses`) against the buffered `write_course_table`, both
+  writing to the null device;
+- the cost of one 20-row page from `query_courses`, at the start of the
+  catalog, deep into it (by following cursors), and with filters.
+
+    python -m benchmarks.bench_catalog
+"""
+
+import contextlib
+import os
+import random
+import time
+
+from catalog import query_courses, write_course_table
+from course import Course
+
+SECTIONS = 20_000
+DEPARTMENTS = ["CS", "MATH", "ENG", "HIST", "BIO", "CHEM", "PHYS", "ECON", "PSY", "ART"]
+PATTERNS = ["MWF", "TTH", "MW", "M", "T", "W", "TH", "F"]
+
+
+def make_courses():
+    rng = random.Random(5)
+    courses = []
+    for i in range(SECTIONS):
+        department = DEPARTMENTS[i % len(DEPARTMENTS)]
+        course = Course(f"{department}{100 + i // len(DEPARTMENTS):05}", f"Course {i}", f"Prof {i % 700}",
+                        f"{PATTERNS[i % len(PATTERNS)]} {8 + i % 9}-{9 + i % 9}", 40)
+        for _ in range(rng.randrange(41)):
+            course.add_student(object())
+        courses.append(course)
+    return courses
+
+
+def print_per_row(courses):
+    # The old view_all_courses loop.
+    print("------------------------------------------------------------------")
+    print(f"{'ID':<10} {'Name':<20} {'Instructor':<15} {'Schedule':<15} {'Capacity':<10}")
+    print("------------------------------------------------------------------")
+    for c in courses:
+        print(f"{c.get_course_id():<10} {c.get_course_name():<20} {c.get_instructor():<15} "
+              f"{c.get_schedule():<15} {c.get_max_students():<10}")
+
+
+def timed(func, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    courses = make_courses()
+    with open(os.devnull, "w") as sink:
+        with contextlib.redirect_stdout(sink):
+            per_row = timed(lambda: print_per_row(courses))
+        buffered = timed(lambda: write_course_table(courses, out=sink))
+    print(f"render {SECTIONS:,} rows: print per row {per_row * 1e3:.1f} ms, "
+          f"buffered {buffered * 1e3:.1f} ms")
+
+    cursor = None
+    for _ in range(100):
+        cursor = query_courses(courses, cursor=cursor).next_cursor
+    cases = [
+        ("first page", {}),
+        ("page 101 (cursor)", {"cursor": cursor}),
+        ("CS, open seats", {"department": "CS", "open_only": True}),
+        ("Thursday, by time", {"day": "TH", "sort": "time"}),
+        ("instructor, by seats", {"instructor": "prof 42", "sort": "seats"}),
+    ]
+    print(f"{'query':<22} {'ms/page':>9} {'matches':>8}")
+    for label, kwargs in cases:
+        elapsed = timed(lambda: query_courses(courses, **kwargs), repeat=20)
+        print(f"{label:<22} {elapsed * 1e3:>9.2f} {query_courses(courses, **kwargs).total:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+benchmarks/bench_conflicts.py
+Times bulk schedule-conflict checks: thousands of students, each already
+registered for several courses, are checked against every course in a
+catalog using `Student.has_time_conflict`, and compared with a naive
+pairwise comparison of the parsed intervals.
+
+    python -m benchmarks.bench_conflicts
+"""
+
+import random
+import time
+
+from course import Course
+from student import Student
+
+STUDENTS = 5_000
+COURSES = 400
+COURSES_PER_STUDENT = 6
+DAY_PATTERNS = ["MWF", "TTH", "MW", "M", "T", "W", "TH", "F"]
+
+
+def random_schedule(rng):
+    start = rng.randrange(8 * 60, 17 * 60, 30)
+    length = rng.choice([50, 75, 90, 120])
+    end = start + length
+    return f"{rng.choice(DAY_PATTERNS)} {start // 60:02}:{start % 60:02}-{end // 60:02}:{end % 60:02}"
+
+
+def naive_conflict(student, course):
+    new = course.get_time_intervals()
+    for other in student.get_registered_courses():
+        for s1, e1 in other.get_time_intervals():
+            for s2, e2 in new:
+                if s1 < e2 and s2 < e1:
+                    return True
+    return False
+
+
+def main():
+    rng = random.Random(7)
+    catalog = [Course(f"C{i:04}", f"Course {i}", "Staff", random_schedule(rng), 10_000)
+               for i in range(COURSES)]
+    students = []
+    for i in range(STUDENTS):
+        student = Student(f"user{i}", "password", f"S{i:05}")
+        for course in rng.sample(catalog, COURSES_PER_STUDENT * 3):
+            if len(student.get_registered_courses()) == COURSES_PER_STUDENT:
+                break
+            if not student.has_time_conflict(course):
+                student.enroll(course)
+        students.append(student)
+
+    checks = STUDENTS * COURSES
+    for label, check in (("IntervalIndex", Student.has_time_conflict), ("naive", naive_conflict)):
+        start = time.perf_counter()
+        conflicts = sum(check(student, course) for student in students for course in catalog)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>14}: {checks} checks in {elapsed:.2f}s "
+              f"({elapsed / checks * 1e6:.2f} us/check, {conflicts} conflicts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+benchmarks/bench_enrollment.py
+Microbenchmark of register/drop churn on large sections. Fills a section
+to capacity, then repeatedly drops a random student and registers a new
+one, comparing the list-based bookkeeping the models used to have with
+the current `OrderedSet`.
+
+    python -m benchmarks.bench_enrollment
+"""
+
+import random
+import time
+
+from course import Course
+from student import Student
+
+SECTION_SIZES = [300, 3_000, 30_000]
+CHURN = 20_000
+
+
+class ListCourse(Course):
+    # The pre-OrderedSet behaviour, kept here only for comparison.
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.enrolled_students = []
+
+    def add_student(self, student):
+        self.enrolled_students.append(student)
+
+    def remove_student(self, student):
+        if student in self.enrolled_students:
+            self.enrolled_students.remove(student)
+
+
+def churn(course_cls, size, rng):
+    course = course_cls("BIG100", "Large Lecture", "Staff", "MWF 10-11", size)
+    pool = [Student(f"user{i}", "password", f"S{i:06}") for i in range(size * 2)]
+    enrolled = pool[:size]
+    waiting = pool[size:]
+    for student in enrolled:
+        course.add_student(student)
+
+    start = time.perf_counter()
+    for _ in range(CHURN):
+        i = rng.randrange(size)
+        j = rng.randrange(size)
+        leaving, joining = enrolled[i], waiting[j]
+        if joining in course.enrolled_students:
+            continue
+        course.remove_student(leaving)
+        course.add_student(joining)
+        enrolled[i], waiting[j] = joining, leaving
+    elapsed = time.perf_counter() - start
+    assert len(course.get_enrolled_students()) == size
+    return elapsed / CHURN
+
+
+def main():
+    print(f"{'seats':>8} {'list (us/op)':>14} {'OrderedSet (us/op)':>20}")
+    for size in SECTION_SIZES:
+        as_list = churn(ListCourse, size, random.Random(1))
+        as_set = churn(Course, size, random.Random(1))
+        print(f"{size:>8} {as_list * 1e6:>14.2f} {as_set * 1e6:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
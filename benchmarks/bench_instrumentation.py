@@ -0,0 +1,63 @@
+"""
+benchmarks/bench_instrumentation.py
+Cost of the instrumentation wrappers. Times `Student.has_time_conflict`
+and `Student.register_course`/`drop_course` as plain methods, then with
+instrumentation installed, then again after `uninstall`, and prints the
+resulting histogram for `has_time_conflict`.
+
+    python -m benchmarks.bench_instrumentation
+"""
+
+import contextlib
+import json
+import os
+import time
+
+import instrumentation
+from course import Course
+from student import Student
+
+CALLS = 200_000
+
+
+def make_fixture():
+    student = Student("bench", "x", "S1")
+    courses = [Course(f"C{i}", f"Course {i}", "Prof", f"{day} {8 + i // 5}-{9 + i // 5}", 1_000_000)
+               for i, day in enumerate(["M", "T", "W", "TH", "F"] * 2)]
+    for course in courses[:8]:
+        student.enroll(course)
+    return student, courses[9], courses[8]
+
+
+def run(student, probe, course):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        student.has_time_conflict(probe)
+    conflict = (time.perf_counter() - start) / CALLS
+    start = time.perf_counter()
+    for _ in range(CALLS // 10):
+        student.register_course(course)
+        student.drop_course(course)
+    register = (time.perf_counter() - start) / (CALLS // 10 * 2)
+    return conflict, register
+
+
+def main():
+    student, probe, course = make_fixture()
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        plain = run(student, probe, course)
+        for _, class_name, method_name, count_results in instrumentation.HOT_PATHS:
+            if class_name == "Student":
+                instrumentation.instrument(Student, method_name, count_results)
+        wrapped = run(student, probe, course)
+        instrumentation.uninstall()
+        restored = run(student, probe, course)
+    print(f"{'':<12} {'has_time_conflict (ns)':>24} {'register/drop (ns)':>20}")
+    for label, (conflict, register) in (("plain", plain), ("instrumented", wrapped), ("uninstalled", restored)):
+        print(f"{label:<12} {conflict * 1e9:>24.0f} {register * 1e9:>20.0f}")
+    timer = instrumentation.metrics.to_dict()["timers"]["Student.has_time_conflict"]
+    print(json.dumps({key: value for key, value in timer.items() if key != "buckets_ns"}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+benchmarks/bench_integrity.py
+Cascading deletes and the integrity check on a generated dataset
+(100k students by default, see datagen.py). Reports:
+
+- the load time, and the time `check_integrity` adds to it;
+- deleting students: the cascade through each student's own
+  enrollments, against finding them by scanning every course;
+- force-deleting the most popular sections, whose cost grows with their
+  own enrollment only.
+
+    python -m benchmarks.bench_integrity [students]
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks import datagen
+from benchmarks.common import empty_system
+from integrity import check_integrity
+
+DELETES = 1_000
+
+
+def scan_for_enrollments(system, student):
+    # What a delete would have to do without the student -> courses
+    # edges: walk the whole catalog to find the student's enrollments.
+    return [course for course in system.courses if student in course.enrolled_students]
+
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    path = os.path.join(tempfile.mkdtemp(prefix="unireg-bench-"), "data.json")
+    dataset = datagen.generate(path, students=students, courses=max(100, students // 20))
+    print(f"{dataset.students:,} students, {dataset.sections:,} sections, "
+          f"{dataset.enrollments:,} enrollments, {dataset.waitlisted:,} waitlisted")
+
+    start = time.perf_counter()
+    system = empty_system(path)
+    loaded = time.perf_counter() - start
+    start = time.perf_counter()
+    problems = check_integrity(system)
+    checked = time.perf_counter() - start
+    print(f"load (including the check) {loaded:.2f}s; check_integrity {checked * 1e3:.0f} ms "
+          f"({checked / loaded:.0%} of load), {len(problems)} problems")
+
+    rng = random.Random(5)
+    victims = rng.sample(list(system.students), DELETES)
+    start = time.perf_counter()
+    for student in victims[:20]:
+        scan_for_enrollments(system, student)
+    scan = (time.perf_counter() - start) / 20
+    start = time.perf_counter()
+    for student in victims:
+        system.remove_student(student)
+    cascade = (time.perf_counter() - start) / DELETES
+    print(f"delete student: cascade {cascade * 1e6:.0f} us, catalog scan {scan * 1e6:.0f} us")
+
+    popular = [system.find_course_by_id(course_id) for course_id in dataset.popular[:20]]
+    dropped = sum(len(course.enrolled_students) for course in popular)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for course in popular:
+            system.remove_course(course)
+    elapsed = time.perf_counter() - start
+    print(f"force-delete {len(popular)} popular sections ({dropped:,} enrollments): "
+          f"{elapsed * 1e3:.1f} ms, {elapsed / max(1, dropped) * 1e6:.1f} us per enrollment")
+    print(f"after the deletes: {len(check_integrity(system))} problems")
+
+
+if __name__ == "__main__":
+    main()
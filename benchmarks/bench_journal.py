@@ -0,0 +1,34 @@
+"""
+benchmarks/bench_journal.py
+Compares the cost of persisting one change by appending to the journal
+with rewriting the whole snapshot, for growing catalog sizes.
+
+    python -m benchmarks.bench_journal
+"""
+
+from benchmarks.common import empty_system, time_per_call
+from course import Course
+from student import Student
+
+SIZES = [1_000, 10_000, 100_000]
+OPERATIONS = 2_000
+
+
+def main():
+    print(f"{'students':>9} {'journal append (us)':>20} {'full save_data (ms)':>20}")
+    for size in SIZES:
+        system = empty_system()
+        system.storage.COMPACT_EVERY = OPERATIONS * 10
+        for i in range(size // 10):
+            system.add_course(Course(f"C{i:05}", f"Course {i}", "Staff", "MWF 10-11", 30))
+        for i in range(size):
+            system.add_student(Student(f"user{i}", "password", f"S{i:06}"))
+
+        append = time_per_call(lambda: system.record("register", "S000001", "C00001"), OPERATIONS)
+        save = time_per_call(system.save_data, 3)
+        print(f"{size:>9} {append * 1e6:>20.1f} {save * 1e3:>20.1f}")
+        system.storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+benchmarks/bench_login.py
+Login throughput under a bursty sign-in workload. In each burst a group
+of students signs in several times in quick succession (page reloads,
+several tabs, a phone and a laptop), and some mistype their password
+first. The same sequence of attempts is run three times:
+
+- plaintext: the old comparison of stored plaintext passwords (checked
+  with `User.login` directly, since `authenticate` would hash them),
+- hashed: PBKDF2 hashes with the login cache disabled,
+- hashed + cache: PBKDF2 hashes with `LoginCache`.
+
+Wrong passwords are never cached, so they always pay for the full hash.
+
+    python -m benchmarks.bench_login [--users 100] [--bursts 5] [--burst-users 20] [--repeats 5]
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.common import empty_system
+from credentials import LoginCache, hash_password
+from student import Student
+
+
+def workload(args, rng):
+    # Return the list of (username, password) attempts.
+    attempts = []
+    for _ in range(args.bursts):
+        for number in rng.sample(range(args.users), args.burst_users):
+            username, password = f"user{number}", f"secret-{number}"
+            if rng.random() < 0.2:
+                attempts.append((username, "wrong-password"))
+            attempts.extend([(username, password)] * args.repeats)
+    rng.shuffle(attempts)
+    return attempts
+
+
+def run(authenticate, attempts):
+    latencies = []
+    accepted = 0
+    start = time.perf_counter()
+    for username, password in attempts:
+        began = time.perf_counter()
+        accepted += authenticate(username, password) is not None
+        latencies.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return elapsed, accepted, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--bursts", type=int, default=5)
+    parser.add_argument("--burst-users", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    attempts = workload(args, random.Random(7))
+    plaintext = empty_system()
+    hashed = empty_system()
+    for number in range(args.users):
+        username, password = f"user{number}", f"secret-{number}"
+        plaintext.add_student(Student(username, password, f"S{number:06}"))
+        hashed.add_student(Student(username, hash_password(password), f"S{number:06}"))
+
+    print(f"{len(attempts)} sign-in attempts in {args.bursts} bursts")
+    print(f"{'variant':<16} {'logins/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'accepted':>9}")
+    def compare_plaintext(username, password):
+        student = plaintext.index.find_student(username)
+        return student if student is not None and student.login(username, password) else None
+
+    for label, authenticate, cache in [("plaintext", compare_plaintext, None),
+                                       ("hashed", hashed.authenticate, LoginCache(max_size=0)),
+                                       ("hashed + cache", hashed.authenticate, LoginCache())]:
+        if cache is not None:
+            hashed.login_cache = cache
+        elapsed, accepted, p50, p99 = run(authenticate, attempts)
+        print(f"{label:<16} {len(attempts) / elapsed:>10,.0f} {p50 * 1e3:>10.3f} {p99 * 1e3:>10.3f} "
+              f"{accepted:>9}")
+
+
+if __name__ == "__main__":
+    main()
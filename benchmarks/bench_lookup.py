@@ -0,0 +1,66 @@
+"""
+benchmarks/bench_lookup.py
+Shows that course and user lookups on `RegistrationSystem` stay flat as
+the catalog grows, and compares them with the linear scans they replaced.
+
+    python -m benchmarks.bench_lookup
+"""
+
+import random
+from itertools import chain
+
+from benchmarks.common import empty_system, time_per_call
+from course import Course
+from student import Student
+
+SIZES = [1_000, 10_000, 100_000]
+LOOKUPS = 2_000
+
+
+def linear_find_course(system, course_id):
+    for course in system.courses:
+        if course.get_course_id().lower() == course_id.lower():
+            return course
+    return None
+
+
+def linear_username_taken(system, username):
+    for u in chain(system.students, system.admins):
+        if u.get_username() == username:
+            return True
+    return False
+
+
+def build(size):
+    system = empty_system()
+    for i in range(size):
+        system.add_course(Course(f"C{i:06}", f"Course {i}", "Staff", "MWF 10-11", 30))
+        system.add_student(Student(f"user{i}", "password", f"S{i:06}"))
+    return system
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'size':>8} {'find_course (us)':>18} {'scan (us)':>12} "
+          f"{'username (us)':>15} {'scan (us)':>12}")
+    for size in SIZES:
+        system = build(size)
+        ids = [f"c{rng.randrange(size):06}" for _ in range(LOOKUPS)]
+        names = [f"user{rng.randrange(size)}" for _ in range(LOOKUPS)]
+        scan_repeat = max(1, LOOKUPS * 1_000 // size)
+
+        it = iter(ids * 2)
+        indexed_course = time_per_call(lambda: system.find_course_by_id(next(it)), LOOKUPS)
+        it = iter(ids * 2)
+        scan_course = time_per_call(lambda: linear_find_course(system, next(it)), min(scan_repeat, LOOKUPS))
+        it = iter(names * 2)
+        indexed_user = time_per_call(lambda: system.is_username_taken(next(it)), LOOKUPS)
+        it = iter(names * 2)
+        scan_user = time_per_call(lambda: linear_username_taken(system, next(it)), min(scan_repeat, LOOKUPS))
+
+        print(f"{size:>8} {indexed_course * 1e6:>18.2f} {scan_course * 1e6:>12.1f} "
+              f"{indexed_user * 1e6:>15.2f} {scan_user * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+benchmarks/bench_memory.py
+Measures, with tracemalloc, the memory held by a large registry (1M
+students and 50k courses by default). It compares the models as they
+used to be with the current ones. The old models were plain classes
+with a per-instance `__dict__`. Every per-student container was
+allocated up front, and each instructor/schedule field was its own string
+object, as produced by parsing data.json. The current models are slotted,
+create rarely used containers on demand, and intern those strings.
+
+    python -m benchmarks.bench_memory [--students 1000000] [--courses 50000]
+"""
+
+import argparse
+import gc
+import tracemalloc
+from collections import deque
+
+from course import Course
+from ordered_set import OrderedSet
+from schedule import IntervalIndex, parse_schedule
+from student import Student
+from waitlist import Waitlist
+
+INSTRUCTORS = 400
+SCHEDULES = ["MWF 9-10", "MWF 10-11", "MWF 11-12", "MWF 1-2", "MWF 2-3",
+             "TTH 9-10:30", "TTH 10:30-12", "TTH 1-2:30", "TTH 2:30-4", "M 6-9pm"]
+
+
+class DictUser:
+    # The models before __slots__, kept here only for comparison.
+    def __init__(self, username, password, user_id):
+        self.username = username
+        self.password = password
+        self.user_id = user_id
+
+
+class DictStudent(DictUser):
+    # Every container allocated up front, as before.
+    def __init__(self, username, password, student_id):
+        super().__init__(username, password, student_id)
+        self.registered_courses = OrderedSet()
+        self._schedule_index = IntervalIndex()
+        self._unparsed_schedules = {}
+        self.waitlisted_courses = OrderedSet()
+
+
+class DictCourse:
+    def __init__(self, course_id, course_name, instructor, schedule, max_students):
+        self.course_id = course_id
+        self.course_name = course_name
+        self.instructor = instructor
+        self.schedule = schedule
+        self.max_students = max_students
+        self.enrolled_students = OrderedSet()
+        self.time_intervals = parse_schedule(schedule)
+        self.waitlist = Waitlist(Course.WAITLIST_SIZE)
+        # Stands in for the deque the waitlist used to allocate up front.
+        self.waitlist_queue = deque()
+
+
+def course_fields(i):
+    # Build fresh string objects per record, the way json.loads does.
+    return (f"C{i:05}", f"Section {i}", "Dr. " + f"Instructor{i % INSTRUCTORS}",
+            " ".join(SCHEDULES[i % len(SCHEDULES)].split()), 30)
+
+
+def traced(build):
+    # Return (object, bytes allocated by build()).
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--students", type=int, default=1_000_000)
+    parser.add_argument("--courses", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print(f"{'objects':<22} {'before (MB)':>12} {'after (MB)':>12} {'saved':>7}")
+    for label, before_cls, after_cls, count, fields in [
+        ("students", DictStudent, Student, args.students,
+         lambda i: (f"user{i}", "password", f"S{i:07}")),
+        ("courses", DictCourse, Course, args.courses, course_fields),
+    ]:
+        before, before_size = traced(lambda: [before_cls(*fields(i)) for i in range(count)])
+        del before
+        after, after_size = traced(lambda: [after_cls(*fields(i)) for i in range(count)])
+        print(f"{f'{count:,} {label}':<22} {before_size / 2**20:>12.1f} {after_size / 2**20:>12.1f} "
+              f"{1 - after_size / before_size:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
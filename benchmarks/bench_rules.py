@@ -0,0 +1,100 @@
+"""
+benchmarks/bench_rules.py
+Times registration rule checks: students with completed-course histories
+of growing length are checked against a catalog where every course has
+prerequisites, co-requisites, exclusions or a restriction, using the
+compiled `check_rules`, and compared with a naive check that walks the
+student's history and registered courses for every rule.
+
+    python -m benchmarks.bench_rules
+"""
+
+import random
+import time
+
+from course import Course
+from rules import (COREQUISITE_MISSING, CREDIT_LIMIT, EXCLUDED, PREREQUISITE_MISSING,
+                   RESTRICTED, AcademicRecord, CourseRules, RuleEngine, check_rules)
+from student import Student
+
+STUDENTS = 2_000
+COURSES = 400
+COURSES_PER_STUDENT = 4
+HISTORY_LENGTHS = (5, 40, 160)
+GROUPS = ["cs-major", "math-major", "honors", "year-1", "year-4"]
+
+
+def random_rules(rng, course_ids):
+    return CourseRules(prerequisites=[rng.sample(course_ids, rng.randint(1, 3))
+                                      for _ in range(rng.randint(0, 3))],
+                       corequisites=rng.sample(course_ids, rng.randint(0, 1)),
+                       exclusions=rng.sample(course_ids, rng.randint(0, 2)),
+                       restricted_to=rng.sample(GROUPS, rng.randint(0, 1)) if rng.random() < 0.2 else ())
+
+
+def naive_check(student, course):
+    # The same rules, answered by walking the history on every call.
+    record = student.record
+    if record.max_credits is not None and \
+            sum(c.credits for c in student.registered_courses) + course.credits > record.max_credits:
+        return CREDIT_LIMIT
+    rules = course.rules
+    if rules is None:
+        return None
+    if rules.restricted_to and not any(g.casefold() == r.casefold()
+                                       for g in record.groups for r in rules.restricted_to):
+        return RESTRICTED
+
+    def completed(course_id):
+        return any(c.casefold() == course_id.casefold() for c in record.completed)
+
+    def taken(course_id):
+        return completed(course_id) or any(c.course_id.casefold() == course_id.casefold()
+                                           for c in student.registered_courses)
+
+    for group in rules.prerequisites:
+        if not any(completed(c) for c in group):
+            return PREREQUISITE_MISSING
+    if not all(taken(c) for c in rules.corequisites):
+        return COREQUISITE_MISSING
+    if any(taken(c) for c in rules.exclusions):
+        return EXCLUDED
+    return None
+
+
+def main():
+    rng = random.Random(11)
+    engine = RuleEngine()
+    catalog = [Course(f"C{i:04}", f"Course {i}", "Staff", "TBA", 10_000, credits=rng.choice((3, 3, 4)))
+               for i in range(COURSES)]
+    course_ids = [course.course_id for course in catalog]
+    for course in catalog:
+        course.rules = random_rules(rng, course_ids)
+        engine.add_course(course)
+
+    for history in HISTORY_LENGTHS:
+        students = []
+        for i in range(STUDENTS):
+            student = Student(f"user{i}", "password", f"S{i:05}")
+            engine.set_record(student, AcademicRecord(rng.sample(course_ids, history),
+                                                      rng.sample(GROUPS, 2),
+                                                      rng.choice((None, 12, 15))))
+            for course in rng.sample(catalog, COURSES_PER_STUDENT):
+                student.enroll(course)
+            students.append(student)
+
+        checks = STUDENTS * COURSES
+        timings = []
+        for check in (check_rules, naive_check):
+            start = time.perf_counter()
+            outcomes = [check(student, course) for student in students for course in catalog]
+            timings.append((time.perf_counter() - start, outcomes))
+        (compiled, expected), (naive, outcomes) = timings
+        same = "same" if outcomes == expected else "DIFFERENT"
+        print(f"history {history:>4}: compiled {compiled / checks * 1e6:.2f} us/check, "
+              f"naive {naive / checks * 1e6:.2f} us/check ({checks} checks, {same} outcomes, "
+              f"{sum(o is None for o in expected)} allowed)")
+
+
+if __name__ == "__main__":
+    main()
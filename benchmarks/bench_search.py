@@ -0,0 +1,100 @@
+"""
+benchmarks/bench_search.py
+Course search benchmark on a 50k-course catalog. Builds a `SearchIndex`,
+then times typical queries: an exact id, an id prefix, a word from the
+name, a partial name with an instructor, and a deliberately broad
+one-letter prefix. It finishes with the cost of adding and removing a
+course. For comparison it also times a linear scan that lower-cases
+every course's fields. It fails (exit status 1) if any query's median
+time is over TARGET.
+
+    python -m benchmarks.bench_search [courses]
+"""
+
+import random
+import sys
+import time
+
+from course import Course
+from search_index import SearchIndex
+
+DEPARTMENTS = ["CS", "MATH", "ENG", "HIST", "BIO", "CHEM", "PHYS", "ECON", "PSY", "ART",
+               "MUS", "PHIL", "GEOG", "LING", "STAT", "MECH", "ELEC", "CIVL", "NURS", "LAW"]
+SUBJECTS = ["Introduction", "Advanced", "Topics", "Seminar", "Foundations", "Methods",
+            "Theory", "Applied", "Principles", "Studio", "Analysis", "Design", "Systems"]
+AREAS = ["Programming", "Calculus", "Composition", "Genetics", "Thermodynamics", "Economics",
+         "Statistics", "Ethics", "Algorithms", "Databases", "Networks", "Optics", "Harmony",
+         "Cognition", "Linguistics", "Mechanics", "Circuits", "Structures", "Contracts"]
+SURNAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+            "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson",
+            "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White"]
+# Median seconds a query may take (under a millisecond at 50k courses).
+TARGET = 1e-3
+
+
+def make_courses(count, rng):
+    courses = []
+    for i in range(count):
+        department = DEPARTMENTS[i % len(DEPARTMENTS)]
+        name = f"{rng.choice(SUBJECTS)} {rng.choice(AREAS)} {rng.randrange(1, 5)}"
+        instructor = f"Dr. {rng.choice(SURNAMES)}{i % 97}"
+        courses.append(Course(f"{department}{1000 + i // len(DEPARTMENTS)}", name, instructor, "MWF 10-11", 30))
+    return courses
+
+
+def linear_search(courses, query):
+    words = query.casefold().split()
+    return [c for c in courses
+            if all(w in f"{c.course_id} {c.course_name} {c.instructor}".casefold() for w in words)][:20]
+
+
+def time_query(func, query, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = func(query)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], len(results)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    rng = random.Random(11)
+    courses = make_courses(count, rng)
+
+    start = time.perf_counter()
+    index = SearchIndex(courses)
+    print(f"indexed {count:,} courses in {time.perf_counter() - start:.2f}s")
+
+    queries = [
+        ("exact id", courses[count // 2].course_id),
+        ("id prefix", "stat12"),
+        ("name word", "thermodynamics"),
+        ("name + instructor", "algo garcia1"),
+        ("two partial words", "adv circ"),
+        ("broad prefix", "d"),
+    ]
+    print(f"{'query':<20} {'text':<16} {'index (us)':>11} {'scan (us)':>11} {'results':>8}")
+    slow = []
+    for label, text in queries:
+        indexed, found = time_query(index.search, text, 200)
+        scanned, _ = time_query(lambda q: linear_search(courses, q), text, 3)
+        print(f"{label:<20} {text:<16} {indexed * 1e6:>11.1f} {scanned * 1e6:>11.1f} {found:>8}")
+        if indexed > TARGET:
+            slow.append(f"{text!r} ({indexed * 1e6:.0f} us)")
+
+    extra = make_courses(1_000, random.Random(12))
+    start = time.perf_counter()
+    for course in extra:
+        course.course_id = "X" + course.course_id
+        index.add_course(course)
+    for course in extra:
+        index.remove_course(course)
+    print(f"add + remove one course: {(time.perf_counter() - start) / len(extra) * 1e6:.1f} us")
+    if slow:
+        sys.exit(f"over the {TARGET * 1e6:.0f} us target: {', '.join(slow)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+benchmarks/bench_snapshot.py
+Catalog browsing from a published snapshot (see catalog_snapshot.py)
+against the live object graph, on a generated dataset (60k students and
+8k sections by default, see datagen.py). Reports:
+
+- publish time and file size, and the time to open the snapshot in a new
+  process against loading the data file;
+- single-process throughput of a browsing mix (first pages, cursor
+  pages, department and open-seat filters, search) on the live
+  `RegistrationSystem` and on the snapshot;
+- the same mix from 1, 2, 4, ... worker processes reading one snapshot,
+  against threads sharing the live system.
+
+    python -m benchmarks.bench_snapshot [students] [seconds]
+"""
+
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks import datagen
+from benchmarks.common import empty_system
+from catalog import query_courses
+from catalog_snapshot import CatalogSnapshot, SnapshotPublisher
+
+WORDS = ["intro", "calc", "data", "cs", "hist", "bio 10", "prof", "math 100", "lab", "theory"]
+DEPARTMENTS = ["cs", "math", "bio", "hist", "phys", "econ"]
+
+
+def browse(query, search, rng):
+    # One request of the mix; `query`/`search` take catalog keyword arguments.
+    kind = rng.randrange(5)
+    if kind == 0:
+        query(limit=50)
+    elif kind == 1:
+        page = query(limit=50)
+        query(cursor=page.next_cursor, limit=50)
+    elif kind == 2:
+        query(department=rng.choice(DEPARTMENTS), limit=50)
+    elif kind == 3:
+        query(open_only=True, sort="seats", limit=20)
+    else:
+        search(rng.choice(WORDS), 20)
+
+
+def live_operations(system):
+    return (lambda **kwargs: query_courses(system.courses, **kwargs)), system.search_index.search
+
+
+def snapshot_operations(snapshot):
+    return snapshot.query, snapshot.search
+
+
+def run_for(operations, seconds, seed):
+    query, search = operations
+    rng = random.Random(seed)
+    done = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        browse(query, search, rng)
+        done += 1
+    return done
+
+
+def _snapshot_worker(path, seconds, seed, start, results):
+    snapshot = CatalogSnapshot(path)
+    start.wait()
+    results.put(run_for(snapshot_operations(snapshot), seconds, seed))
+    snapshot.close()
+
+
+def processes(path, count, seconds):
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    results = context.Queue()
+    workers = [context.Process(target=_snapshot_worker, args=(path, seconds, seed, start, results))
+               for seed in range(count)]
+    for worker in workers:
+        worker.start()
+    start.set()
+    total = sum(results.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+    return total / seconds
+
+
+def threads(system, count, seconds):
+    counts = []
+    workers = [threading.Thread(target=lambda seed=seed: counts.append(
+        run_for(live_operations(system), seconds, seed))) for seed in range(count)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / seconds
+
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 60_000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    directory = tempfile.mkdtemp(prefix="unireg-bench-")
+    path = os.path.join(directory, "data.json")
+    dataset = datagen.generate(path, students=students, courses=max(100, students // 15))
+    print(f"{dataset.students:,} students, {dataset.sections:,} sections, {dataset.enrollments:,} enrollments")
+
+    start = time.perf_counter()
+    system = empty_system(path)
+    loaded = time.perf_counter() - start
+    snapshot_path = os.path.join(directory, "catalog.snap")
+    publisher = SnapshotPublisher(system, snapshot_path)
+    start = time.perf_counter()
+    publisher.publish()
+    published = time.perf_counter() - start
+    start = time.perf_counter()
+    snapshot = CatalogSnapshot(snapshot_path)
+    opened = time.perf_counter() - start
+    print(f"publish {published * 1e3:.0f} ms, {os.path.getsize(snapshot_path) / 1e6:.1f} MB; "
+          f"open {opened * 1e3:.2f} ms against a {loaded:.2f}s load")
+
+    live = run_for(live_operations(system), seconds, 0) / seconds
+    mapped = run_for(snapshot_operations(snapshot), seconds, 0) / seconds
+    print(f"one process: live {live:,.0f} requests/s, snapshot {mapped:,.0f} requests/s")
+    snapshot.close()
+
+    counts = [1, 2, 4]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    print(f"{'workers':>8} {'snapshot processes':>20} {'live threads':>14}")
+    for count in counts:
+        print(f"{count:>8} {processes(snapshot_path, count, seconds):>18,.0f}/s "
+              f"{threads(system, count, seconds):>12,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
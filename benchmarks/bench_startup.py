@@ -0,0 +1,84 @@
+"""
+benchmarks/bench_startup.py
+Startup-time benchmark on a synthetic data file with 100k students.
+Compares the streaming `load_data` with the previous approach of
+`json.load`-ing the whole file before building any objects, reporting
+wall time and peak traced memory for each.
+
+    python -m benchmarks.bench_startup [students]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from admin import Admin
+from benchmarks import datagen
+from benchmarks.common import empty_system
+from course import Course
+from student import Student
+
+COURSES = 2_500
+SECTIONS = 2
+COURSES_PER_STUDENT = 4
+
+
+def write_synthetic_file(path, students):
+    # Uniform popularity, so enrollments spread over the whole catalog.
+    return datagen.generate(path, students=students, courses=COURSES, sections=SECTIONS,
+                            per_student=COURSES_PER_STUDENT, skew=0, seed=3)
+
+
+def load_whole_file(path):
+    # The pre-streaming loader: parse everything, then build objects.
+    system = empty_system()
+    with open(path) as file:
+        data = json.load(file)
+    for c in data.get("courses", []):
+        system.add_course(Course(c["course_id"], c["course_name"], c["instructor"],
+                                 c["schedule"], c["max_students"]))
+    for s in data.get("students", []):
+        system.add_student(Student(s["username"], s["password"], s["user_id"]))
+    for a in data.get("admins", []):
+        system.add_admin(Admin(a["username"], a["password"], a["user_id"]))
+    for student_id, course_id in data.get("enrollments", []):
+        system.load_enrollment(student_id, course_id)
+    for student_id, course_id in data.get("waitlists", []):
+        system.load_waitlist(student_id, course_id)
+    return system
+
+
+def measure(path, loader):
+    # Time and peak memory are taken in separate runs because tracemalloc
+    # itself slows allocation-heavy code down considerably.
+    start = time.perf_counter()
+    system = loader(path)
+    elapsed = time.perf_counter() - start
+    edges = sum(len(s.get_registered_courses()) for s in system.students)
+    del system
+
+    tracemalloc.start()
+    system = loader(path)
+    _, peak = tracemalloc.get_traced_memory()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del system
+    return elapsed, peak, current, edges
+
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    path = os.path.join(tempfile.mkdtemp(prefix="unireg-bench-"), "data.json")
+    write_synthetic_file(path, students)
+    print(f"{students} students, {COURSES * SECTIONS} sections, file size {os.path.getsize(path) / 1e6:.1f} MB")
+
+    for label, loader in (("json.load + build", load_whole_file), ("streaming load_data", empty_system)):
+        elapsed, peak, final, edges = measure(path, loader)
+        print(f"{label:>20}: {elapsed:.2f}s, peak {peak / 1e6:.1f} MB, "
+              f"object graph {final / 1e6:.1f} MB, {edges} enrollments")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+benchmarks/bench_stats.py
+Enrollment dashboard benchmark on a 50k-course catalog. Measures:
+
+- what the `EnrollmentStats` listener adds to each `add_student` /
+  `remove_student`, against courses with no listener;
+- the dashboard queries (totals, seats left in a department, the ten
+  fullest sections, sections at least 90% full) from the running
+  counters, against the same answers computed by scanning every course.
+
+    python -m benchmarks.bench_stats [courses]
+"""
+
+import heapq
+import random
+import sys
+import time
+
+from course import Course
+from enrollment_stats import EnrollmentStats, department_of, fill_rate
+
+DEPARTMENTS = ["CS", "MATH", "ENG", "HIST", "BIO", "CHEM", "PHYS", "ECON", "PSY", "ART"]
+CHURN = 200_000
+
+
+def make_courses(count, rng):
+    courses = []
+    for i in range(count):
+        department = DEPARTMENTS[i % len(DEPARTMENTS)]
+        course = Course(f"{department}{1000 + i // len(DEPARTMENTS)}", f"Course {i}",
+                        f"Prof {i % 900}", "MWF 10-11", 40)
+        for _ in range(rng.randrange(41)):
+            course.add_student(object())
+        courses.append(course)
+    return courses
+
+
+def churn(courses, rng):
+    # Add then remove a student CHURN times on random courses.
+    picks = [rng.choice(courses) for _ in range(CHURN)]
+    student = object()
+    start = time.perf_counter()
+    for course in picks:
+        course.add_student(student)
+        course.remove_student(student)
+    return (time.perf_counter() - start) / (2 * CHURN)
+
+
+def scan_dashboard(courses):
+    seats = sum(c.max_students for c in courses)
+    enrolled = sum(len(c.enrolled_students) for c in courses)
+    cs_left = sum(max(0, c.max_students - len(c.enrolled_students))
+                  for c in courses if department_of(c.course_id) == "CS")
+    top = heapq.nsmallest(10, courses, key=lambda c: (-fill_rate(c), c.course_id))
+    nearly_full = [c for c in courses if fill_rate(c) >= 0.9]
+    return seats, enrolled, cs_left, top, nearly_full
+
+
+def stats_dashboard(stats):
+    _, seats, enrolled = stats.totals()
+    cs_left = stats.seats_remaining(department="CS")
+    return seats, enrolled, cs_left, stats.top_fullest(10), stats.sections_at_least(90)
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    courses = make_courses(count, random.Random(3))
+
+    plain = churn(courses, random.Random(4))
+    start = time.perf_counter()
+    stats = EnrollmentStats(courses)
+    built = time.perf_counter() - start
+    tracked = churn(courses, random.Random(4))
+    print(f"built stats for {count:,} courses in {built * 1e3:.1f} ms")
+    print(f"add/remove student: {plain * 1e9:.0f} ns without stats, {tracked * 1e9:.0f} ns with stats")
+
+    scanned = scan_dashboard(courses)
+    assert scanned[:3] == stats_dashboard(stats)[:3]
+    scan_time = timed(lambda: scan_dashboard(courses), 5)
+    stats_time = timed(lambda: stats_dashboard(stats), 20)
+    print(f"dashboard: scan {scan_time * 1e3:.1f} ms, stats {stats_time * 1e3:.2f} ms "
+          f"({len(scanned[4]):,} sections >= 90% full)")
+
+
+if __name__ == "__main__":
+    main()
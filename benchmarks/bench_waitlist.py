@@ -0,0 +1,82 @@
+"""
+benchmarks/bench_waitlist.py
+Microbenchmark of waitlist promotion on an oversubscribed section. The
+section is full and has a long waitlist. Each round one enrolled student
+drops, the seat goes to the front of the waitlist, and a random waiting
+student leaves the queue. A plain list (pop(0) plus remove) is measured
+for comparison with the deque-backed `Waitlist`.
+
+    python -m benchmarks.bench_waitlist
+"""
+
+import random
+import time
+
+from course import Course
+from student import Student
+
+WAITLIST_LENGTHS = [1_000, 10_000, 100_000]
+SEATS = 300
+ROUNDS = 5_000
+
+
+class ListWaitlist(list):
+    # A queue kept in a list, kept here only for comparison.
+    max_size = float("inf")
+
+    def add(self, student):
+        if student not in self:
+            self.append(student)
+
+    def discard(self, student):
+        if student in self:
+            self.remove(student)
+
+    def peek(self):
+        return self[0] if self else None
+
+    def is_full(self):
+        return False
+
+
+class ListCourse(Course):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.waitlist = ListWaitlist()
+
+
+def promote_rounds(course_cls, length, rng):
+    Course.WAITLIST_SIZE = length
+    course = course_cls("BIG100", "Large Lecture", "Staff", "MWF 10-11", SEATS)
+    students = [Student(f"user{i}", "password", f"S{i:06}") for i in range(SEATS + length)]
+    for student in students[:SEATS]:
+        student.enroll(course)
+    for student in students[SEATS:]:
+        student.add_to_waitlist(course)
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        enrolled = course.get_enrolled_students()
+        leaving = next(iter(enrolled))
+        leaving.unenroll(course)
+        promoted, reason = course.promote_next()
+        assert promoted is not None and reason is None
+        waiting = students[SEATS + rng.randrange(length)]
+        if course in waiting.waitlisted_courses:
+            waiting.remove_from_waitlist(course)
+        leaving.add_to_waitlist(course)
+    elapsed = time.perf_counter() - start
+    assert len(course.get_enrolled_students()) == SEATS
+    return elapsed / ROUNDS
+
+
+def main():
+    print(f"{'waiting':>8} {'list (us/round)':>16} {'Waitlist (us/round)':>20}")
+    for length in WAITLIST_LENGTHS:
+        as_list = promote_rounds(ListCourse, length, random.Random(1))
+        as_queue = promote_rounds(Course, length, random.Random(1))
+        print(f"{length:>8} {as_list * 1e6:>16.2f} {as_queue * 1e6:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
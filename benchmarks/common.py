@@ -0,0 +1,35 @@
+"""
+benchmarks/common.py
+Small helpers shared by the benchmark scripts: building an in-memory
+`RegistrationSystem` that never touches the real `data.json`, and timing
+a callable.
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from registration_system import RegistrationSystem
+
+
+def empty_system(data_file=None):
+    # Point the system at a file that does not exist (or at the given file)
+    # and silence the start-up message so benchmark output stays readable.
+    if data_file is None:
+        data_file = os.path.join(tempfile.mkdtemp(prefix="unireg-bench-"), "data.json")
+
+    class BenchmarkSystem(RegistrationSystem):
+        DATA_FILE = data_file
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return BenchmarkSystem()
+
+
+def time_per_call(func, repeat):
+    # Return the mean wall-clock seconds per call of `func()`.
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
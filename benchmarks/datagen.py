@@ -0,0 +1,189 @@
+"""
+benchmarks/datagen.py
+Synthetic university data for benchmarks, written in the `data.json`
+format so `RegistrationSystem` (and `server.py --data`) load it like any
+other data file.
+
+`generate` builds a catalog of `courses` courses across departments.
+Each course is offered as `sections` sections, with ids like
+"MATH1012-2". Every section gets its own instructor and meeting time.
+Meeting patterns follow a typical timetable mix (`SCHEDULE_PATTERNS`):
+MWF 50-minute classes, TTH 75-minute classes, MW classes and a few
+single-day evening classes. Start times cluster in the late morning.
+
+Each student tries to take `per_student` courses. Courses are picked by
+popularity, a Zipf-like weight 1 / rank ** `skew`: a skew of 0 is
+uniform, and 1 or more puts most students into a few courses. A student
+only takes a section with a free seat and no time conflict, and tries
+another section of the same course when needed. When every section is
+full, the student joins the waitlist of one of them with probability
+`waitlist_rate`. The result is therefore a state the system itself
+could have produced.
+
+All accounts (students "user<i>", the admin "admin") share the password
+"password", hashed once with few PBKDF2 iterations so loading and logging
+in measure the system rather than the hash.
+
+    python -m benchmarks.datagen out.json [--students N] [--courses N]
+        [--sections N] [--per-student N] [--skew S] [--seed N]
+"""
+
+import argparse
+import random
+from collections import namedtuple
+from itertools import accumulate
+
+from course import Course
+from credentials import hash_password
+from json_stream import write_json_sections
+from schedule import parse_schedule
+
+PASSWORD = "password"
+PASSWORD_HASH = hash_password(PASSWORD, iterations=1_000)
+
+DEPARTMENTS = ["CS", "MATH", "ENG", "HIST", "BIO", "CHEM", "PHYS", "ECON", "PSY", "ART",
+               "MUS", "PHIL", "GEOG", "LING", "STAT", "MECH", "ELEC", "CIVL", "NURS", "LAW"]
+SUBJECTS = ["Introduction to", "Advanced", "Topics in", "Seminar in", "Foundations of",
+            "Methods in", "Theory of", "Applied", "Principles of", "Studio"]
+AREAS = ["Programming", "Calculus", "Composition", "Genetics", "Thermodynamics", "Economics",
+         "Statistics", "Ethics", "Algorithms", "Databases", "Networks", "Optics", "Harmony",
+         "Cognition", "Linguistics", "Mechanics", "Circuits", "Structures", "Contracts"]
+SURNAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+            "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson",
+            "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White"]
+CAPACITIES = [15, 20, 25, 30, 40, 60, 100, 150, 300]
+
+# (days, class length in minutes, start hours (24h), weight)
+SCHEDULE_PATTERNS = [
+    ("MWF", 50, [8, 9, 10, 11, 12, 13, 14, 15], 40),
+    ("TTH", 75, [8, 9, 10, 11, 13, 14, 15, 16], 35),
+    ("MW", 75, [9, 11, 13, 15, 16], 15),
+    ("M", 150, [18], 2),
+    ("T", 150, [18], 2),
+    ("W", 150, [18], 2),
+    ("TH", 150, [18], 2),
+    ("F", 110, [9, 13], 2),
+]
+# Late-morning starts are the most common.
+START_WEIGHTS = {8: 3, 9: 6, 10: 8, 11: 8, 12: 5, 13: 6, 14: 5, 15: 4, 16: 3, 18: 1}
+
+Dataset = namedtuple("Dataset", "path students sections enrollments waitlisted popular")
+
+
+def _clock(minutes):
+    # 24h minutes -> timetable text without am/pm ("13:30" -> "1:30").
+    hour, minute = divmod(minutes, 60)
+    hour = hour - 12 if hour > 12 else hour
+    return f"{hour}:{minute:02}" if minute else str(hour)
+
+
+def random_schedule(rng):
+    days, length, starts, _ = rng.choices(SCHEDULE_PATTERNS,
+                                          weights=[p[3] for p in SCHEDULE_PATTERNS])[0]
+    start = rng.choices(starts, weights=[START_WEIGHTS[h] for h in starts])[0] * 60
+    if length == 75 and rng.random() < 0.5:
+        start += 30
+    return f"{days} {_clock(start)}-{_clock(start + length)}"
+
+
+def _overlaps(taken, intervals):
+    return any(start < other_end and other_start < end
+               for start, end in intervals for other in taken for other_start, other_end in other)
+
+
+def generate(path, students=10_000, courses=1_000, sections=2, per_student=4, skew=1.0,
+             waitlist_rate=0.3, seed=1):
+    # Write the dataset to `path`; returns a Dataset summary whose `popular`
+    # lists section ids, most popular course first.
+    rng = random.Random(seed)
+    catalog = []
+    for number in range(courses):
+        department = DEPARTMENTS[number % len(DEPARTMENTS)]
+        code = f"{department}{1000 + number // len(DEPARTMENTS)}"
+        name = f"{rng.choice(SUBJECTS)} {rng.choice(AREAS)}"
+        capacity = rng.choice(CAPACITIES)
+        offered = []
+        for section in range(1, sections + 1):
+            schedule = random_schedule(rng)
+            offered.append({"course_id": f"{code}-{section}", "course_name": name,
+                            "instructor": f"Prof {rng.choice(SURNAMES)}{rng.randrange(400)}",
+                            "schedule": schedule, "max_students": capacity,
+                            "_intervals": parse_schedule(schedule), "_seats": capacity,
+                            "_waiting": 0})
+        catalog.append(offered)
+    # Popularity is independent of the order courses were numbered in.
+    ranked = catalog[:]
+    rng.shuffle(ranked)
+    cum_weights = list(accumulate(1 / (rank + 1) ** skew for rank in range(len(ranked))))
+
+    enrollments = []
+    waitlists = []
+    wanted = min(per_student, len(ranked))
+    for number in range(students):
+        student_id = f"S{number:06}"
+        picked = {}
+        while len(picked) < wanted:
+            for rank in rng.choices(range(len(ranked)), cum_weights=cum_weights, k=wanted):
+                if len(picked) < wanted:
+                    picked[rank] = None
+        taken = []
+        for rank in picked:
+            candidates = ranked[rank][:]
+            rng.shuffle(candidates)
+            for section in candidates:
+                if section["_seats"] > 0 and not _overlaps(taken, section["_intervals"]):
+                    section["_seats"] -= 1
+                    taken.append(section["_intervals"])
+                    enrollments.append([student_id, section["course_id"]])
+                    break
+            else:
+                section = candidates[0]
+                if (section["_seats"] == 0 and section["_waiting"] < Course.WAITLIST_SIZE
+                        and rng.random() < waitlist_rate and not _overlaps(taken, section["_intervals"])):
+                    section["_waiting"] += 1
+                    waitlists.append([student_id, section["course_id"]])
+
+    public = ("course_id", "course_name", "instructor", "schedule", "max_students")
+    with open(path, "w") as file:
+        write_json_sections(file, [
+            ("courses", ({key: section[key] for key in public}
+                         for offered in catalog for section in offered)),
+            ("students", ({"username": f"user{number}", "password": PASSWORD_HASH,
+                           "user_id": f"S{number:06}"} for number in range(students))),
+            ("admins", [{"username": "admin", "password": PASSWORD_HASH, "user_id": "A001"}]),
+            ("enrollments", enrollments),
+            ("waitlists", waitlists),
+        ])
+    popular = [section["course_id"] for offered in ranked for section in offered]
+    return Dataset(path, students, courses * sections, len(enrollments), len(waitlists), popular)
+
+
+def add_arguments(parser):
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--courses", type=int, default=1_000)
+    parser.add_argument("--sections", type=int, default=2, help="sections per course")
+    parser.add_argument("--per-student", type=int, default=4, help="courses each student tries to take")
+    parser.add_argument("--skew", type=float, default=1.0, help="popularity skew (0 = uniform)")
+    parser.add_argument("--waitlist-rate", type=float, default=0.3,
+                        help="chance a student turned away from a full course joins its waitlist")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def generate_from_args(path, args):
+    return generate(path, students=args.students, courses=args.courses, sections=args.sections,
+                    per_student=args.per_student, skew=args.skew,
+                    waitlist_rate=args.waitlist_rate, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic data.json for benchmarks.")
+    parser.add_argument("path")
+    add_arguments(parser)
+    args = parser.parse_args()
+    dataset = generate_from_args(args.path, args)
+    print(f"{args.path}: {dataset.students:,} students, {dataset.sections:,} sections, "
+          f"{dataset.enrollments:,} enrollments, {dataset.waitlisted:,} waitlist entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+benchmarks/load_generator.py
+Simulates the opening of registration against `server.py`: thousands of
+students connect at once. Each logs in, browses the first catalog page,
+tries to register for a few popular sections, and checks its schedule.
+At the end the script reports requests per second and p50/p99 latency
+per endpoint.
+
+By default it writes a synthetic data file, starts the server in a child
+process, and stops it afterwards. Pass --url to target a server that is
+already running instead; it must then hold the data written by
+`python -m benchmarks.datagen FILE --students N --seed S` with the same
+--students and --seed.
+
+    python -m benchmarks.load_generator [--students 2000] [--concurrency 1000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from benchmarks import datagen
+
+# server.py sits next to the benchmarks package, wherever this is run from.
+SERVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server.py")
+
+
+class Client:
+    # One keep-alive HTTP/1.1 connection issuing JSON requests.
+    def __init__(self, host, port, latencies):
+        self.host = host
+        self.port = port
+        self.latencies = latencies
+        self.reader = None
+        self.writer = None
+        self.token = None
+
+    async def request(self, method, path, body=None, label=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode() if body is not None else b""
+        headers = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(data)}\r\n"
+        if self.token:
+            headers += f"Authorization: Bearer {self.token}\r\n"
+        start = time.perf_counter()
+        self.writer.write((headers + "\r\n").encode() + data)
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        length = 0
+        for line in head.split(b"\r\n"):
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":", 1)[1])
+        payload = json.loads(await self.reader.readexactly(length)) if length else {}
+        self.latencies.setdefault(label or path, []).append(time.perf_counter() - start)
+        return status, payload
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def simulate_student(number, host, port, course_ids, latencies, start_gate, outcomes):
+    client = Client(host, port, latencies)
+    rng = random.Random(number)
+    await start_gate.wait()
+    try:
+        status, payload = await client.request("POST", "/login",
+                                               {"username": f"user{number}", "password": "password"})
+        if status != 200:
+            outcomes["login_failed"] = outcomes.get("login_failed", 0) + 1
+            return
+        client.token = payload["token"]
+        await client.request("GET", "/courses?limit=20", label="/courses")
+        for course_id in rng.sample(course_ids, 3):
+            status, payload = await client.request("POST", "/register", {"course_id": course_id})
+            outcomes[payload.get("status", status)] = outcomes.get(payload.get("status", status), 0) + 1
+        await client.request("GET", "/me/courses")
+    finally:
+        client.close()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_load(host, port, students, concurrency, course_ids):
+    latencies = {}
+    outcomes = {}
+    start_gate = asyncio.Event()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(number):
+        async with semaphore:
+            await simulate_student(number, host, port, course_ids, latencies, start_gate, outcomes)
+
+    tasks = [asyncio.create_task(limited(n)) for n in range(students)]
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    start_gate.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    errors = [r for r in results if isinstance(r, Exception)]
+    return latencies, outcomes, errors, elapsed
+
+
+async def probe(host, port):
+    _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), 1)
+    writer.close()
+    await writer.wait_closed()
+
+
+def wait_for_port(host, port, process, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("server exited during start-up")
+        try:
+            asyncio.run(probe(host, port))
+            return
+        except (OSError, asyncio.TimeoutError):
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--students", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=1_000)
+    parser.add_argument("--popular", type=int, default=20, help="number of sections everyone wants")
+    parser.add_argument("--url", help="target an already running server, e.g. http://127.0.0.1:8080")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=1, help="dataset seed (see benchmarks/datagen.py)")
+    args = parser.parse_args()
+
+    # The dataset is generated even with --url: it is deterministic, so it
+    # names the same popular sections the running server holds.
+    path = os.path.join(tempfile.mkdtemp(prefix="unireg-load-"), "data.json")
+    dataset = datagen.generate(path, students=args.students, seed=args.seed)
+    course_ids = dataset.popular[:args.popular]
+    process = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", args.port
+        process = subprocess.Popen([sys.executable, SERVER, "--port", str(port), "--data", path],
+                                   stdout=subprocess.DEVNULL)
+        wait_for_port(host, port, process)
+
+    try:
+        latencies, outcomes, errors, elapsed = asyncio.run(
+            run_load(host, port, args.students, args.concurrency, course_ids))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{args.students} students, concurrency {args.concurrency}: {total} requests in "
+          f"{elapsed:.2f}s ({total / elapsed:,.0f} req/s), {len(errors)} client errors")
+    print(f"{'endpoint':<14} {'count':>7} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for label, values in sorted(latencies.items()):
+        print(f"{label:<14} {len(values):>7} {percentile(values, 0.5) * 1e3:>10.2f} "
+              f"{percentile(values, 0.99) * 1e3:>10.2f}")
+    print("register outcomes:", ", ".join(f"{k}={v}" for k, v in sorted(outcomes.items(), key=str)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+benchmarks/runner.py
+End-to-end scenario benchmark with a stored baseline. It generates a
+dataset with datagen.py and then drives a `RegistrationSystem`
+non-interactively (through `RegistrationService`) over these scenarios,
+in order, on the same system:
+
+- load: start a system from the generated data file;
+- login: authenticate students, some with a wrong password and most of
+  them more than once (so the login cache is exercised);
+- churn: register/drop requests for popular sections;
+- admin_delete: delete students, then every section left empty;
+- save: write the full snapshot.
+
+Each scenario reports its best wall time over `--repeat` runs. A second
+run under tracemalloc reports its peak traced memory. Timing and memory
+are measured separately because tracemalloc slows allocation-heavy code
+down. Each run starts from a fresh copy of the data file.
+
+`--save-baseline FILE` stores the results as JSON. `--baseline FILE`
+compares against a stored run and marks every scenario whose time or
+peak memory grew by more than `--tolerance` (default 25%). The exit
+status is 1 if anything regressed, so the runner can gate CI.
+
+    python -m benchmarks.runner [--students N ...] [--repeat 3]
+        [--save-baseline base.json | --baseline base.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import datagen
+from benchmarks.common import empty_system
+from registration_service import RegistrationService, OK
+
+SCENARIOS = ["load", "login", "churn", "admin_delete", "save"]
+
+
+def run_scenarios(dataset, args, scenario_hook):
+    # Run every scenario once on a fresh copy of the data. `scenario_hook`
+    # is a context manager factory wrapped around each scenario; it gets
+    # the scenario name and a dict to put its measurements in.
+    workdir = tempfile.mkdtemp(prefix="unireg-run-")
+    path = os.path.join(workdir, "data.json")
+    shutil.copyfile(dataset.path, path)
+    rng = random.Random(args.seed)
+    results = {}
+    state = {}
+
+    def load():
+        state["system"] = empty_system(path)
+        state["service"] = RegistrationService(state["system"])
+        return len(state["system"].students)
+
+    def login():
+        system = state["system"]
+        names = [f"user{rng.randrange(dataset.students)}" for _ in range(args.logins)]
+        for number, username in enumerate(names):
+            # One attempt in ten uses a wrong password.
+            password = datagen.PASSWORD if number % 10 else "wrong"
+            system.authenticate(username, password)
+        return len(names)
+
+    def churn():
+        service = state["service"]
+        popular = dataset.popular[:max(1, len(dataset.popular) // 10)]
+        for _ in range(args.churn):
+            student_id = f"S{rng.randrange(dataset.students):06}"
+            course_id = rng.choice(popular)
+            if service.register(student_id, course_id) != OK:
+                service.drop(student_id, course_id)
+        return args.churn
+
+    def admin_delete():
+        system, service = state["system"], state["service"]
+        deleted = 0
+        for number in rng.sample(range(dataset.students), min(args.deletes, dataset.students)):
+            deleted += service.delete_student(f"S{number:06}") == OK
+        for course in [c for c in system.courses if not c.enrolled_students]:
+            deleted += service.delete_course(course.get_course_id()) == OK
+        return deleted
+
+    def save():
+        state["system"].save_data()
+        return len(state["system"].courses)
+
+    steps = {"load": load, "login": login, "churn": churn, "admin_delete": admin_delete, "save": save}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name in SCENARIOS:
+                result = results[name] = {}
+                with scenario_hook(name, result):
+                    result["operations"] = steps[name]()
+    finally:
+        if "system" in state:
+            state["system"].storage.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+@contextlib.contextmanager
+def timed(name, result):
+    start = time.perf_counter()
+    yield
+    result["seconds"] = time.perf_counter() - start
+
+
+@contextlib.contextmanager
+def traced(name, result):
+    tracemalloc.reset_peak()
+    start = tracemalloc.get_traced_memory()[0]
+    yield
+    result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    result["growth_bytes"] = tracemalloc.get_traced_memory()[0] - start
+
+
+def measure(dataset, args):
+    best = {}
+    for _ in range(args.repeat):
+        for name, result in run_scenarios(dataset, args, timed).items():
+            if name not in best or result["seconds"] < best[name]["seconds"]:
+                best[name] = result
+    tracemalloc.start()
+    try:
+        for name, result in run_scenarios(dataset, args, traced).items():
+            best[name]["peak_bytes"] = result["peak_bytes"]
+            best[name]["growth_bytes"] = result["growth_bytes"]
+    finally:
+        tracemalloc.stop()
+    return best
+
+
+def compare(results, baseline, tolerance):
+    # Return a list of "scenario metric: old -> new" regressions.
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            if old.get(metric) and result[metric] > old[metric] * (1 + tolerance):
+                regressions.append(f"{name} {metric}: {old[metric]:,.4g} -> {result[metric]:,.4g} "
+                                   f"(+{result[metric] / old[metric] - 1:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the end-to-end benchmark scenarios.")
+    datagen.add_arguments(parser)
+    parser.add_argument("--logins", type=int, default=5_000)
+    parser.add_argument("--churn", type=int, default=20_000, help="register/drop requests")
+    parser.add_argument("--deletes", type=int, default=500, help="students to delete")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", help="compare against this saved run")
+    parser.add_argument("--save-baseline", help="save this run here")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    params = {key: value for key, value in vars(args).items()
+              if key not in ("baseline", "save_baseline", "tolerance", "repeat")}
+    workdir = tempfile.mkdtemp(prefix="unireg-data-")
+    try:
+        dataset = datagen.generate_from_args(os.path.join(workdir, "data.json"), args)
+        print(f"{dataset.students:,} students, {dataset.sections:,} sections, "
+              f"{dataset.enrollments:,} enrollments, {dataset.waitlisted:,} waitlisted")
+        results = measure(dataset, args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get("params") != params:
+            print("Warning: the baseline was recorded with different parameters.")
+
+    print(f"{'scenario':<14} {'ops':>8} {'time (ms)':>10} {'ops/s':>10} {'peak (MB)':>10}"
+          + (f" {'base (ms)':>10}" if baseline else ""))
+    for name in SCENARIOS:
+        result = results[name]
+        line = (f"{name:<14} {result['operations']:>8,} {result['seconds'] * 1e3:>10.1f} "
+                f"{result['operations'] / result['seconds']:>10,.0f} {result['peak_bytes'] / 1e6:>10.1f}")
+        if baseline:
+            old = baseline.get("scenarios", {}).get(name, {}).get("seconds")
+            line += f" {old * 1e3:>10.1f}" if old else f" {'-':>10}"
+        print(line)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump({"params": params, "python": sys.version.split()[0], "scenarios": results},
+                      file, indent=2)
+        print(f"Saved baseline to {args.save_baseline}.")
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
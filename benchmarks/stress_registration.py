@@ -0,0 +1,128 @@
+"""
+benchmarks/stress_registration.py
+Stress test for `RegistrationService`: hundreds of threads hammer a few
+popular sections with registrations, drops and multi-course
+transactions. Afterwards it checks that no section is over capacity,
+that both sides of every enrollment agree, and that no student holds
+overlapping courses. It also reports throughput.
+
+    python -m benchmarks.stress_registration [threads] [ops_per_thread]
+
+With --unsafe it runs a similar workload through the unlocked
+`Student.register_course` path for comparison; the check-then-act race
+there can oversell a section whenever a thread switch lands between
+`is_full` and `add_student`.
+"""
+
+import contextlib
+import io
+import random
+import sys
+import threading
+import time
+
+from benchmarks.common import empty_system
+from course import Course
+from registration_service import RegistrationService, OK
+from student import Student
+
+POPULAR_SECTIONS = 12
+SEATS = 40
+STUDENTS = 3_000
+
+
+def build():
+    system = empty_system()
+    for i in range(POPULAR_SECTIONS):
+        # Pairs of sections share a time slot so conflicts are exercised too.
+        system.add_course(Course(f"HOT{i:02}", f"Popular {i}", "Staff", f"MWF {8 + i // 2}-{9 + i // 2}", SEATS))
+    for i in range(STUDENTS):
+        system.add_student(Student(f"user{i}", "password", f"S{i:05}"))
+    return system
+
+
+def worker(service, system, seed, operations, barrier, counts, unsafe):
+    rng = random.Random(seed)
+    course_ids = [c.get_course_id() for c in list(system.courses)[-POPULAR_SECTIONS:]]
+    barrier.wait()
+    local = {"ok": 0, "refused": 0}
+    for _ in range(operations):
+        student_id = f"S{rng.randrange(STUDENTS):05}"
+        roll = rng.random()
+        if unsafe:
+            student = system.index.find_user_by_id(student_id)
+            course = system.find_course_by_id(rng.choice(course_ids))
+            changed = student.register_course(course) if roll < 0.7 else student.drop_course(course)
+            local["ok" if changed else "refused"] += 1
+            continue
+        if roll < 0.5:
+            status = service.register(student_id, rng.choice(course_ids))
+        elif roll < 0.7:
+            status, _ = service.register_all(student_id, rng.sample(course_ids, 2))
+        else:
+            status = service.drop(student_id, rng.choice(course_ids))
+        local["ok" if status == OK else "refused"] += 1
+    with counts["lock"]:
+        counts["ok"] += local["ok"]
+        counts["refused"] += local["refused"]
+
+
+def check(system):
+    problems = []
+    for course in system.courses:
+        enrolled = course.get_enrolled_students()
+        if len(enrolled) > course.get_max_students():
+            problems.append(f"{course.get_course_id()} over capacity: {len(enrolled)}/{course.get_max_students()}")
+        for student in enrolled:
+            if course not in student.get_registered_courses():
+                problems.append(f"{course.get_course_id()} lists {student.get_user_id()} one-sidedly")
+    for student in system.students:
+        taken = []
+        for course in student.get_registered_courses():
+            if student not in course.get_enrolled_students():
+                problems.append(f"{student.get_user_id()} lists {course.get_course_id()} one-sidedly")
+            for other in taken:
+                if other.get_schedule() == course.get_schedule():
+                    problems.append(f"{student.get_user_id()} has a time conflict")
+            taken.append(course)
+    return problems
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    unsafe = "--unsafe" in sys.argv
+    threads = int(args[0]) if args else 400
+    operations = int(args[1]) if len(args) > 1 else 250
+
+    # Switch threads very often so interleavings actually happen.
+    sys.setswitchinterval(1e-6)
+    system = build()
+    system.storage.COMPACT_EVERY = 20_000
+    service = RegistrationService(system)
+    barrier = threading.Barrier(threads + 1)
+    counts = {"ok": 0, "refused": 0, "lock": threading.Lock()}
+    pool = [threading.Thread(target=worker, args=(service, system, seed, operations, barrier, counts, unsafe))
+            for seed in range(threads)]
+    for thread in pool:
+        thread.start()
+    # The unlocked path prints a message per attempt; swallow them all.
+    with contextlib.redirect_stdout(io.StringIO()) if unsafe else contextlib.nullcontext():
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    system.storage.close()
+
+    total = threads * operations
+    print(f"{'unsafe' if unsafe else 'service'}: {threads} threads, {total} operations in {elapsed:.2f}s "
+          f"({total / elapsed:,.0f} ops/s), {counts['ok']} applied, {counts['refused']} refused")
+    problems = check(system)
+    if problems:
+        print(f"FAILED: {len(problems)} problems, e.g. {problems[:3]}")
+        sys.exit(1)
+    print("OK: capacity never exceeded, enrollments consistent on both sides")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+catalog.py
+Query and display helpers for the course catalog.
+
+`query_courses` filters the catalog by department prefix, instructor,
+meeting day and open seats. It sorts by one of `SORT_KEYS` and returns
+one page at a time as a `CatalogPage`. Pages are chained with an opaque
+cursor: the sort key of the last row shown. Asking for the next page
+returns the rows that sort after that key. Courses added or removed
+between pages therefore never shift the rows of the next page, which an
+offset would. Only `limit` rows are ever kept sorted (`heapq.nsmallest`),
+so a page costs one pass over the catalog, not a full sort.
+
+`write_course_table` renders courses in buffered chunks with one write
+per chunk, instead of one `print` per row.
+"""
+
+import base64
+import heapq
+import json
+import sys
+from collections import namedtuple
+
+from schedule import DAY_CODES, DAY_NAMES, MINUTES_PER_DAY, meeting_days
+
+PAGE_SIZE = 20
+RENDER_CHUNK = 256
+
+CatalogPage = namedtuple("CatalogPage", "courses next_cursor total")
+
+
+def _first_meeting(course):
+    # Week-minute of the first meeting; unparsed schedules sort last.
+    return min(start for start, _ in course.time_intervals) if course.time_intervals else 7 * MINUTES_PER_DAY
+
+
+SORT_KEYS = {
+    "id": lambda c: c.course_id.casefold(),
+    "name": lambda c: c.course_name.casefold(),
+    "instructor": lambda c: c.instructor.casefold(),
+    "time": _first_meeting,
+    # Most open seats first.
+    "seats": lambda c: len(c.enrolled_students) - c.max_students,
+}
+# Type of each sort's key, for checking cursors.
+SORT_TYPES = {"id": str, "name": str, "instructor": str, "time": int, "seats": int}
+
+
+def parse_day(text):
+    # "TH", "thu" or "Thursday" -> 3. Raises ValueError for anything else.
+    text = text.strip()
+    day = DAY_CODES.get(text.upper())
+    if day is not None:
+        return day
+    for number, name in enumerate(DAY_NAMES):
+        if len(text) >= 3 and name.lower().startswith(text[:3].lower()):
+            return number
+    raise ValueError(f"unknown day: {text!r}")
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor, sort="id"):
+    # The (sort key, case-folded id) a cursor points after. Raises
+    # ValueError if it is malformed or was made for a different sort, so
+    # it never meets the other sort's keys in a comparison.
+    try:
+        after = tuple(json.loads(base64.urlsafe_b64decode(cursor.encode())))
+    except (ValueError, TypeError):
+        raise ValueError("invalid cursor") from None
+    key_type = SORT_TYPES[sort]
+    if (len(after) != 2 or not isinstance(after[1], str) or not isinstance(after[0], key_type)
+            or isinstance(after[0], bool)):
+        raise ValueError("cursor does not match the sort order")
+    return after
+
+
+def filter_courses(courses, department=None, instructor=None, day=None, open_only=False):
+    # Yield the courses matching every filter that is given.
+    department = department.casefold() if department else None
+    instructor = instructor.casefold() if instructor else None
+    day = parse_day(day) if isinstance(day, str) else day
+    for course in courses:
+        if department and not course.course_id.casefold().startswith(department):
+            continue
+        if instructor and instructor not in course.instructor.casefold():
+            continue
+        if day is not None and day not in meeting_days(course.time_intervals):
+            continue
+        if open_only and len(course.enrolled_students) >= course.max_students:
+            continue
+        yield course
+
+
+def query_courses(courses, department=None, instructor=None, day=None, open_only=False,
+                  sort="id", cursor=None, limit=PAGE_SIZE):
+    if sort not in SORT_KEYS:
+        raise ValueError(f"unknown sort: {sort!r} (choose from {', '.join(SORT_KEYS)})")
+    sort_key = SORT_KEYS[sort]
+    after = decode_cursor(cursor, sort) if cursor else None
+
+    # The course id breaks ties, so every row has a distinct position.
+    total = 0
+    candidates = []
+    for course in filter_courses(courses, department, instructor, day, open_only):
+        total += 1
+        key = (sort_key(course), course.course_id.casefold())
+        if after is None or key > after:
+            candidates.append((key, course))
+
+    rows = heapq.nsmallest(limit + 1, candidates, key=lambda row: row[0])
+    next_cursor = encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+    return CatalogPage([course for _, course in rows[:limit]], next_cursor, total)
+
+
+def write_course_table(courses, show_enrolled=False, out=None):
+    # Header, one line per course, written RENDER_CHUNK lines at a time.
+    out = out or sys.stdout
+    width = 86 if show_enrolled else 76
+    header = f"{'ID':<10} {'Name':<20} {'Instructor':<15} {'Schedule':<15} {'Capacity':<10}"
+    if show_enrolled:
+        header += f" {'Enrolled':<10}"
+    lines = ["-" * width, header, "-" * width]
+    for course in courses:
+        line = (f"{course.course_id:<10} {course.course_name:<20} {course.instructor:<15} "
+                f"{course.schedule:<15} {course.max_students:<10}")
+        if show_enrolled:
+            line += f" {len(course.enrolled_students):<10}"
+        lines.append(line)
+        if len(lines) >= RENDER_CHUNK:
+            out.write("\n".join(lines) + "\n")
+            lines = []
+    lines.append("-" * width)
+    out.write("\n".join(lines) + "\n")
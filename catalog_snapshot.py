@@ -0,0 +1,548 @@
+"""
+catalog_snapshot.py
+Read-only catalog snapshots for browsing from other processes.
+
+Most traffic only reads the catalog. The process that holds the live
+`RegistrationSystem` can publish an immutable, versioned snapshot of the
+courses, the students' enrollments and the search vocabulary to one
+binary file. Worker processes map that file into memory and answer
+browsing and search requests straight from it. They never load or
+unpickle the object graph, and they never contend with the writer.
+
+File layout (native byte order, recorded in the header):
+
+    header      magic, format, byte order, version, publish time
+    directory   (offset, byte length) of every section in SECTIONS
+    sections    8-byte aligned arrays of unsigned ints, plus one UTF-8
+                blob holding every distinct string once
+
+Course columns are indexed by position in catalog order. `id_order`
+lists the positions sorted by case-folded id, for lookups and the
+default sort. Each student's courses are a slice of `student_courses`
+(`course_start[i]:course_start[i + 1]`). The search vocabulary is a
+sorted token list with postings of (course rank in `id_order`, field
+weight), so a query prefix is found by bisection. Scoring matches
+search_index.py.
+
+`SnapshotPublisher.publish` writes a new file next to the old one and
+renames it over it. A `SnapshotReader` notices the new file (it checks
+at most every `check_every` seconds) and maps it. The old mapping stays
+valid until then, so readers always see a whole version, never a
+half-written one.
+
+    python catalog_snapshot.py publish --data data.json --out catalog.snap
+    python catalog_snapshot.py serve catalog.snap [--port 8081] [--workers 4]
+
+`serve` answers GET /courses (the same parameters and cursors as
+server.py), /courses/search?q=, /courses/<course_id> and /snapshot from
+`--workers` processes sharing one listening socket. It serves only the
+public catalog. Student enrollments (`student_courses`, `students`) are
+for trusted code that reads the snapshot directly. Run the writer with
+`python server.py --snapshot catalog.snap` to keep the file current.
+"""
+
+import argparse
+import asyncio
+import heapq
+import mmap
+import os
+import signal
+import socket
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from collections import namedtuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from catalog import PAGE_SIZE, SORT_KEYS, CatalogPage, decode_cursor, encode_cursor, parse_day
+from schedule import MINUTES_PER_DAY, meeting_days
+from search_index import course_tokens, tokenize
+
+MAGIC = b"UNIREGSN"
+FORMAT = 1
+HEADER = struct.Struct("<8sIIQd")
+ENTRY = struct.Struct("<QQ")
+NO_MEETING = 7 * MINUTES_PER_DAY
+
+# (name, array typecode) of every section, in file order.
+SECTIONS = (
+    ("string_offsets", "I"), ("strings", "B"),
+    ("course_id", "I"), ("course_name", "I"), ("instructor", "I"), ("schedule", "I"),
+    ("max_students", "I"), ("enrolled", "I"), ("waitlisted", "I"),
+    ("first_meeting", "I"), ("days", "I"), ("id_order", "I"),
+    ("student_id", "I"), ("username", "I"), ("student_order", "I"),
+    ("course_start", "I"), ("student_courses", "I"),
+    ("tokens", "I"), ("token_start", "I"), ("posting_rank", "I"), ("posting_weight", "B"),
+)
+
+CourseRow = namedtuple("CourseRow", "course_id course_name instructor schedule max_students "
+                                    "enrolled waitlisted")
+
+
+def write_snapshot(system, path, version):
+    # Serialize `system` to `path` atomically; returns the file size.
+    strings = {}
+    columns = {name: array(code) for name, code in SECTIONS}
+
+    def string(text):
+        code = strings.get(text)
+        if code is None:
+            code = strings[text] = len(strings)
+        return code
+
+    positions = {}
+    for position, course in enumerate(system.courses):
+        positions[course] = position
+        columns["course_id"].append(string(course.course_id))
+        columns["course_name"].append(string(course.course_name))
+        columns["instructor"].append(string(course.instructor))
+        columns["schedule"].append(string(course.schedule))
+        columns["max_students"].append(course.max_students)
+        columns["enrolled"].append(len(course.enrolled_students))
+        columns["waitlisted"].append(len(course.waitlist))
+        intervals = course.time_intervals
+        columns["first_meeting"].append(min(start for start, _ in intervals) if intervals else NO_MEETING)
+        columns["days"].append(sum(1 << day for day in meeting_days(intervals)))
+    courses = list(positions)
+    id_order = sorted(range(len(courses)), key=lambda p: courses[p].course_id.casefold())
+    columns["id_order"].extend(id_order)
+
+    students = list(system.students)
+    columns["course_start"].append(0)
+    for student in students:
+        columns["student_id"].append(string(student.get_user_id()))
+        columns["username"].append(string(student.get_username()))
+        columns["student_courses"].extend(positions[c] for c in student.registered_courses)
+        columns["course_start"].append(len(columns["student_courses"]))
+    columns["student_order"].extend(sorted(range(len(students)), key=lambda i: students[i].get_user_id()))
+
+    postings = {}
+    for rank, position in enumerate(id_order):
+        for token, weight in course_tokens(courses[position]).items():
+            postings.setdefault(token, []).append((rank, weight))
+    columns["token_start"].append(0)
+    for token in sorted(postings):
+        columns["tokens"].append(string(token))
+        for rank, weight in postings[token]:
+            columns["posting_rank"].append(rank)
+            columns["posting_weight"].append(weight)
+        columns["token_start"].append(len(columns["posting_rank"]))
+
+    blob = bytearray()
+    for text in strings:
+        columns["string_offsets"].append(len(blob))
+        blob += text.encode()
+    columns["string_offsets"].append(len(blob))
+    columns["strings"] = array("B", blob)
+
+    offset = HEADER.size + ENTRY.size * len(SECTIONS)
+    directory = []
+    for name, _ in SECTIONS:
+        offset += -offset % 8
+        size = len(columns[name]) * columns[name].itemsize
+        directory.append((offset, size))
+        offset += size
+
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(HEADER.pack(MAGIC, FORMAT, sys.byteorder == "little", version, time.time()))
+            for entry in directory:
+                file.write(ENTRY.pack(*entry))
+            for (name, _), (start, _) in zip(SECTIONS, directory):
+                file.write(bytes(start - file.tell()))
+                columns[name].tofile(file)
+            size = file.tell()
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return size
+
+
+def snapshot_version(path):
+    # Version of the snapshot at `path`, or 0 if there is none.
+    try:
+        with open(path, "rb") as file:
+            magic, _, _, version, _ = HEADER.unpack(file.read(HEADER.size))
+    except (OSError, struct.error):
+        return 0
+    return version if magic == MAGIC else 0
+
+
+class SnapshotPublisher:
+    # OOP - Encapsulation:
+    # Owns the version counter. Callers mark changes with `changed()` and
+    # publish when convenient, so a burst of writes costs one snapshot.
+    def __init__(self, system, path):
+        self.system = system
+        self.path = path
+        self.version = snapshot_version(path)
+        self.dirty = True
+
+    def changed(self):
+        self.dirty = True
+
+    def publish(self, system=None):
+        # Write the next version; returns it. Takes the system as an
+        # argument too, so it can be passed to RegistrationService.run_exclusive.
+        # If the write fails, the version is not used and the changes are
+        # still waiting to be published.
+        version = self.version + 1
+        write_snapshot(self.system if system is None else system, self.path, version)
+        self.version = version
+        self.dirty = False
+        return version
+
+    def publish_if_changed(self, system=None):
+        return self.publish(system) if self.dirty else None
+
+
+class CatalogSnapshot:
+    # OOP - Encapsulation:
+    # One mapped snapshot version. Columns are memoryviews over the file;
+    # strings are decoded only when a row is returned.
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self.stat = os.fstat(file.fileno())
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        magic, file_format, little, self.version, self.published = HEADER.unpack_from(view)
+        if magic != MAGIC or file_format != FORMAT:
+            view.release()
+            self._map.close()
+            raise ValueError(f"{path} is not a format {FORMAT} catalog snapshot")
+        if bool(little) != (sys.byteorder == "little"):
+            view.release()
+            self._map.close()
+            raise ValueError(f"{path} was written with a different byte order")
+        self._views = [view]
+        for number, (name, code) in enumerate(SECTIONS):
+            start, size = ENTRY.unpack_from(view, HEADER.size + number * ENTRY.size)
+            column = view[start:start + size].cast(code)
+            self._views.append(column)
+            setattr(self, "_" + name, column)
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+
+    def _string(self, code):
+        offsets = self._string_offsets
+        return str(self._strings[offsets[code]:offsets[code + 1]], "utf-8")
+
+    def __len__(self):
+        return len(self._course_id)
+
+    def course_row(self, position):
+        return CourseRow(self._string(self._course_id[position]), self._string(self._course_name[position]),
+                         self._string(self._instructor[position]), self._string(self._schedule[position]),
+                         self._max_students[position], self._enrolled[position],
+                         self._waitlisted[position])
+
+    def _id_key(self, rank):
+        return self._string(self._course_id[self._id_order[rank]]).casefold()
+
+    def _bisect_ids(self, key, after=False):
+        # First rank whose case-folded id is >= key (> key when `after`).
+        low, high = 0, len(self._id_order)
+        while low < high:
+            middle = (low + high) // 2
+            current = self._id_key(middle)
+            if current < key or (after and current == key):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def find_course(self, course_id):
+        key = course_id.casefold()
+        rank = self._bisect_ids(key)
+        if rank < len(self._id_order) and self._id_key(rank) == key:
+            return self.course_row(self._id_order[rank])
+        return None
+
+    def query(self, department=None, instructor=None, day=None, open_only=False,
+              sort="id", cursor=None, limit=PAGE_SIZE):
+        # Same filters, sort orders and cursors as catalog.query_courses;
+        # returns a CatalogPage of CourseRows.
+        if sort not in SORT_KEYS:
+            raise ValueError(f"unknown sort: {sort!r} (choose from {', '.join(SORT_KEYS)})")
+        after = decode_cursor(cursor, sort) if cursor else None
+
+        if sort == "id" and not (department or instructor or day is not None or open_only):
+            # Unfiltered browsing in id order reads only the page itself.
+            start = 0 if after is None else self._bisect_ids(after[1], after=True)
+            ranks = range(start, min(start + limit + 1, len(self._id_order)))
+            rows = [self._id_order[rank] for rank in ranks]
+            next_cursor = None
+            if len(rows) > limit:
+                key = self._id_key(ranks[limit - 1])
+                next_cursor = encode_cursor((key, key))
+            return CatalogPage([self.course_row(p) for p in rows[:limit]], next_cursor, len(self))
+
+        department = department.casefold() if department else None
+        instructor = instructor.casefold() if instructor else None
+        day_bit = 1 << (parse_day(day) if isinstance(day, str) else day) if day is not None else 0
+        total = 0
+        candidates = []
+        for position in range(len(self)):
+            if open_only and self._enrolled[position] >= self._max_students[position]:
+                continue
+            if day_bit and not self._days[position] & day_bit:
+                continue
+            course_key = self._string(self._course_id[position]).casefold()
+            if department and not course_key.startswith(department):
+                continue
+            if instructor and instructor not in self._string(self._instructor[position]).casefold():
+                continue
+            total += 1
+            key = (self._sort_key(sort, position, course_key), course_key)
+            if after is None or key > after:
+                candidates.append((key, position))
+        rows = heapq.nsmallest(limit + 1, candidates, key=lambda row: row[0])
+        next_cursor = encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+        return CatalogPage([self.course_row(p) for _, p in rows[:limit]], next_cursor, total)
+
+    def _sort_key(self, sort, position, course_key):
+        if sort == "id":
+            return course_key
+        if sort == "name":
+            return self._string(self._course_name[position]).casefold()
+        if sort == "instructor":
+            return self._string(self._instructor[position]).casefold()
+        if sort == "time":
+            return self._first_meeting[position]
+        return self._enrolled[position] - self._max_students[position]
+
+    def _token_range(self, prefix):
+        # Tokens starting with `prefix` are tokens[start:end].
+        def bisect(key, low):
+            high = len(self._tokens)
+            while low < high:
+                middle = (low + high) // 2
+                if self._string(self._tokens[middle]) < key:
+                    low = middle + 1
+                else:
+                    high = middle
+            return low
+
+        start = bisect(prefix, 0)
+        return start, bisect(prefix + "\uffff", start)
+
+    def search(self, query, limit=20):
+        # Up to `limit` CourseRows matching every word of `query`, best first,
+        # ranked as SearchIndex.search ranks them.
+        totals = None
+        for word in dict.fromkeys(tokenize(query)):
+            start, end = self._token_range(word)
+            scores = {}
+            for token in range(start, end):
+                exact = self._string(self._tokens[token]) == word
+                first, last = self._token_start[token], self._token_start[token + 1]
+                for rank, weight in zip(self._posting_rank[first:last], self._posting_weight[first:last]):
+                    score = weight * 2 if exact else weight
+                    if (totals is None or rank in totals) and scores.get(rank, 0) < score:
+                        scores[rank] = score
+            totals = scores if totals is None else {rank: totals[rank] + s for rank, s in scores.items()}
+            if not totals:
+                return []
+        if totals is None:
+            return []
+        best = heapq.nsmallest(limit, totals.items(), key=lambda item: (-item[1], item[0]))
+        return [self.course_row(self._id_order[rank]) for rank, _ in best]
+
+    def student_courses(self, user_id):
+        # CourseRows of a student's registered courses, or None if unknown.
+        order = self._student_order
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if self._string(self._student_id[order[middle]]) < user_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(order) or self._string(self._student_id[order[low]]) != user_id:
+            return None
+        student = order[low]
+        first, last = self._course_start[student], self._course_start[student + 1]
+        return [self.course_row(p) for p in self._student_courses[first:last]]
+
+    # [(user_id, username)] in registration order.
+    def students(self, offset=0, limit=50):
+        end = min(len(self._student_id), offset + limit)
+        return [(self._string(self._student_id[i]), self._string(self._username[i]))
+                for i in range(offset, end)]
+
+    def student_count(self):
+        return len(self._student_id)
+
+
+class SnapshotReader:
+    # OOP - Encapsulation:
+    # Hands out the newest published snapshot, re-mapping the file when
+    # the writer has replaced it.
+    def __init__(self, path, check_every=0.1):
+        self.path = path
+        self.check_every = check_every
+        self._snapshot = CatalogSnapshot(path)
+        self._checked = time.monotonic()
+
+    def current(self):
+        now = time.monotonic()
+        if now - self._checked >= self.check_every:
+            self._checked = now
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                return self._snapshot
+            old = self._snapshot.stat
+            if (stat.st_ino, stat.st_mtime_ns) != (old.st_ino, old.st_mtime_ns):
+                try:
+                    snapshot = CatalogSnapshot(self.path)
+                except (OSError, ValueError):
+                    return self._snapshot
+                self._snapshot.close()
+                self._snapshot = snapshot
+        return self._snapshot
+
+    def close(self):
+        self._snapshot.close()
+
+
+def _serving_classes():
+    # The HTTP layer lives in server.py; imported here so that reading a
+    # snapshot does not load the registration system.
+    from server import JsonServer, MAX_PAGE
+
+    class SnapshotServer(JsonServer):
+        # OOP - Inheritance:
+        # Answers the public catalog endpoints from the newest snapshot.
+        def __init__(self, reader):
+            self.reader = reader
+
+        def dispatch(self, method, target, headers, body):
+            url = urlsplit(target)
+            parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+            query = parse_qs(url.query)
+
+            def param(name, default=None):
+                return query.get(name, [default])[0]
+
+            if method != "GET":
+                return 404, {"error": "not found"}
+            snapshot = self.reader.current()
+            try:
+                if parts == ["courses"]:
+                    page = snapshot.query(department=param("department"), instructor=param("instructor"),
+                                          day=param("day"), open_only=param("open") in ("1", "true", "yes"),
+                                          sort=param("sort") or "id", cursor=param("cursor"),
+                                          limit=min(MAX_PAGE, max(1, int(param("limit") or 50))))
+                    return 200, {"courses": [row._asdict() for row in page.courses],
+                                 "next_cursor": page.next_cursor, "total": page.total,
+                                 "version": snapshot.version}
+                if parts == ["courses", "search"]:
+                    limit = min(MAX_PAGE, max(1, int(param("limit", "20"))))
+                    return 200, {"courses": [row._asdict() for row in snapshot.search(param("q", ""), limit)],
+                                 "version": snapshot.version}
+                if len(parts) == 2 and parts[0] == "courses":
+                    row = snapshot.find_course(parts[1])
+                    if row is None:
+                        return 404, {"error": "unknown course"}
+                    return 200, dict(row._asdict(), version=snapshot.version)
+                if parts == ["snapshot"]:
+                    return 200, {"version": snapshot.version, "published": snapshot.published,
+                                 "courses": len(snapshot), "students": snapshot.student_count(),
+                                 "pid": os.getpid()}
+            except (TypeError, ValueError) as error:
+                return 400, {"error": f"bad request: {error}"}
+            return 404, {"error": "not found"}
+
+    return SnapshotServer
+
+
+async def _serve_worker(listening, path):
+    server = _serving_classes()(SnapshotReader(path))
+    listener = await asyncio.start_server(server.handle_connection, sock=listening)
+    serving = asyncio.ensure_future(listener.serve_forever())
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, serving.cancel)
+    async with listener:
+        try:
+            await serving
+        except asyncio.CancelledError:
+            pass
+
+
+def serve(path, host, port, workers):
+    # Fork `workers` processes that accept from one shared socket.
+    CatalogSnapshot(path).close()
+    listening = socket.create_server((host, port), backlog=4096)
+    print(f"Serving {path} on http://{host}:{port} with {workers} worker(s)", flush=True)
+    if workers == 1 or not hasattr(os, "fork"):
+        asyncio.run(_serve_worker(listening, path))
+        return
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                asyncio.run(_serve_worker(listening, path))
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish or serve read-only catalog snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    publish = commands.add_parser("publish", help="write a snapshot of a data file")
+    publish.add_argument("--data", default="data.json")
+    publish.add_argument("--out", default="catalog.snap")
+    serving = commands.add_parser("serve", help="serve a snapshot from worker processes")
+    serving.add_argument("snapshot")
+    serving.add_argument("--host", default="127.0.0.1")
+    serving.add_argument("--port", type=int, default=8081)
+    serving.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    if args.command == "publish":
+        from registration_system import RegistrationSystem
+        from storage import open_storage
+
+        system = RegistrationSystem(storage=open_storage(args.data))
+        publisher = SnapshotPublisher(system, args.out)
+        start = time.perf_counter()
+        version = publisher.publish()
+        print(f"Published version {version} of {args.out} ({os.path.getsize(args.out):,} bytes) "
+              f"in {time.perf_counter() - start:.2f}s")
+        system.storage.close()
+    else:
+        try:
+            serve(args.snapshot, args.host, args.port, max(1, args.workers))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
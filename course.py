@@ -1,11 +1,35 @@
 """
 course.py
 Model for an academic course. The `Course` class stores identifying
-information (id, name, instructor, schedule, capacity) and the list of
-currently enrolled students. It provides small helper methods used by
-the application code to check capacity and manage enrollments.
+information (id, name, instructor, schedule, capacity) and the
+insertion-ordered set of currently enrolled students. It provides small
+helper methods used by the application code to check capacity and
+manage enrollments.
+
+When the course is full, students can join its `Waitlist`. Whenever a
+seat frees up, `promote_next` gives it to the student at the front.
+
+Each course carries its credit value and, optionally, its registration
+`rules` (prerequisites and the like, see rules.py). `bit` is the course's
+bit in the rule engine's bitsets, set when the course is added to the
+system.
+
+A course can have one `listener` (the system's `EnrollmentStats`) which
+is told about every enrollment change, so running totals stay current.
+The listener keeps the course's fill bucket and the counters it adds to
+in `fill_bucket` and `stats_counters`, so a change needs no lookups.
+
+Courses are slotted, and the instructor and schedule strings are interned.
+Thousands of sections share a few hundred instructors and meeting
+patterns, so each distinct string is stored once.
 """
 
+import sys
+
+from ordered_set import OrderedSet
+from schedule import parse_schedule
+from waitlist import Waitlist
+
 
 class Course:
     # OOP - Encapsulation:
@@ -15,13 +39,34 @@ class Course:
     # OOP - Abstraction:
     # Methods like `is_full` provide a simple interface hiding the internal
     # representation of enrolled students.
-    def __init__(self, course_id, course_name, instructor, schedule, max_students):
+
+    __slots__ = ("course_id", "course_name", "instructor", "schedule", "max_students",
+                 "enrolled_students", "time_intervals", "waitlist", "listener", "credits", "rules", "bit",
+                 "fill_bucket", "stats_counters")
+
+    # Maximum number of students waiting for one course.
+    WAITLIST_SIZE = 50
+    # Credits of a course that does not say otherwise.
+    DEFAULT_CREDITS = 3
+    # Largest capacity a course may be given.
+    MAX_CAPACITY = 100_000
+
+    def __init__(self, course_id, course_name, instructor, schedule, max_students, credits=None):
         self.course_id = course_id
         self.course_name = course_name
-        self.instructor = instructor
-        self.schedule = schedule
+        self.instructor = sys.intern(instructor)
+        self.schedule = sys.intern(schedule)
         self.max_students = max_students
-        self.enrolled_students = []
+        self.enrolled_students = OrderedSet()
+        # Parsed once here; None when the schedule text is not recognised.
+        self.time_intervals = parse_schedule(schedule)
+        self.waitlist = Waitlist(self.WAITLIST_SIZE)
+        self.listener = None
+        self.fill_bucket = 0
+        self.stats_counters = ()
+        self.credits = self.DEFAULT_CREDITS if credits is None else credits
+        self.rules = None
+        self.bit = 0
 
     def get_course_id(self):
         return self.course_id
@@ -35,18 +80,73 @@ class Course:
     def get_schedule(self):
         return self.schedule
 
+    def get_time_intervals(self):
+        return self.time_intervals
+
     def get_max_students(self):
         return self.max_students
 
+    def get_credits(self):
+        return self.credits
+
+    def get_rules(self):
+        return self.rules
+
     def get_enrolled_students(self):
         return self.enrolled_students
 
+    # True for a whole number of seats from 0 to MAX_CAPACITY.
+    @classmethod
+    def is_valid_capacity(cls, max_students):
+        return (isinstance(max_students, int) and not isinstance(max_students, bool)
+                and 0 <= max_students <= cls.MAX_CAPACITY)
+
     def is_full(self):
         return len(self.enrolled_students) >= self.max_students
 
+    # OOP - Polymorphism:
+    # Any object with enrollment_changed(course, delta) can listen.
     def add_student(self, student):
-        self.enrolled_students.append(student)
+        if student in self.enrolled_students:
+            return
+        self.enrolled_students.add(student)
+        if self.listener is not None:
+            self.listener.enrollment_changed(self, 1)
 
     def remove_student(self, student):
-        if student in self.enrolled_students:
-            self.enrolled_students.remove(student)
\ No newline at end of file
+        if student not in self.enrolled_students:
+            return
+        self.enrolled_students.discard(student)
+        if self.listener is not None:
+            self.listener.enrollment_changed(self, -1)
+
+    def get_waitlist(self):
+        return self.waitlist
+
+    # True when someone other than `student` is first in line for a seat.
+    def has_waitlist_ahead_of(self, student):
+        first = self.waitlist.peek()
+        return first is not None and first is not student
+
+    # Give one free seat to the student at the front of the waitlist.
+    # Returns (student, reason). reason is None when the student was
+    # enrolled. Otherwise it says why they could not be (for example, a
+    # time conflict) and they are taken off the waitlist. Returns
+    # (None, None) when there is no free seat or nobody is waiting.
+    def promote_next(self):
+        if self.is_full():
+            return None, None
+        student = self.waitlist.peek()
+        if student is None:
+            return None, None
+        reason = student.check_registration(self)
+        if reason is None:
+            student.enroll(self)
+        else:
+            student.remove_from_waitlist(self)
+        return student, reason
+
+    # Take every waiting student off the waitlist (used when the course is deleted).
+    def clear_waitlist(self):
+        for student in self.waitlist:
+            student.remove_from_waitlist(self)
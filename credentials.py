@@ -0,0 +1,94 @@
+"""
+credentials.py
+Password hashing for user accounts, using only the standard library.
+
+Passwords are stored as salted PBKDF2-HMAC-SHA256 hashes in the form
+
+    pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>
+
+so the iteration count can be raised later without invalidating existing
+hashes. Plaintext passwords found in older data files are still accepted
+by `verify_password`; `RegistrationSystem` replaces each with its hash at
+the user's first successful login (or all at once with
+`main.py --migrate-passwords`).
+
+Checking a hash is deliberately slow (tens of milliseconds). `LoginCache`
+remembers recent successful logins so a user who signs in again within a
+session does not pay that cost twice. Its keys are keyed digests, never
+passwords.
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from collections import OrderedDict
+
+ALGORITHM = "pbkdf2_sha256"
+ITERATIONS = 200_000
+SALT_BYTES = 16
+
+
+def hash_password(password, iterations=ITERATIONS):
+    salt = os.urandom(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{ALGORITHM}${iterations}${salt.hex()}${digest.hex()}"
+
+
+def is_hashed(stored):
+    return stored.startswith(ALGORITHM + "$")
+
+
+def verify_password(password, stored):
+    if not is_hashed(stored):
+        # Not migrated yet: plaintext from an old data file.
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    try:
+        _, iterations, salt, expected = stored.split("$")
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"),
+                                     bytes.fromhex(salt), int(iterations))
+    except ValueError:
+        print("Ignoring malformed password hash.")
+        return False
+    return hmac.compare_digest(digest.hex(), expected)
+
+
+class LoginCache:
+    # OOP - Encapsulation:
+    # A bounded LRU set of (user id, stored hash, keyed password digest)
+    # for logins that already passed the full check. The digest key is
+    # random per process, and the stored hash is part of the entry, so a
+    # password change invalidates it.
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._key = secrets.token_bytes(32)
+        self._lock = threading.Lock()
+
+    def _entry(self, user, password):
+        digest = hmac.new(self._key, password.encode("utf-8"), hashlib.sha256).digest()
+        return user.get_user_id(), user.password, digest
+
+    def contains(self, user, password):
+        entry = self._entry(user, password)
+        with self._lock:
+            if entry not in self._entries:
+                return False
+            self._entries.move_to_end(entry)
+            return True
+
+    def add(self, user, password):
+        entry = self._entry(user, password)
+        with self._lock:
+            self._entries[entry] = None
+            self._entries.move_to_end(entry)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,181 @@
+"""
+enrollment_stats.py
+Defines `EnrollmentStats`, running enrollment counters for the admin
+capacity dashboard.
+
+The counters cover each instructor and each department (the letters at
+the start of the course id, e.g. "MATH" for MATH201). Every course is
+also filed in a fill-rate bucket, one per whole percent (0-100; over-full
+sections share the 100 bucket). Courses report each enrollment change
+to their `listener` (see `Course.add_student`/`remove_student`), so the
+counters are updated in O(1) as students register and drop. Nothing
+needs to walk the catalog to answer:
+
+- the fill rate of a course, or the seats left in a department or for an
+  instructor;
+- the N fullest sections, by walking the buckets from the top;
+- the sections at or above a fill threshold, e.g. 90%.
+
+Enrollment changes take no lock of their own. The caller already holds
+the course's lock (see registration_service.py), which covers the
+course's bucket. The counters shared with other courses change by one
+in-place addition each, which the GIL does not interleave with another
+thread's. Adding or removing courses, and queries that walk the buckets,
+take `_lock`, and the queries copy each bucket before filtering it.
+
+`write_csv` exports one row per course for spreadsheets.
+"""
+
+import csv
+import math
+import re
+import threading
+
+_DEPARTMENT = re.compile(r"[A-Za-z]*")
+BUCKETS = 101
+
+
+def department_of(course_id):
+    # "MATH201" -> "MATH"; ids without leading letters have no department ("").
+    return _DEPARTMENT.match(course_id).group().upper()
+
+
+def fill_rate(course):
+    if course.max_students <= 0:
+        return 1.0
+    return len(course.enrolled_students) / course.max_students
+
+
+def _bucket(course):
+    # Whole percent full, in integers so 29/100 lands in bucket 29, not 28.
+    if course.max_students <= 0:
+        return BUCKETS - 1
+    return min(BUCKETS - 1, len(course.enrolled_students) * 100 // course.max_students)
+
+
+class EnrollmentStats:
+    # OOP - Encapsulation:
+    # Counters are [sections, seats, enrolled] lists keyed by instructor
+    # and by department, plus a set of courses per fill bucket. Each
+    # tracked course holds its bucket and its three counters (overall,
+    # instructor, department) itself, so an enrollment change does no
+    # lookups. All of this is private; queries return plain numbers,
+    # tuples and lists.
+    def __init__(self, courses=()):
+        self._lock = threading.Lock()
+        self._by_instructor = {}
+        self._by_department = {}
+        self._buckets = [set() for _ in range(BUCKETS)]
+        self._tracked = set()
+        self._totals = [0, 0, 0]
+        for course in courses:
+            self.add_course(course)
+
+    # Start tracking `course` (and become its listener).
+    def add_course(self, course):
+        with self._lock:
+            if course in self._tracked:
+                return
+            counters = (self._totals,
+                        self._by_instructor.setdefault(course.instructor, [0, 0, 0]),
+                        self._by_department.setdefault(department_of(course.course_id), [0, 0, 0]))
+            enrolled = len(course.enrolled_students)
+            for counter in counters:
+                counter[0] += 1
+                counter[1] += course.max_students
+                counter[2] += enrolled
+            course.fill_bucket = _bucket(course)
+            course.stats_counters = counters
+            self._buckets[course.fill_bucket].add(course)
+            self._tracked.add(course)
+            course.listener = self
+
+    def remove_course(self, course):
+        with self._lock:
+            if course not in self._tracked:
+                return
+            self._tracked.discard(course)
+            self._buckets[course.fill_bucket].discard(course)
+            enrolled = len(course.enrolled_students)
+            for counter in course.stats_counters:
+                counter[0] -= 1
+                counter[1] -= course.max_students
+                counter[2] -= enrolled
+            course.stats_counters = ()
+            course.listener = None
+
+    # Called by Course after a student was added (+1) or removed (-1),
+    # with the course's lock held (no lock here, see the module docstring).
+    def enrollment_changed(self, course, delta):
+        totals, instructor, department = course.stats_counters
+        totals[2] += delta
+        instructor[2] += delta
+        department[2] += delta
+        bucket = _bucket(course)
+        if bucket != course.fill_bucket:
+            self._buckets[course.fill_bucket].discard(course)
+            self._buckets[bucket].add(course)
+            course.fill_bucket = bucket
+
+    # (sections, seats, enrolled) overall, or for one instructor/department.
+    def totals(self):
+        return tuple(self._totals)
+
+    def instructor_totals(self, instructor):
+        return tuple(self._by_instructor.get(instructor, (0, 0, 0)))
+
+    def department_totals(self, department):
+        return tuple(self._by_department.get(department.upper(), (0, 0, 0)))
+
+    def seats_remaining(self, department=None, instructor=None):
+        if instructor is not None:
+            _, seats, enrolled = self.instructor_totals(instructor)
+        elif department is not None:
+            _, seats, enrolled = self.department_totals(department)
+        else:
+            _, seats, enrolled = self._totals
+        return max(0, seats - enrolled)
+
+    # {name: (sections, seats, enrolled)}, skipping names with no sections.
+    def instructor_summary(self):
+        return {name: tuple(c) for name, c in sorted(self._by_instructor.items()) if c[0]}
+
+    def department_summary(self):
+        return {name: tuple(c) for name, c in sorted(self._by_department.items()) if c[0]}
+
+    # The `n` fullest sections, fullest first (ties by course id).
+    def top_fullest(self, n=10):
+        found = []
+        with self._lock:
+            for bucket in reversed(self._buckets):
+                found.extend(bucket)
+                if len(found) >= n:
+                    break
+        found.sort(key=lambda c: (-fill_rate(c), c.course_id))
+        return found[:n]
+
+    # Sections at least `percent` full, fullest first.
+    def sections_at_least(self, percent):
+        # The buckets are already in order, so only each bucket is sorted.
+        found = []
+        lowest = min(BUCKETS - 1, max(0, math.floor(percent)))
+        with self._lock:
+            for bucket in range(BUCKETS - 1, lowest - 1, -1):
+                found += sorted((c for c in list(self._buckets[bucket]) if fill_rate(c) * 100 >= percent),
+                                key=lambda c: (-fill_rate(c), c.course_id))
+        return found
+
+    def write_csv(self, file):
+        writer = csv.writer(file)
+        writer.writerow(["course_id", "department", "instructor", "enrolled", "capacity",
+                         "seats_left", "fill_percent"])
+        with self._lock:
+            courses = sorted(self._tracked, key=lambda c: c.course_id)
+        for course in courses:
+            enrolled = len(course.enrolled_students)
+            writer.writerow([course.course_id, department_of(course.course_id), course.instructor,
+                             enrolled, course.max_students, max(0, course.max_students - enrolled),
+                             f"{fill_rate(course) * 100:.1f}"])
+
+    def __len__(self):
+        return len(self._tracked)
@@ -0,0 +1,203 @@
+"""
+headless.py
+Runs a script of operations against one loaded `RegistrationSystem`
+without any prompts, so whole registration days can be replayed at
+machine speed:
+
+    python main.py --data day.json --script ops.txt [--output results.jsonl]
+    cat ops.jsonl | python main.py --script -
+
+Every input line is one operation, either as JSON:
+
+    {"op": "login", "username": "john", "password": "password1"}
+    {"op": "register", "course_id": "CS101"}
+
+or as a command with space-separated (shell-quoted) arguments:
+
+    login john password1
+    register CS101
+    create_course BIO200 "Cell Biology" "Dr. Lee" "TTH 10-11:15" 40
+    delete_course CS101 force      (drops the enrolled students first)
+
+Blank lines and lines starting with "#" are skipped. Operations run
+through `RegistrationService`, so they are checked and journaled exactly
+as server requests are. Student operations act for the logged-in
+student. An admin may name one with `student_id` (first argument in
+command form). Admin operations need an admin login.
+
+One JSON result is written per operation, e.g.
+{"line": 2, "op": "register", "status": "ok"}. Statuses are the
+service's codes plus "forbidden", "not_logged_in",
+"invalid_credentials" and "error" (bad input). The data is saved once
+at the end.
+"""
+
+import contextlib
+import json
+import shlex
+import sys
+import time
+
+from admin import Admin
+from student import Student
+from registration_service import RegistrationService, OK
+
+NOT_LOGGED_IN = "not_logged_in"
+FORBIDDEN = "forbidden"
+INVALID_CREDENTIALS = "invalid_credentials"
+ERROR = "error"
+
+STUDENT, ADMIN = "student", "admin"
+
+# op: (argument names in command form, role needed). "force" is optional.
+OPERATIONS = {
+    "login": (("username", "password"), None),
+    "logout": ((), None),
+    "register": (("course_id",), STUDENT),
+    "drop": (("course_id",), STUDENT),
+    "waitlist": (("course_id",), STUDENT),
+    "leave_waitlist": (("course_id",), STUDENT),
+    "create_course": (("course_id", "course_name", "instructor", "schedule", "max_students"), ADMIN),
+    "delete_course": (("course_id", "force"), ADMIN),
+    "add_student": (("username", "password"), ADMIN),
+    "delete_student": (("student_id",), ADMIN),
+}
+
+
+def parse_line(line):
+    # Return (op, {argument: value}); raises ValueError for bad input.
+    if line.startswith("{"):
+        try:
+            args = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"invalid JSON: {error.msg}") from None
+        if not isinstance(args, dict):
+            raise ValueError("expected a JSON object")
+        op = args.pop("op", None)
+        if op not in OPERATIONS:
+            raise ValueError(f"unknown op: {op!r}")
+        return op, {key: str(value) for key, value in args.items()}
+
+    words = shlex.split(line)
+    op, values = words[0], words[1:]
+    if op not in OPERATIONS:
+        raise ValueError(f"unknown op: {op!r}")
+    names, role = OPERATIONS[op]
+    if role == STUDENT and len(values) == len(names) + 1:
+        names = ("student_id",) + names
+    if names[-1] == "force" and len(values) == len(names) - 1:
+        names = names[:-1]
+    if len(values) != len(names):
+        raise ValueError(f"{op} takes {len(names)} argument(s): {' '.join(names)}")
+    return op, dict(zip(names, values))
+
+
+class HeadlessSession:
+    # OOP - Encapsulation:
+    # Holds the service and the currently logged-in user; `execute` checks
+    # the role an operation needs and returns a result dict.
+    def __init__(self, system):
+        self.system = system
+        # Every change is journaled; the snapshot is written once, at the end.
+        self.service = RegistrationService(system, checkpoints=False)
+        self.user = None
+
+    def execute(self, op, args):
+        names, role = OPERATIONS[op]
+        missing = [name for name in names if name not in args and name != "force"]
+        if missing:
+            raise ValueError(f"{op} needs {', '.join(missing)}")
+        if op == "login":
+            return self.login(args["username"], args["password"])
+        if op == "logout":
+            self.user = None
+            return {"status": OK}
+        if self.user is None:
+            return {"status": NOT_LOGGED_IN}
+        if role == ADMIN:
+            if not isinstance(self.user, Admin):
+                return {"status": FORBIDDEN}
+            return self.admin_operation(op, args)
+
+        student_id = args.get("student_id")
+        if isinstance(self.user, Student):
+            if student_id not in (None, self.user.get_user_id()):
+                return {"status": FORBIDDEN}
+            student_id = self.user.get_user_id()
+        elif student_id is None:
+            raise ValueError(f"an admin must give the student_id for {op}")
+        action = {"register": self.service.register, "drop": self.service.drop,
+                  "waitlist": self.service.join_waitlist,
+                  "leave_waitlist": self.service.leave_waitlist}[op]
+        return {"status": action(student_id, args["course_id"])}
+
+    def login(self, username, password):
+        self.user = self.system.authenticate(username, password)
+        if self.user is None:
+            return {"status": INVALID_CREDENTIALS}
+        role = ADMIN if isinstance(self.user, Admin) else STUDENT
+        return {"status": OK, "user_id": self.user.get_user_id(), "role": role}
+
+    def admin_operation(self, op, args):
+        if op == "create_course":
+            try:
+                max_students = int(args["max_students"])
+            except ValueError:
+                raise ValueError("max_students must be a number") from None
+            return {"status": self.service.create_course(args["course_id"], args["course_name"],
+                                                         args["instructor"], args["schedule"],
+                                                         max_students)}
+        if op == "delete_course":
+            force = args.get("force", "").lower() in ("force", "1", "true", "yes")
+            return {"status": self.service.delete_course(args["course_id"], force)}
+        if op == "add_student":
+            status, student_id = self.service.add_student(args["username"], args["password"])
+            return {"status": status, "user_id": student_id}
+        return {"status": self.service.delete_student(args["student_id"])}
+
+
+def run_script(system, lines, out):
+    # Execute every line, writing one JSON result per operation to `out`;
+    # returns {status: count}. The data is saved once at the end.
+    session = HeadlessSession(system)
+    counts = {}
+    try:
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            op = None
+            try:
+                op, args = parse_line(line)
+                result = session.execute(op, args)
+            except ValueError as error:
+                result = {"status": ERROR, "error": str(error)}
+            out.write(json.dumps({"line": number, "op": op, **result}) + "\n")
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+    finally:
+        system.storage.checkpoint(system)
+    return counts
+
+
+def run_file(system, path, output=None):
+    # Run the script at `path` ("-" for stdin), writing results to `output`
+    # (a path, or stdout), then print a summary to stderr.
+    source = sys.stdin if path == "-" else open(path)
+    out = sys.stdout if output in (None, "-") else open(output, "w")
+    start = time.perf_counter()
+    try:
+        # Anything printed along the way goes to stderr, keeping the
+        # results on stdout machine-readable.
+        with contextlib.redirect_stdout(sys.stderr):
+            counts = run_script(system, source, out)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    summary = ", ".join(f"{status}={count}" for status, count in sorted(counts.items()))
+    print(f"{total} operations in {elapsed:.2f}s ({total / elapsed if elapsed else 0:,.0f}/s): {summary}",
+          file=sys.stderr)
+    return counts
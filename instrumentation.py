@@ -0,0 +1,236 @@
+"""
+instrumentation.py
+Optional timers, counters and latency histograms around the system's hot
+paths, plus cProfile/tracemalloc capture, for finding regressions in
+real sessions.
+
+Nothing is measured unless instrumentation is switched on, either with
+`--metrics FILE` (and optionally `--profile cprofile|tracemalloc`) on
+`main.py`/`server.py`, or with the environment variables:
+
+    UNIREG_METRICS=metrics.json UNIREG_PROFILE=tracemalloc python main.py
+
+When it is off, no wrapper is installed and the methods are the plain
+ones, so there is no cost at all. When it is on, `configure` replaces
+each method listed in `HOT_PATHS` on its class with a wrapper that:
+
+- times the call into a `Histogram` (power-of-two nanosecond buckets);
+- counts errors and, for the methods marked to count results, each
+  outcome: `true`/`false` (truthiness), or the status string itself for
+  service calls, e.g. `RegistrationService.register.full`.
+
+At exit the metrics are written to the metrics file as JSON. With
+`--profile cprofile` the cProfile statistics also go to `<FILE>.prof`
+(open with `python -m pstats`). With `--profile tracemalloc` the peak
+traced memory and the top allocation sites are added to the JSON.
+"""
+
+import atexit
+import cProfile
+import functools
+import importlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+METRICS_ENV = "UNIREG_METRICS"
+PROFILE_ENV = "UNIREG_PROFILE"
+PROFILE_MODES = ("cprofile", "tracemalloc")
+TOP_ALLOCATIONS = 20
+
+# (module, class, method, count results) for every instrumented entry point.
+# `login` includes the time spent typing at the prompt; `authenticate` is
+# the credential check alone.
+HOT_PATHS = [
+    ("registration_system", "RegistrationSystem", "load_data", False),
+    ("registration_system", "RegistrationSystem", "save_data", False),
+    ("registration_system", "RegistrationSystem", "login", True),
+    ("registration_system", "RegistrationSystem", "authenticate", True),
+    ("registration_system", "RegistrationSystem", "register_student_for_course", False),
+    ("registration_system", "RegistrationSystem", "drop_student_course", False),
+    ("student", "Student", "register_course", True),
+    ("student", "Student", "has_time_conflict", True),
+    ("registration_service", "RegistrationService", "register", True),
+    ("registration_service", "RegistrationService", "drop", True),
+    ("storage", "JsonStorage", "record", False),
+    ("storage", "JsonStorage", "save", False),
+    ("sqlite_storage", "SqliteStorage", "record", False),
+    ("sqlite_storage", "SqliteStorage", "save", False),
+]
+
+
+class Histogram:
+    # OOP - Encapsulation:
+    # Bucket i counts durations of up to 2**i nanoseconds. Percentiles are
+    # read from the buckets, so they are upper bounds within a factor of 2;
+    # count, total, min and max are exact.
+    __slots__ = ("count", "total_ns", "min_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.buckets = [0] * 64
+
+    def add(self, ns):
+        self.count += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.buckets[min(63, ns.bit_length())] += 1
+
+    def percentile(self, fraction):
+        # Upper bound (ns) of the bucket holding the `fraction` quantile.
+        target = fraction * self.count
+        seen = 0
+        for bucket, hits in enumerate(self.buckets):
+            seen += hits
+            if hits and seen >= target:
+                return min(2 ** bucket, self.max_ns)
+        return self.max_ns
+
+    def to_dict(self):
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ns / 1e6, 3),
+            "mean_us": round(self.total_ns / self.count / 1e3, 3),
+            "min_us": round(self.min_ns / 1e3, 3),
+            "p50_us": round(self.percentile(0.5) / 1e3, 3),
+            "p90_us": round(self.percentile(0.9) / 1e3, 3),
+            "p99_us": round(self.percentile(0.99) / 1e3, 3),
+            "max_us": round(self.max_ns / 1e3, 3),
+            "buckets_ns": {f"<={2 ** bucket}": hits for bucket, hits in enumerate(self.buckets) if hits},
+        }
+
+
+class Metrics:
+    # Named timers and counters, shared by every thread.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timers = {}
+        self.counters = {}
+
+    def observe(self, name, ns, outcome=None):
+        # Add one timing, and count `outcome` (a counter name) if given.
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = Histogram()
+            timer.add(ns)
+            if outcome is not None:
+                self.counters[outcome] = self.counters.get(outcome, 0) + 1
+
+    def to_dict(self):
+        with self._lock:
+            return {"timers": {name: timer.to_dict() for name, timer in sorted(self.timers.items())},
+                    "counters": dict(sorted(self.counters.items()))}
+
+
+metrics = Metrics()
+_installed = []
+
+
+def instrument(cls, method_name, count_results=False):
+    # Replace cls.method_name with a timing wrapper (done once per method).
+    original = getattr(cls, method_name)
+    name = f"{cls.__name__}.{method_name}"
+    true, false, error = f"{name}.true", f"{name}.false", f"{name}.error"
+    clock = time.perf_counter_ns
+    observe = metrics.observe
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            result = original(*args, **kwargs)
+        except BaseException:
+            observe(name, clock() - start, error)
+            raise
+        if not count_results:
+            outcome = None
+        elif isinstance(result, str):
+            outcome = f"{name}.{result}"
+        else:
+            outcome = true if result else false
+        observe(name, clock() - start, outcome)
+        return result
+
+    _installed.append((cls, method_name, cls.__dict__.get(method_name)))
+    setattr(cls, method_name, wrapper)
+
+
+def uninstall():
+    # Put the original methods back (inherited ones are just unshadowed).
+    while _installed:
+        cls, method_name, own = _installed.pop()
+        if own is None:
+            delattr(cls, method_name)
+        else:
+            setattr(cls, method_name, own)
+
+
+def add_arguments(parser):
+    # --metrics/--profile; unset options fall back to the environment in configure.
+    parser.add_argument("--metrics", metavar="FILE",
+                        help=f"write timing metrics to FILE (JSON) at exit [${METRICS_ENV}]")
+    parser.add_argument("--profile", choices=PROFILE_MODES,
+                        help=f"also capture a cProfile or tracemalloc profile [${PROFILE_ENV}]")
+
+
+def configure(metrics_file=None, profile=None):
+    # Switch instrumentation on if a metrics file is given (or set in the
+    # environment). Returns True if it was switched on.
+    metrics_file = metrics_file or os.environ.get(METRICS_ENV)
+    profile = profile or os.environ.get(PROFILE_ENV) or None
+    if not metrics_file:
+        if profile:
+            print(f"--profile needs --metrics (or ${METRICS_ENV}); profiling is off.")
+        return False
+    if profile not in (None,) + PROFILE_MODES:
+        print(f"Unknown profile mode {profile!r}; choose from {', '.join(PROFILE_MODES)}.")
+        profile = None
+    if _installed:
+        return True
+
+    for module_name, class_name, method_name, count_results in HOT_PATHS:
+        cls = getattr(importlib.import_module(module_name), class_name)
+        instrument(cls, method_name, count_results)
+
+    profiler = None
+    if profile == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif profile == "tracemalloc":
+        tracemalloc.start()
+    atexit.register(dump, metrics_file, profiler)
+    return True
+
+
+def dump(metrics_file, profiler=None):
+    # Write the metrics (and any profile) collected so far.
+    report = metrics.to_dict()
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(metrics_file + ".prof")
+        report["cprofile"] = metrics_file + ".prof"
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATIONS]
+        report["tracemalloc"] = {
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "top": [{"where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                     "bytes": stat.size, "blocks": stat.count} for stat in top],
+        }
+    try:
+        with open(metrics_file, "w") as file:
+            json.dump(report, file, indent=2)
+    except OSError as error:
+        print(f"Could not write metrics to {metrics_file}: {error}")
@@ -0,0 +1,121 @@
+"""
+integrity.py
+Consistency checker for the course <-> student graph, run by
+`RegistrationSystem` after loading its data.
+
+Enrollments and waitlist entries are stored on both sides: each student
+holds the courses they take or wait for, and each course holds its
+students and its waitlist. `check_integrity` verifies that:
+
+- every course and student can be found through the system's index, and
+  course ids are unique;
+- every enrollment edge appears on both sides and joins a live student to
+  a live course, and no course holds more students than its capacity;
+- every waitlist entry appears on both sides, joins live endpoints, and
+  does not belong to a student already enrolled in that course;
+- each student's running credit total and course bitset match their
+  registered courses, and the prerequisite graph has no cycles (see
+  rules.py);
+- the running enrollment statistics match the actual totals.
+
+Each edge is visited a constant number of times, so the check is linear
+in the size of the data. It returns a list of human-readable problems,
+stopping after `limit`; an empty list means the graph is consistent.
+"""
+
+from student import Student
+
+
+def check_integrity(system, limit=100):
+    problems = []
+
+    def report(message):
+        problems.append(message)
+        return len(problems) >= limit
+
+    live_courses = set(system.courses)
+    live_students = set(system.students)
+    index = system.index
+
+    for course in system.courses:
+        found = index.find_course(course.get_course_id())
+        if found is not course:
+            what = "duplicate course id" if found is not None else "course missing from the index"
+            if report(f"{what}: {course.get_course_id()}"):
+                return problems
+    for student in system.students:
+        if index.find_user_by_id(student.get_user_id()) is not student:
+            if report(f"student missing from the index: {student.get_user_id()}"):
+                return problems
+
+    enrolled = seats = 0
+    for course in system.courses:
+        course_id = course.get_course_id()
+        students = course.get_enrolled_students()
+        enrolled += len(students)
+        seats += course.get_max_students()
+        if len(students) > course.get_max_students():
+            if report(f"{course_id} has {len(students)} students for {course.get_max_students()} seats"):
+                return problems
+        for student in students:
+            if student not in live_students:
+                message = f"{course_id} lists a deleted or unknown student: {_name(student)}"
+            elif course not in student.registered_courses:
+                message = f"{course_id} lists {student.get_user_id()}, who does not list it"
+            else:
+                continue
+            if report(message):
+                return problems
+        for student in course.get_waitlist():
+            if student not in live_students:
+                message = f"{course_id} waitlist has a deleted or unknown student: {_name(student)}"
+            elif course not in student.waitlisted_courses:
+                message = f"{course_id} waitlist has {student.get_user_id()}, who is not waiting for it"
+            elif course in student.registered_courses:
+                message = f"{student.get_user_id()} is both enrolled in and waitlisted for {course_id}"
+            else:
+                continue
+            if report(message):
+                return problems
+
+    for student in system.students:
+        student_id = student.get_user_id()
+        credits = bits = 0
+        for course in student.registered_courses:
+            credits += course.credits
+            bits |= course.bit
+        if (credits, bits) != (student.credits, student.registered_bits):
+            if report(f"{student_id} has running totals of {student.credits} credits / course bits "
+                      f"{student.registered_bits:#x}, but is registered for {credits} / {bits:#x}"):
+                return problems
+        for course in student.registered_courses:
+            if course not in live_courses:
+                message = f"{student_id} is enrolled in a deleted course: {course.get_course_id()}"
+            elif student not in course.get_enrolled_students():
+                message = f"{student_id} lists {course.get_course_id()}, which does not list them"
+            else:
+                continue
+            if report(message):
+                return problems
+        for course in student.waitlisted_courses:
+            if course not in live_courses:
+                message = f"{student_id} is waiting for a deleted course: {course.get_course_id()}"
+            elif student not in course.get_waitlist():
+                message = f"{student_id} waits for {course.get_course_id()}, whose waitlist lacks them"
+            else:
+                continue
+            if report(message):
+                return problems
+
+    for problem in system.rules.check_graph():
+        if report(problem):
+            return problems
+
+    expected = (len(system.courses), seats, enrolled)
+    if system.stats.totals() != expected:
+        report(f"enrollment statistics {system.stats.totals()} do not match the data {expected}")
+    return problems
+
+
+def _name(user):
+    return user.get_user_id() if isinstance(user, Student) else repr(user)
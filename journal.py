@@ -0,0 +1,82 @@
+"""
+journal.py
+Defines the `Journal` class, an append-only log of the operations that
+change the registry (creating/deleting courses and students, registering
+and dropping enrollments).
+
+Each operation is one JSON array per line: `["register", "S001", "CS101"]`.
+Appending costs the same no matter how large the catalog is; the full
+snapshot in `data.json` is only rewritten when the journal is compacted.
+On startup the snapshot is loaded and the journal replayed on top of it.
+A line cut short by a crash is detected on replay and discarded.
+"""
+
+import json
+import os
+
+
+class Journal:
+    # OOP - Encapsulation:
+    # The file handle and the count of entries since the last compaction are
+    # private; callers only append, replay and reset.
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self._file = None
+        self._entries = 0
+
+    def append(self, operation, *args):
+        self.append_many([(operation, *args)])
+
+    # Write several entries with a single flush (and fsync).
+    def append_many(self, entries):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        lines = [json.dumps(list(entry)) + "\n" for entry in entries]
+        self._file.write("".join(lines))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._entries += len(lines)
+
+    def replay(self):
+        # Yield (operation, args) for every complete entry. A torn or
+        # undecodable tail is truncated so later appends start on a clean line.
+        self.close()
+        self._entries = 0
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with file:
+            valid_until = 0
+            for line in file:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete entry")
+                    operation, *args = json.loads(line)
+                except ValueError:
+                    print(f"Discarding damaged journal entries after byte {valid_until}.")
+                    break
+                valid_until += len(line)
+                self._entries += 1
+                yield operation, args
+            else:
+                return
+        with open(self.path, "r+b") as file:
+            file.truncate(valid_until)
+
+    def reset(self):
+        # Called once the entries are safely part of a new snapshot.
+        self.close()
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+        self._entries = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return self._entries
@@ -0,0 +1,134 @@
+"""
+json_stream.py
+Incremental reading and writing of the `data.json` layout: a top-level
+object whose values are (mostly) arrays of records.
+
+`iter_json_items` reads the file in fixed-size chunks and yields one
+record at a time, so the caller can build objects while the file is
+being read instead of holding the whole parse tree in memory first.
+`write_json_sections` is the matching writer: it streams each record on
+its own line so saving never builds one big dict either.
+"""
+
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NEXT_CHAR = re.compile(r"[ \t\n\r]*([^ \t\n\r])")
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+class _ChunkReader:
+    # OOP - Encapsulation:
+    # Holds the unread part of the file in `buffer` and refills it on
+    # demand; the generator below only asks for the next character or the
+    # next complete JSON value.
+    def __init__(self, file, chunk_size):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop the consumed prefix so the buffer stays around one chunk long.
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def next_char(self):
+        while True:
+            match = _NEXT_CHAR.match(self.buffer, self.pos)
+            if match is not None:
+                self.pos = match.end()
+                return match.group(1)
+            if not self._fill():
+                raise json.JSONDecodeError("Unexpected end of data", self.buffer, self.pos)
+
+    def peek_char(self):
+        char = self.next_char()
+        self.pos -= 1
+        return char
+
+    def expect(self, expected):
+        char = self.next_char()
+        if char != expected:
+            raise json.JSONDecodeError(f"Expected {expected!r}", self.buffer, self.pos - 1)
+
+    def next_value(self):
+        while True:
+            start = _WHITESPACE.match(self.buffer, self.pos).end()
+            try:
+                value, end = _decoder.raw_decode(self.buffer, start)
+            except json.JSONDecodeError:
+                self.pos = start
+                if not self._fill():
+                    raise
+                continue
+            # A number cut off by the end of the buffer ("2." of "2.5") may
+            # continue in the next chunk; read more and decode again.
+            if (not self.eof and isinstance(value, (int, float))
+                    and self.buffer[end:].strip(_NUMBER_CHARS) == ""):
+                self.pos = start
+                if self._fill():
+                    continue
+            self.pos = end
+            return value
+
+
+def iter_json_items(file, chunk_size=CHUNK_SIZE):
+    """Yield (key, item) for every element of each top-level array.
+
+    Top-level values that are not arrays are yielded once as (key, value).
+    """
+    reader = _ChunkReader(file, chunk_size)
+    reader.expect("{")
+    if reader.peek_char() == "}":
+        return
+    while True:
+        key = reader.next_value()
+        reader.expect(":")
+        if reader.peek_char() == "[":
+            reader.expect("[")
+            if reader.peek_char() == "]":
+                reader.next_char()
+            else:
+                while True:
+                    yield key, reader.next_value()
+                    separator = reader.next_char()
+                    if separator == "]":
+                        break
+                    if separator != ",":
+                        raise json.JSONDecodeError("Expected ',' or ']'", reader.buffer, reader.pos - 1)
+        else:
+            yield key, reader.next_value()
+
+        separator = reader.next_char()
+        if separator == "}":
+            return
+        if separator != ",":
+            raise json.JSONDecodeError("Expected ',' or '}'", reader.buffer, reader.pos - 1)
+
+
+def write_json_sections(file, sections):
+    """Write a top-level object from (key, iterable of records) pairs.
+
+    Each record is written compactly on its own line, so the output is
+    valid JSON that still diffs and greps line by line.
+    """
+    file.write("{")
+    for i, (key, records) in enumerate(sections):
+        file.write(("," if i else "") + "\n    " + json.dumps(key) + ": [")
+        first = True
+        for record in records:
+            file.write(("\n        " if first else ",\n        ") + json.dumps(record))
+            first = False
+        file.write("\n    ]" if not first else "]")
+    file.write("\n}\n")
@@ -0,0 +1,207 @@
+"""
+lottery.py
+Registration windows for high-demand sections. Registrations are not
+first come, first served. Requests are collected while a window is open
+and resolved together in one batch pass when it closes:
+
+- `RegistrationWindow` queues (student_id, course_id) requests; a
+  submit is one append under a lock, so a spike of requests costs
+  almost nothing while the window is open.
+- `run_lottery` orders the requests and hands them to
+  `register_batch`, which honors `max_students` and time conflicts.
+
+The lottery runs in rounds: every student's first request is resolved
+before anyone's second, and so on (a request's `rank`, if given, comes
+before its position in the student's own requests). Within a round,
+students go in lottery order:
+
+- "random": a shuffle of the students, seeded, so the same requests
+  and seed always give the same result, whatever order they arrived in;
+- "seniority": by user id, lowest (longest-registered) first.
+
+With `waitlist=True`, a request that loses because the course is full
+puts the student on the course's waitlist, again in lottery order.
+
+    python lottery.py requests.csv [--seed 42] [--policy seniority]
+        [--waitlist] [--data data.json] [--out results.csv]
+
+The CSV is the one batch_registration.py reads; its `priority` column,
+if present, is used as the rank.
+"""
+
+import argparse
+import random
+import re
+import secrets
+import threading
+from collections import namedtuple
+
+from student import Student, COURSE_FULL, ALREADY_REGISTERED
+from batch_registration import BatchRequest, read_batch_csv, register_batch, write_results_csv
+
+POLICIES = ("random", "seniority")
+QUEUED = "queued"
+WINDOW_CLOSED = "window_closed"
+NOT_IN_WINDOW = "not_in_window"
+WAITLISTED = "waitlisted"
+
+LotteryOutcome = namedtuple("LotteryOutcome", "seed policy results waitlisted")
+
+_ID_NUMBER = re.compile(r"(\D*)(\d*)")
+
+
+def _seniority_key(student_id):
+    # "S9" before "S10": compare the prefix, then the number.
+    prefix, digits = _ID_NUMBER.match(student_id).groups()
+    return prefix, int(digits) if digits else -1, student_id
+
+
+def lottery_order(student_ids, policy="random", seed=0):
+    # {student_id: position}; independent of the order ids are given in.
+    if policy not in POLICIES:
+        raise ValueError(f"unknown lottery policy: {policy!r} (choose from {', '.join(POLICIES)})")
+    ordered = sorted(set(student_ids), key=_seniority_key)
+    if policy == "random":
+        random.Random(seed).shuffle(ordered)
+    return {student_id: position for position, student_id in enumerate(ordered)}
+
+
+def run_lottery(system, requests, seed=None, policy="random", waitlist=False, service=None):
+    # Resolve (student_id, course_id[, rank]) requests; returns a
+    # LotteryOutcome whose `results` are BatchResults in input order. With
+    # a `service`, registrations are paused while the lottery runs.
+    requests = [r if isinstance(r, BatchRequest) else BatchRequest(*r) for r in requests]
+    seed = secrets.randbits(32) if seed is None else seed
+    order = lottery_order((r.student_id for r in requests), policy, seed)
+
+    # Rank the requests once; register_batch then applies them in that
+    # order and still returns the results in input order.
+    # A student's nth request gets round * students + lottery position,
+    # an int, which sorts much faster than a tuple.
+    students = len(order)
+    nth = {}
+    keys = []
+    for request in requests:
+        round_ = nth[request.student_id] = nth.get(request.student_id, -1) + 1
+        keys.append(round_ * students + order[request.student_id])
+    if any(request.priority for request in requests):
+        keys = [(request.priority, key) for request, key in zip(requests, keys)]
+    ranking = sorted(range(len(requests)), key=keys.__getitem__)
+    position = [0] * len(requests)
+    for place, i in enumerate(ranking):
+        position[i] = place
+    batch = [BatchRequest(r.student_id, r.course_id, position[i]) for i, r in enumerate(requests)]
+
+    def resolve(system):
+        results = register_batch(system, batch)
+        waitlisted = _waitlist_losers(system, results, ranking) if waitlist else 0
+        return results, waitlisted
+
+    if service is not None:
+        results, waitlisted = service.run_exclusive(resolve)
+    else:
+        results, waitlisted = resolve(system)
+    return LotteryOutcome(seed, policy, results, waitlisted)
+
+
+def _waitlist_losers(system, results, ranking):
+    # Put students who lost a full course on its waitlist, in lottery
+    # order; their results become WAITLISTED.
+    recorded = []
+    for i in ranking:
+        result = results[i]
+        if result.status != COURSE_FULL:
+            continue
+        student = system.index.find_user_by_id(result.student_id)
+        course = system.find_course_by_id(result.course_id)
+        if isinstance(student, Student) and student.check_waitlist(course) is None:
+            student.add_to_waitlist(course)
+            recorded.append(("waitlist", student.get_user_id(), course.get_course_id()))
+            results[i] = result._replace(status=WAITLISTED)
+    if recorded:
+        system.storage.record_many(recorded)
+    return len(recorded)
+
+
+class RegistrationWindow:
+    # OOP - Encapsulation:
+    # Requests are only appended while the window is open; `close`
+    # resolves them once and keeps the outcome. Covered courses are kept
+    # by case-folded id (None covers every course).
+    def __init__(self, course_ids=None, seed=None, policy="random", waitlist=False):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown lottery policy: {policy!r} (choose from {', '.join(POLICIES)})")
+        self.course_ids = None if course_ids is None else list(course_ids)
+        self.course_keys = None if course_ids is None else {c.casefold() for c in self.course_ids}
+        self.seed = secrets.randbits(32) if seed is None else seed
+        self.policy = policy
+        self.waitlist = waitlist
+        self.outcome = None
+        self._lock = threading.Lock()
+        self._requests = []
+        self._seen = set()
+        self._closed = False
+
+    def covers(self, course_id):
+        return self.course_keys is None or course_id.casefold() in self.course_keys
+
+    # Returns QUEUED, or why the request was not queued.
+    def submit(self, student_id, course_id, rank=0):
+        if not self.covers(course_id):
+            return NOT_IN_WINDOW
+        key = (student_id, course_id.casefold())
+        with self._lock:
+            if self._closed:
+                return WINDOW_CLOSED
+            if key in self._seen:
+                return ALREADY_REGISTERED
+            self._seen.add(key)
+            self._requests.append(BatchRequest(student_id, course_id, rank))
+        return QUEUED
+
+    def is_closed(self):
+        return self._closed
+
+    def close(self, system, service=None):
+        # Stop taking requests and run the lottery (only the first call does).
+        with self._lock:
+            if self._closed:
+                return self.outcome
+            self._closed = True
+            requests, self._requests = self._requests, []
+        self.outcome = run_lottery(system, requests, self.seed, self.policy, self.waitlist, service)
+        return self.outcome
+
+    def __len__(self):
+        return len(self._requests)
+
+
+def main():
+    from registration_system import RegistrationSystem
+    from storage import open_storage
+
+    parser = argparse.ArgumentParser(description="Resolve a CSV of registration requests by lottery.")
+    parser.add_argument("requests", help="CSV with student_id, course_id[, priority] columns")
+    parser.add_argument("--seed", type=int, help="lottery seed (printed if not given)")
+    parser.add_argument("--policy", choices=POLICIES, default="random")
+    parser.add_argument("--waitlist", action="store_true", help="waitlist students who lose a full course")
+    parser.add_argument("--data", default=RegistrationSystem.DATA_FILE)
+    parser.add_argument("--out", help="write per-request results to this CSV")
+    args = parser.parse_args()
+
+    system = RegistrationSystem(storage=open_storage(args.data))
+    outcome = run_lottery(system, read_batch_csv(args.requests), args.seed, args.policy, args.waitlist)
+    system.storage.checkpoint(system)
+    system.storage.close()
+
+    counts = {}
+    for result in outcome.results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    print(f"{outcome.policy} lottery, seed {outcome.seed}: {len(outcome.results)} requests: "
+          + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+    if args.out:
+        write_results_csv(args.out, outcome.results)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,16 +9,43 @@ application logic.
 
 Running this file directly will start the interactive program; importing
 this module (for tests or inspection) will not start the program.
+
+    python main.py [--data data.json] [--no-sample-data]
+                   [--script ops.txt|- [--output results.jsonl]]
+                   [--metrics metrics.json] [--profile cprofile|tracemalloc]
+    python main.py [--data data.json] --migrate-passwords
+
+--script runs a file of operations without prompts (see headless.py);
+--migrate-passwords hashes every plaintext password from an old data
+file at once (otherwise each is hashed at its user's first login);
+--metrics/--profile switch on instrumentation (see instrumentation.py).
 """
 
-from registration_system import start_registration_system
+import argparse
+
+import instrumentation
+from registration_system import RegistrationSystem, start_registration_system
 
 
 def main():
+    parser = argparse.ArgumentParser(description="University Registration System")
+    parser.add_argument("--data", default=RegistrationSystem.DATA_FILE,
+                        help="data file (.json, or .db/.sqlite for SQLite)")
+    parser.add_argument("--no-sample-data", action="store_true",
+                        help="do not add the sample admin/students/courses to an empty system")
+    parser.add_argument("--script", metavar="FILE",
+                        help="run the operations in FILE ('-' for stdin) instead of the menus")
+    parser.add_argument("--output", metavar="FILE", help="write --script results here (default stdout)")
+    parser.add_argument("--migrate-passwords", action="store_true",
+                        help="hash every plaintext password in the data file, then exit")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args.metrics, args.profile)
     # Minimal logic in main: delegate to the registration_system module
-    start_registration_system()
+    start_registration_system(args.data, not args.no_sample_data, args.script, args.output,
+                              args.migrate_passwords)
 
 
 if __name__ == "__main__":
     # When executed as a script, run the application.
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,49 @@
+"""
+ordered_set.py
+Defines `OrderedSet`, a small insertion-ordered set built on a dict.
+
+Courses and students use it to hold their enrollments so that membership
+checks, additions and removals are constant time while iteration still
+follows registration order for display.
+"""
+
+
+class OrderedSet:
+    # OOP - Encapsulation:
+    # The backing dict is private; only the keys are meaningful (values are
+    # always None). Dicts preserve insertion order, which gives us ordering
+    # for free without a separate list.
+    __slots__ = ("_items",)
+
+    def __init__(self, items=()):
+        self._items = dict.fromkeys(items)
+
+    def add(self, item):
+        self._items[item] = None
+
+    # Kept so code written against the old list-based attributes still works.
+    append = add
+
+    def discard(self, item):
+        self._items.pop(item, None)
+
+    def remove(self, item):
+        del self._items[item]
+
+    def clear(self):
+        self._items.clear()
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def __repr__(self):
+        return f"OrderedSet({list(self._items)!r})"
@@ -0,0 +1,356 @@
+"""
+registration_service.py
+Defines `RegistrationService`, a thread-safe front for registering and
+dropping courses on a shared `RegistrationSystem`, for use when many
+sessions are served at once.
+
+`Student.register_course` checks `is_full` and then adds the student.
+Two threads can both pass the check before either adds, which oversells
+the seat. The service closes that gap by holding a lock per course and
+a lock per student while it checks and applies an enrollment, so the
+check and the seat decrement happen as one step. Requests for different
+courses and different students never wait for each other.
+
+Every operation acquires its locks in one global order (course locks by
+case-folded course id, then student locks by user id). A transaction
+over several courses therefore cannot deadlock with another one.
+Admin operations that add or remove whole courses or students, or change
+course rules and student records, pause all registrations while they
+run. Operations return short status strings instead of printing.
+
+A drop gives the freed seat to the first student on the course's waitlist.
+The freed seat cannot be taken by anyone else in the meantime, because
+`Student.check_registration` refuses students who are behind others in
+the queue.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from student import Student
+from course import Course
+from credentials import hash_password
+from rules import CourseRules, AcademicRecord
+
+# Status codes returned by the service (refusals reuse the codes from
+# Student.check_registration: "full", "conflict", "duplicate", and the
+# rule codes from rules.py such as "prerequisite" or "credit_limit").
+OK = "ok"
+UNKNOWN_STUDENT = "unknown_student"
+UNKNOWN_COURSE = "unknown_course"
+NOT_REGISTERED = "not_registered"
+ALREADY_EXISTS = "exists"
+NOT_EMPTY = "not_empty"
+NOT_WAITLISTED = "not_waitlisted"
+
+
+class _SharedExclusiveLock:
+    # Many registrations may run at once (shared); a checkpoint that walks
+    # the whole object graph needs them all to pause (exclusive).
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._shared = 0
+        self._exclusive = False
+
+    @contextmanager
+    def shared(self):
+        with self._condition:
+            while self._exclusive:
+                self._condition.wait()
+            self._shared += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._shared -= 1
+                if not self._shared:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._condition:
+            while self._exclusive:
+                self._condition.wait()
+            self._exclusive = True
+            while self._shared:
+                self._condition.wait()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._exclusive = False
+                self._condition.notify_all()
+
+
+class RegistrationService:
+    # OOP - Abstraction:
+    # Callers ask for "register S001 in CS101"; the service resolves the
+    # ids, takes the right locks in the right order, checks, applies and
+    # records the change, and tells them what happened.
+    # With `checkpoints=False` storage is never checkpointed along the way;
+    # the caller does it once when it is done (see headless.py).
+    def __init__(self, system, checkpoints=True):
+        self.system = system
+        self.checkpoints = checkpoints
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._gate = _SharedExclusiveLock()
+
+    def _lock_for(self, key):
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(key, threading.Lock())
+        return lock
+
+    @contextmanager
+    def _locked(self, courses, students):
+        # Sorting the keys gives every thread the same acquisition order.
+        # Yields OK, or UNKNOWN_COURSE / UNKNOWN_STUDENT when an admin
+        # deleted one of the objects after it was looked up and before the
+        # locks were held.
+        keys = sorted({("course", c.get_course_id().casefold()) for c in courses}
+                      | {("student", s.get_user_id()) for s in students})
+        locks = [self._lock_for(key) for key in keys]
+        with self._gate.shared():
+            for lock in locks:
+                lock.acquire()
+            try:
+                if not all(course in self.system.courses for course in courses):
+                    yield UNKNOWN_COURSE
+                elif not all(student in self.system.students for student in students):
+                    yield UNKNOWN_STUDENT
+                else:
+                    yield OK
+            finally:
+                for lock in reversed(locks):
+                    lock.release()
+        self._maybe_checkpoint()
+
+    # Holds off admin operations, and changes to the given students' own
+    # registrations and waitlists, while the caller reads them. Yields OK,
+    # or UNKNOWN_STUDENT when one of them has been deleted.
+    @contextmanager
+    def reading(self, students=()):
+        with self._locked([], students) as status:
+            yield status
+
+    def _maybe_checkpoint(self):
+        storage = self.system.storage
+        if self.checkpoints and storage.needs_checkpoint():
+            with self._gate.exclusive():
+                if storage.needs_checkpoint():
+                    storage.checkpoint(self.system)
+
+    def _resolve(self, student_id, course_ids):
+        student = self.system.index.find_user_by_id(student_id)
+        if not isinstance(student, Student):
+            return UNKNOWN_STUDENT, None, None
+        courses = []
+        for course_id in course_ids:
+            course = self.system.find_course_by_id(course_id)
+            if course is None:
+                return UNKNOWN_COURSE, student, None
+            courses.append(course)
+        return OK, student, courses
+
+    def register(self, student_id, course_id):
+        status, student, courses = self._resolve(student_id, [course_id])
+        if status != OK:
+            return status
+        course = courses[0]
+        with self._locked(courses, [student]) as status:
+            if status != OK:
+                return status
+            reason = student.check_registration(course)
+            if reason is not None:
+                return reason
+            student.enroll(course)
+            self.system.storage.record("register", student.get_user_id(), course.get_course_id())
+        return OK
+
+    def drop(self, student_id, course_id):
+        status, student, courses = self._resolve(student_id, [course_id])
+        if status != OK:
+            return status
+        course = courses[0]
+        with self._locked(courses, [student]) as status:
+            if status != OK:
+                return status
+            if course not in student.get_registered_courses():
+                return NOT_REGISTERED
+            student.unenroll(course)
+            self.system.storage.record("drop", student.get_user_id(), course.get_course_id())
+        self._fill_from_waitlist(course)
+        return OK
+
+    def _fill_from_waitlist(self, course):
+        # Each promotion locks the course and the student at the front of
+        # the waitlist. The front may change before the locks are held, so
+        # it is checked again under them.
+        while True:
+            # peek() may discard stale entries, so it needs the course lock.
+            with self._locked([course], []) as status:
+                if status != OK:
+                    return
+                student = course.get_waitlist().peek()
+                if student is None or course.is_full():
+                    return
+            with self._locked([course], [student]) as status:
+                # A deleted course ends the loop at the next pass; a deleted
+                # student has left the waitlist, so the next one is tried.
+                if status != OK or course.get_waitlist().peek() is not student:
+                    continue
+                promoted, reason = course.promote_next()
+                if promoted is None:
+                    return
+                operation = "register" if reason is None else "unwaitlist"
+                self.system.storage.record(operation, promoted.get_user_id(), course.get_course_id())
+
+    def join_waitlist(self, student_id, course_id):
+        # Refusals reuse the codes from Student.check_waitlist.
+        status, student, courses = self._resolve(student_id, [course_id])
+        if status != OK:
+            return status
+        course = courses[0]
+        with self._locked(courses, [student]) as status:
+            if status != OK:
+                return status
+            reason = student.check_waitlist(course)
+            if reason is not None:
+                return reason
+            student.add_to_waitlist(course)
+            self.system.storage.record("waitlist", student.get_user_id(), course.get_course_id())
+        return OK
+
+    def leave_waitlist(self, student_id, course_id):
+        status, student, courses = self._resolve(student_id, [course_id])
+        if status != OK:
+            return status
+        course = courses[0]
+        with self._locked(courses, [student]) as status:
+            if status != OK:
+                return status
+            if course not in student.waitlisted_courses:
+                return NOT_WAITLISTED
+            student.remove_from_waitlist(course)
+            self.system.storage.record("unwaitlist", student.get_user_id(), course.get_course_id())
+        # A free seat held for this student now goes to the next in line.
+        self._fill_from_waitlist(course)
+        return OK
+
+    def register_all(self, student_id, course_ids):
+        # All-or-nothing registration for several courses. Returns
+        # (status, course_id) where course_id is the course that failed.
+        status, student, courses = self._resolve(student_id, course_ids)
+        if status != OK:
+            return status, None
+        with self._locked(courses, [student]) as status:
+            if status != OK:
+                return status, None
+            added = []
+            for course in courses:
+                reason = student.check_registration(course)
+                if reason is not None:
+                    for done in reversed(added):
+                        student.unenroll(done)
+                    return reason, course.get_course_id()
+                student.enroll(course)
+                added.append(course)
+            for course in added:
+                self.system.storage.record("register", student.get_user_id(), course.get_course_id())
+        return OK, None
+
+    # Admin operations: these change the catalog itself, so they run alone.
+    # Raises ValueError for a capacity outside 0..Course.MAX_CAPACITY.
+    def create_course(self, course_id, course_name, instructor, schedule, max_students):
+        if not Course.is_valid_capacity(max_students):
+            raise ValueError(f"max_students must be a whole number from 0 to {Course.MAX_CAPACITY}")
+        with self._gate.exclusive():
+            if self.system.find_course_by_id(course_id) is not None:
+                return ALREADY_EXISTS
+            self.system.add_course(Course(course_id, course_name, instructor, schedule, max_students))
+            self.system.storage.record("create_course", course_id, course_name, instructor,
+                                       schedule, max_students)
+        self._maybe_checkpoint()
+        return OK
+
+    # `force` deletes a course with enrolled students, dropping them first.
+    def delete_course(self, course_id, force=False):
+        with self._gate.exclusive():
+            course = self.system.find_course_by_id(course_id)
+            if course is None:
+                return UNKNOWN_COURSE
+            if course.get_enrolled_students() and not force:
+                return NOT_EMPTY
+            self.system.remove_course(course)
+            self.system.storage.record("delete_course", course.get_course_id())
+        self._maybe_checkpoint()
+        return OK
+
+    def add_student(self, username, password):
+        # Returns (status, student_id). The slow hash is computed before
+        # registrations are paused.
+        password_hash = hash_password(password)
+        with self._gate.exclusive():
+            if self.system.is_username_taken(username):
+                return ALREADY_EXISTS, None
+            student_id = self.system.next_student_id()
+            self.system.add_student(Student(username, password_hash, student_id))
+            self.system.storage.record("add_student", username, password_hash, student_id)
+        self._maybe_checkpoint()
+        return OK, student_id
+
+    def delete_student(self, student_id):
+        with self._gate.exclusive():
+            student = self.system.index.find_user_by_id(student_id)
+            if not isinstance(student, Student):
+                return UNKNOWN_STUDENT
+            freed = self.system.remove_student(student)
+            self.system.storage.record("delete_student", student_id)
+        # The freed seats go to waitlisted students once registrations
+        # are running again.
+        for course in freed:
+            self._fill_from_waitlist(course)
+        self._maybe_checkpoint()
+        return OK
+
+    # `rules` is a rules object as saved in data.json (see rules.py), or
+    # None to leave them as they are; an empty object clears them. Raises
+    # ValueError for malformed rules.
+    def set_course_rules(self, course_id, rules=None, credits=None):
+        parsed = None if rules is None else CourseRules.from_dict(rules)
+        if credits is not None and (isinstance(credits, bool) or not isinstance(credits, int) or credits < 0):
+            raise ValueError("credits must be a non-negative whole number")
+        with self._gate.exclusive():
+            course = self.system.find_course_by_id(course_id)
+            if course is None:
+                return UNKNOWN_COURSE
+            if parsed is None:
+                parsed = course.rules
+            self.system.set_course_rules(course, parsed, credits)
+            self.system.storage.record("set_rules", course.get_course_id(), course.credits,
+                                       course.rules.to_dict() if course.rules is not None else None)
+        self._maybe_checkpoint()
+        return OK
+
+    # `record` is {"completed", "groups", "max_credits"}; replaces the
+    # student's record. Raises ValueError for a malformed record.
+    def set_student_record(self, student_id, record):
+        parsed = AcademicRecord.from_dict(record)
+        with self._gate.exclusive():
+            student = self.system.index.find_user_by_id(student_id)
+            if not isinstance(student, Student):
+                return UNKNOWN_STUDENT
+            self.system.set_student_record(student, parsed)
+            self.system.storage.record("set_record", student_id, parsed.to_dict())
+        self._maybe_checkpoint()
+        return OK
+
+    # Runs `func(system)` with every other operation paused, for bulk
+    # changes such as a registration lottery; returns what it returns.
+    def run_exclusive(self, func):
+        with self._gate.exclusive():
+            result = func(self.system)
+        self._maybe_checkpoint()
+        return result
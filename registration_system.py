@@ -3,18 +3,33 @@ registration_system.py
 Core application module that defines the `RegistrationSystem` class and the
 `start_registration_system` helper. Responsibilities include:
 
-- Loading and saving persistent data (courses, students, admins).
-- Initializing sample data when no data file exists.
+- Loading and saving persistent data (courses, students, admins) through a
+  pluggable storage backend (see storage.py).
+- Initializing sample data when no data file exists (unless disabled).
 - Providing the interactive CLI flow (login, admin/student menus).
 
 This module contains the main program logic; it should be imported by
-`main.py` which only delegates startup to `start_registration_system()`.
+`main.py` which only delegates startup to `start_registration_system()`
+(or, for scripted runs, to headless.py).
 """
 
-import json
+import contextlib
+import sys
+
 from student import Student
 from admin import Admin
 from course import Course
+from registry_index import RegistryIndex
+from ordered_set import OrderedSet
+from credentials import hash_password, LoginCache
+from catalog import SORT_KEYS, query_courses, write_course_table
+from search_index import SearchIndex
+from enrollment_stats import EnrollmentStats, fill_rate
+from storage import open_storage
+from batch_registration import register_batch
+from headless import run_file
+from integrity import check_integrity
+from rules import RuleEngine, CourseRules, AcademicRecord, NO_RECORD
 
 
 class RegistrationSystem:
@@ -22,81 +37,220 @@ class RegistrationSystem:
 
     # The RegistrationSystem class coordinates the application's state and
     # user interaction. It keeps lists of `courses`, `students`, and `admins`
-    # in memory, provides persistence via JSON file I/O, and exposes
+    # in memory, persists them through `storage`, and exposes
     # methods that implement the CLI menus and helper operations.
-
-    def __init__(self):
-        self.courses = []
-        self.students = []
+    # Lookups by course id, username and user id go through `index`, which
+    # is kept in sync by add_course/remove_course/add_student/remove_student.
+    # Word searches over the catalog go through `search_index`, and the
+    # admin dashboard reads the running counters in `stats`; both are kept
+    # in sync by add_course/remove_course. `rules` compiles course rules and
+    # student records into the bitsets registrations are checked against.
+    # Every change made through the menus is passed to `storage.record` as
+    # soon as it happens.
+
+    def __init__(self, storage=None, sample_data=True):
+        # Insertion-ordered sets, so deleting a course or student is O(1).
+        self.courses = OrderedSet()
+        self.students = OrderedSet()
         self.admins = []
+        self.index = RegistryIndex()
+        self.search_index = SearchIndex()
+        self.stats = EnrollmentStats()
+        self.rules = RuleEngine()
+        self.login_cache = LoginCache()
+        # OOP - Polymorphism:
+        # Any Storage backend works here; by default the backend is chosen
+        # from the DATA_FILE name (JSON snapshot + journal, or SQLite).
+        self.storage = storage if storage is not None else open_storage(self.DATA_FILE)
         self.load_data()
-        self.initialize_sample_data()
+        self.report_integrity()
+        if sample_data and self.initialize_sample_data():
+            # Changes recorded later may refer to the sample data, so it
+            # has to be persisted before any of them.
+            self.save_data()
 
-    # Load data from JSON
+    # Load data from storage
     def load_data(self):
-        try:
-            with open(self.DATA_FILE, "r") as file:
-                data = json.load(file)
-
-            # Load courses
-            for c in data.get("courses", []):
-                course = Course(
-                    c["course_id"],
-                    c["course_name"],
-                    c["instructor"],
-                    c["schedule"],
-                    c["max_students"]
-                )
-                self.courses.append(course)
-
-            # Load students
-            for s in data.get("students", []):
-                student = Student(s["username"], s["password"], s["user_id"])
-                self.students.append(student)
-
-            # Load admins
-            for a in data.get("admins", []):
-                admin = Admin(a["username"], a["password"], a["user_id"])
-                self.admins.append(admin)
-
-        except FileNotFoundError:
-            print("No existing data found. Starting fresh system.")
-
-    # Save data to JSON
+        self.storage.load(self)
+
+    # Apply one recorded operation (no checks, no recording)
+    def apply_operation(self, operation, args):
+        if operation == "create_course":
+            self.add_course(Course(*args))
+        elif operation == "delete_course":
+            course = self.find_course_by_id(args[0])
+            if course is not None:
+                self.remove_course(course)
+        elif operation == "add_student":
+            self.add_student(Student(*args))
+        elif operation == "delete_student":
+            student = self.index.find_user_by_id(args[0])
+            if isinstance(student, Student):
+                self.remove_student(student)
+        elif operation == "register":
+            self.load_enrollment(*args)
+        elif operation == "drop":
+            student = self.index.find_user_by_id(args[0])
+            course = self.find_course_by_id(args[1])
+            if isinstance(student, Student) and course is not None:
+                student.unenroll(course)
+        elif operation == "waitlist":
+            self.load_waitlist(*args)
+        elif operation == "unwaitlist":
+            student = self.index.find_user_by_id(args[0])
+            course = self.find_course_by_id(args[1])
+            if isinstance(student, Student) and course is not None:
+                student.remove_from_waitlist(course)
+        elif operation == "set_rules":
+            course = self.find_course_by_id(args[0])
+            if course is not None:
+                rules = CourseRules.from_dict(args[2]) if args[2] else None
+                self.set_course_rules(course, rules, args[1])
+        elif operation == "set_record":
+            student = self.index.find_user_by_id(args[0])
+            if isinstance(student, Student):
+                self.set_student_record(student, AcademicRecord.from_dict(args[1]))
+        elif operation == "set_password":
+            user = self.index.find_user_by_id(args[0])
+            if user is not None:
+                user.password = args[1]
+        else:
+            print(f"Ignoring unknown journal operation: {operation}")
+
+    # Print any inconsistencies in the loaded course <-> student graph
+    def report_integrity(self):
+        problems = check_integrity(self)
+        if problems:
+            print(f"Data integrity check found {len(problems)} problem(s):")
+            for problem in problems[:10]:
+                print(f"  {problem}")
+        return problems
+
+    # Make one change durable in storage
+    def record(self, operation, *args):
+        self.storage.record(operation, *args)
+        if self.storage.needs_checkpoint():
+            self.storage.checkpoint(self)
+
+    # Helper: restore one saved enrollment edge (no capacity/conflict checks)
+    def load_enrollment(self, student_id, course_id):
+        student = self.index.find_user_by_id(student_id)
+        course = self.find_course_by_id(course_id)
+        if not isinstance(student, Student) or course is None:
+            return False
+        student.enroll(course)
+        return True
+
+    # Helper: restore one saved waitlist entry at the back of the queue
+    def load_waitlist(self, student_id, course_id):
+        student = self.index.find_user_by_id(student_id)
+        course = self.find_course_by_id(course_id)
+        if not isinstance(student, Student) or course is None:
+            return False
+        student.add_to_waitlist(course)
+        return True
+
+    # Give free seats in `course` to waitlisted students, first come first
+    # served, recording each promotion (or removal, when the student can no
+    # longer take the seat, e.g. because of a time conflict).
+    def fill_from_waitlist(self, course):
+        while True:
+            student, reason = course.promote_next()
+            if student is None:
+                return
+            if reason is None:
+                self.record("register", student.get_user_id(), course.get_course_id())
+            else:
+                self.record("unwaitlist", student.get_user_id(), course.get_course_id())
+
+    # Save a full copy of the data to storage
     def save_data(self):
-        data = {
-            "courses": [
-                {
-                    "course_id": c.get_course_id(),
-                    "course_name": c.get_course_name(),
-                    "instructor": c.get_instructor(),
-                    "schedule": c.get_schedule(),
-                    "max_students": c.get_max_students()
-                } for c in self.courses
-            ],
-            "students": [
-                {"username": s.get_username(), "password": s.password, "user_id": s.get_user_id()}
-                for s in self.students
-            ],
-            "admins": [
-                {"username": a.get_username(), "password": a.password, "user_id": a.get_user_id()}
-                for a in self.admins
-            ]
-        }
-        with open(self.DATA_FILE, "w") as file:
-            json.dump(data, file, indent=4)
-
-    # Add sample data if empty
+        self.storage.save(self)
+
+    # Add sample data if empty; returns True if anything was added
     def initialize_sample_data(self):
+        added = False
         if not self.admins:
-            self.admins.append(Admin("admin", "admin123", "A001"))
+            self.add_admin(Admin("admin", hash_password("admin123"), "A001"))
+            added = True
         if not self.students:
-            self.students.append(Student("john", "password1", "S001"))
-            self.students.append(Student("emma", "password2", "S002"))
+            self.add_student(Student("john", hash_password("password1"), "S001"))
+            self.add_student(Student("emma", hash_password("password2"), "S002"))
+            added = True
         if not self.courses:
-            self.courses.append(Course("CS101", "Introduction to Programming", "Dr. Smith", "MWF 10-11", 30))
-            self.courses.append(Course("MATH201", "Calculus I", "Prof. Johnson", "TTH 1-2:30", 25))
-            self.courses.append(Course("ENG101", "English Composition", "Dr. Williams", "MWF 2-3", 20))
+            self.add_course(Course("CS101", "Introduction to Programming", "Dr. Smith", "MWF 10-11", 30))
+            self.add_course(Course("MATH201", "Calculus I", "Prof. Johnson", "TTH 1-2:30", 25))
+            self.add_course(Course("ENG101", "English Composition", "Dr. Williams", "MWF 2-3", 20))
+            added = True
+        return added
+
+    # One-off migration (main.py --migrate-passwords): hash every plaintext
+    # password and save; returns the number migrated. Without it each
+    # plaintext password is hashed the first time its user logs in.
+    def migrate_passwords(self):
+        migrated = sum(user.migrate_password() for user in [*self.admins, *self.students])
+        if migrated:
+            self.save_data()
+        print(f"Hashed {migrated} plaintext password(s).")
+        return migrated
+
+    # Keep the lists and the lookup index in sync
+    def add_course(self, course):
+        self.courses.append(course)
+        self.index.add_course(course)
+        self.search_index.add_course(course)
+        self.stats.add_course(course)
+        self.rules.add_course(course)
+
+    # Removing a course or student cascades through its own enrollment and
+    # waitlist edges only (both sides keep sets of each other), never the
+    # whole catalog.
+    def remove_course(self, course):
+        for student in list(course.enrolled_students):
+            student.unenroll(course)
+        course.clear_waitlist()
+        self.courses.remove(course)
+        self.index.remove_course(course)
+        self.search_index.remove_course(course)
+        self.stats.remove_course(course)
+        self.rules.remove_course(course)
+
+    def add_student(self, student):
+        self.students.append(student)
+        self.index.add_student(student)
+        if student.record is not NO_RECORD:
+            self.rules.set_record(student, student.record)
+
+    # Replace a course's rules (None clears them) and, if given, its credits
+    def set_course_rules(self, course, rules, credits=None):
+        self.rules.set_rules(course, rules, credits)
+
+    def set_student_record(self, student, record):
+        self.rules.set_record(student, record)
+
+    # Ids of everything `course` needs, directly or not, in an order they
+    # can be taken in (courses no longer offered keep their folded id).
+    def prerequisite_chain(self, course):
+        chain = []
+        for key in self.rules.all_prerequisites(course.get_course_id()):
+            found = self.find_course_by_id(key)
+            chain.append(found.get_course_id() if found is not None else key)
+        return chain
+
+    # Returns the courses the student was dropped from, so callers can
+    # give the freed seats to waitlisted students.
+    def remove_student(self, student):
+        freed = list(student.registered_courses)
+        for course in freed:
+            student.unenroll(course)
+        student.clear_waitlists()
+        self.students.remove(student)
+        self.index.remove_user(student)
+        return freed
+
+    def add_admin(self, admin):
+        self.admins.append(admin)
+        self.index.add_admin(admin)
 
     # Program entry point
     def run(self):
@@ -114,51 +268,79 @@ class RegistrationSystem:
         elif isinstance(current_user, Student):
             self.student_menu(current_user)
 
-        self.save_data()
+        # Let the storage persist anything still pending (e.g. compact the journal).
+        self.storage.checkpoint(self)
 
     # Login function
     def login(self):
         username = input("\nEnter username: ").strip()
         password = input("Enter password: ").strip()
 
+        user = self.authenticate(username, password)
+        if isinstance(user, Admin):
+            print(f"\nWelcome Admin: {user.get_username()}")
+        elif isinstance(user, Student):
+            print(f"\nWelcome Student: {user.get_username()}")
+        else:
+            print("Invalid credentials.")
+        return user
+
+    # Non-interactive login: return the matching user or None
+    def authenticate(self, username, password):
         # OOP - Polymorphism & Inheritance:
-        # We iterate over `admins` and `students` and call `login` on each.
-        # `login` is implemented on the base `User` class and used polymorphically
-        # by Admin and Student instances. This demonstrates usage of the shared
-        # interface defined by the parent class.
-        for admin in self.admins:
-            if admin.login(username, password):
-                print(f"\nWelcome Admin: {admin.get_username()}")
-                return admin
-
-        for student in self.students:
-            if student.login(username, password):
-                print(f"\nWelcome Student: {student.get_username()}")
-                return student
-
-        print("Invalid credentials.")
+        # We look the username up among `admins` and then `students` and call
+        # `login` on the match. `login` is implemented on the base `User` class
+        # and used polymorphically by Admin and Student instances. This
+        # demonstrates usage of the shared interface defined by the parent class.
+        admin = self.index.find_admin(username)
+        if admin is not None and self.check_login(admin, username, password):
+            return admin
+
+        student = self.index.find_student(username)
+        if student is not None and self.check_login(student, username, password):
+            return student
+
         return None
 
+    # Verify a password, skipping the slow hash for recently verified logins.
+    # A plaintext password (from an old data file) is replaced by its hash
+    # on the first successful login, and the change recorded.
+    def check_login(self, user, username, password):
+        if self.login_cache.contains(user, password):
+            return True
+        if not user.login(username, password):
+            return False
+        if user.migrate_password():
+            self.storage.record("set_password", user.get_user_id(), user.password)
+        self.login_cache.add(user, password)
+        return True
+
     # Student menu
     def student_menu(self, student):
         while True:
             print("\nSTUDENT MENU")
-            print("1. View Available Courses")
-            print("2. Register for Course")
-            print("3. Drop Course")
-            print("4. View My Courses")
-            print("5. Logout")
+            print("1. Browse Courses")
+            print("2. Search Courses")
+            print("3. Register for Course")
+            print("4. Drop Course")
+            print("5. View My Courses")
+            print("6. Leave Waitlist")
+            print("7. Logout")
             choice = input("Enter choice: ").strip()
 
             if choice == "1":
-                self.view_all_courses()
+                self.browse_courses()
             elif choice == "2":
-                self.register_student_for_course(student)
+                self.search_courses()
             elif choice == "3":
-                self.drop_student_course(student)
+                self.register_student_for_course(student)
             elif choice == "4":
-                student.view_registered_courses()
+                self.drop_student_course(student)
             elif choice == "5":
+                student.view_registered_courses()
+            elif choice == "6":
+                self.leave_student_waitlist(student)
+            elif choice == "7":
                 student.logout()
                 return
             else:
@@ -168,46 +350,113 @@ class RegistrationSystem:
     def admin_menu(self, admin):
         while True:
             print("\nADMIN MENU")
-            print("1. View All Courses")
-            print("2. Create Course")
-            print("3. Delete Course")
-            print("4. View All Students")
-            print("5. Register New Student")
-            print("6. Delete Student")
-            print("7. Logout")
+            print("1. Browse Courses")
+            print("2. Search Courses")
+            print("3. Create Course")
+            print("4. Delete Course")
+            print("5. View All Students")
+            print("6. Register New Student")
+            print("7. Delete Student")
+            print("8. Enrollment Dashboard")
+            print("9. Course Rules")
+            print("10. Student Academic Record")
+            print("11. Logout")
             choice = input("Enter choice: ").strip()
 
             if choice == "1":
-                admin.view_all_courses(self.courses)
+                self.browse_courses(show_enrolled=True)
             elif choice == "2":
-                self.create_new_course()
+                self.search_courses(show_enrolled=True)
             elif choice == "3":
-                self.delete_existing_course(admin)
+                self.create_new_course()
             elif choice == "4":
-                self.view_all_students()
+                self.delete_existing_course(admin)
             elif choice == "5":
-                self.register_new_student()
+                self.view_all_students()
             elif choice == "6":
-                self.delete_student()
+                self.register_new_student()
             elif choice == "7":
+                self.delete_student()
+            elif choice == "8":
+                self.enrollment_dashboard()
+            elif choice == "9":
+                self.edit_course_rules()
+            elif choice == "10":
+                self.edit_student_record()
+            elif choice == "11":
                 admin.logout()
                 return
             else:
                 print("Invalid choice.")
 
-    # View courses
+    # View courses (the first page; browse_courses pages through the rest)
     def view_all_courses(self):
         if not self.courses:
             print("No courses available.")
             return
 
+        page = query_courses(self.courses)
         print("\nAVAILABLE COURSES:")
-        print("------------------------------------------------------------------")
-        print(f"{'ID':<10} {'Name':<20} {'Instructor':<15} {'Schedule':<15} {'Capacity':<10}")
-        print("------------------------------------------------------------------")
-        for c in self.courses:
-            print(f"{c.get_course_id():<10} {c.get_course_name():<20} {c.get_instructor():<15} "
-                  f"{c.get_schedule():<15} {c.get_max_students():<10}")
+        write_course_table(page.courses)
+        if page.next_cursor:
+            print(f"Showing {len(page.courses)} of {page.total} courses. "
+                  f"Use 'Browse Courses' to filter or see the rest.")
+
+    # Browse the catalog page by page, with filters and sorting
+    def browse_courses(self, show_enrolled=False):
+        if not self.courses:
+            print("No courses available.")
+            return
+
+        filters = {}
+        sort = "id"
+        cursor = None
+        while True:
+            try:
+                page = query_courses(self.courses, sort=sort, cursor=cursor, **filters)
+            except ValueError as error:
+                print(f"Invalid choice: {error}")
+                filters, sort, cursor = {}, "id", None
+                continue
+
+            if page.courses:
+                print("\nCOURSES:")
+                write_course_table(page.courses, show_enrolled)
+            print(f"{page.total} matching course(s).")
+
+            options = "[n]ext page, " if page.next_cursor else ""
+            choice = input(f"{options}[f]ilter, [s]ort, [q]uit: ").strip().lower()
+            if choice == "n" and page.next_cursor:
+                cursor = page.next_cursor
+            elif choice == "f":
+                filters = self.prompt_catalog_filters()
+                cursor = None
+            elif choice == "s":
+                sort = input(f"Sort by ({', '.join(SORT_KEYS)}): ").strip().lower() or "id"
+                cursor = None
+            elif choice == "q":
+                return
+            else:
+                print("Invalid choice.")
+
+    # Search courses by words from their id, name or instructor
+    def search_courses(self, show_enrolled=False):
+        query = input("Search courses (id, name or instructor): ").strip()
+        results = self.search_index.search(query)
+        if not results:
+            print("No matching courses.")
+            return
+        write_course_table(results, show_enrolled)
+        print(f"{len(results)} result(s) shown.")
+
+    # Ask for the catalog filters; blank answers mean "any"
+    def prompt_catalog_filters(self):
+        department = input("Department prefix (e.g. CS, blank for any): ").strip()
+        instructor = input("Instructor (blank for any): ").strip()
+        day = input("Meets on day (e.g. M, TH, blank for any): ").strip()
+        open_only = input("Only courses with open seats? (y/n): ").strip().lower() == "y"
+        return {"department": department or None, "instructor": instructor or None,
+                "day": day or None, "open_only": open_only}
 
     # Register student for course
     def register_student_for_course(self, student):
@@ -215,9 +464,23 @@ class RegistrationSystem:
         course_id = input("\nEnter course ID to register: ").strip()
         course = self.find_course_by_id(course_id)
         if course:
-            student.register_course(course)
+            if student.register_course(course):
+                self.record("register", student.get_user_id(), course.get_course_id())
+            elif student.check_waitlist(course) is None:
+                answer = input("Join the waitlist for this course? (y/n): ").strip().lower()
+                if answer == "y" and student.join_waitlist(course):
+                    self.record("waitlist", student.get_user_id(), course.get_course_id())
         else:
-            print("Course not found.")
+            self.suggest_courses(course_id)
+
+    # Offer search results for text that is not a course id
+    def suggest_courses(self, text):
+        print("Course not found.")
+        suggestions = self.search_index.search(text, limit=5)
+        if suggestions:
+            print("Did you mean:")
+            for c in suggestions:
+                print(f"  {c.course_id:<10} {c.course_name} ({c.instructor})")
 
     # Drop student course
     def drop_student_course(self, student):
@@ -227,7 +490,23 @@ class RegistrationSystem:
         course_id = input("\nEnter course ID to drop: ").strip()
         course = self.find_course_by_id(course_id)
         if course:
-            student.drop_course(course)
+            if student.drop_course(course):
+                self.record("drop", student.get_user_id(), course.get_course_id())
+                self.fill_from_waitlist(course)
+        else:
+            print("Course not found.")
+
+    # Leave a waitlist
+    def leave_student_waitlist(self, student):
+        if not student.waitlisted_courses:
+            print("You are not on any waitlists.")
+            return
+        student.view_waitlists()
+        course_id = input("\nEnter course ID to leave the waitlist for: ").strip()
+        course = self.find_course_by_id(course_id)
+        if course:
+            if student.leave_waitlist(course):
+                self.record("unwaitlist", student.get_user_id(), course.get_course_id())
         else:
             print("Course not found.")
 
@@ -235,24 +514,134 @@ class RegistrationSystem:
     def create_new_course(self):
         print("\nCREATE NEW COURSE")
         course_id = input("Enter Course ID: ").strip()
+        if self.find_course_by_id(course_id):
+            print("Course ID already exists.")
+            return
         course_name = input("Enter Course Name: ").strip()
         instructor = input("Enter Instructor: ").strip()
         schedule = input("Enter Schedule: ").strip()
         try:
             max_students = int(input("Enter Max Students: ").strip())
         except ValueError:
-            print("Invalid number. Defaulting to 30.")
+            max_students = None
+        if not Course.is_valid_capacity(max_students):
+            print(f"Invalid number (0 to {Course.MAX_CAPACITY}). Defaulting to 30.")
             max_students = 30
-        self.courses.append(Course(course_id, course_name, instructor, schedule, max_students))
+        self.add_course(Course(course_id, course_name, instructor, schedule, max_students))
+        self.record("create_course", course_id, course_name, instructor, schedule, max_students)
         print("Course created successfully!")
 
     # Delete course
     def delete_existing_course(self, admin):
         self.view_all_courses()
         course_id = input("\nEnter course ID to delete: ").strip()
-        if admin.delete_course(self.courses, course_id):
+        course = self.find_course_by_id(course_id)
+        force = False
+        if course is not None and course.get_enrolled_students():
+            enrolled = len(course.get_enrolled_students())
+            answer = input(f"{enrolled} student(s) are enrolled. Drop them and delete anyway? (y/n): ")
+            force = answer.strip().lower() == "y"
+        if admin.delete_course(self, course_id, force):
+            self.record("delete_course", course.get_course_id())
             print("Course deleted successfully.")
 
+    # Capacity overview from the running counters in `stats`
+    def enrollment_dashboard(self):
+        if not self.courses:
+            print("No courses available.")
+            return
+
+        sections, seats, enrolled = self.stats.totals()
+        print("\nENROLLMENT DASHBOARD")
+        print(f"{sections} sections, {enrolled} of {seats} seats taken "
+              f"({self.stats.seats_remaining()} remaining)")
+
+        print("\nFullest sections:")
+        for course in self.stats.top_fullest(10):
+            print(f"  {course.course_id:<10} {len(course.enrolled_students):>4}/{course.max_students:<4} "
+                  f"{fill_rate(course):>6.0%}  {course.instructor}")
+
+        nearly_full = self.stats.sections_at_least(90)
+        print(f"\nSections at least 90% full: {len(nearly_full)}")
+
+        print(f"\n{'Department':<12} {'Sections':>8} {'Seats':>7} {'Enrolled':>9} {'Remaining':>10}")
+        for department, (sections, seats, enrolled) in self.stats.department_summary().items():
+            print(f"{department or '-':<12} {sections:>8} {seats:>7} {enrolled:>9} "
+                  f"{max(0, seats - enrolled):>10}")
+
+        filename = input("\nExport per-course CSV to (blank to skip): ").strip()
+        if filename:
+            try:
+                with open(filename, "w", newline="") as file:
+                    self.stats.write_csv(file)
+            except OSError as error:
+                print(f"Could not write {filename}: {error}")
+                return
+            print(f"Wrote {len(self.stats)} courses to {filename}.")
+
+    # Show and edit a course's credits and registration rules. Blank input
+    # keeps a value, "-" clears it.
+    def edit_course_rules(self):
+        course_id = input("\nEnter course ID: ").strip()
+        course = self.find_course_by_id(course_id)
+        if course is None:
+            self.suggest_courses(course_id)
+            return
+        rules = course.rules or CourseRules()
+        print(f"\nRULES FOR {course.course_id} ({course.credits} credits)")
+        requires = self.prerequisite_chain(course)
+        if requires:
+            print(f"Requires, directly or not: {', '.join(requires)}")
+        print("Prerequisite groups are separated by ';', alternatives by '|' (CS101; MATH101|MATH102).")
+        prerequisites = _prompt_list("Prerequisites", "; ".join("|".join(g) for g in rules.prerequisites), ";")
+        corequisites = _prompt_list("Co-requisites", ", ".join(rules.corequisites))
+        exclusions = _prompt_list("Exclusions", ", ".join(rules.exclusions))
+        restricted_to = _prompt_list("Restricted to groups", ", ".join(rules.restricted_to))
+        credits = input(f"Credits [{course.credits}]: ").strip()
+        try:
+            credits = int(credits) if credits else course.credits
+        except ValueError:
+            print("Invalid number. Keeping the current credits.")
+            credits = course.credits
+        new_rules = CourseRules([group.split("|") for group in prerequisites], corequisites,
+                                exclusions, restricted_to)
+        self.set_course_rules(course, new_rules, max(0, credits))
+        self.record("set_rules", course.get_course_id(), course.credits,
+                    course.rules.to_dict() if course.rules is not None else None)
+        for problem in self.rules.check_graph():
+            print(f"Warning: {problem}")
+        print("Course rules saved.")
+
+    # Show and edit a student's completed courses, groups and credit limit
+    def edit_student_record(self):
+        student_id = input("\nEnter Student ID: ").strip()
+        student = self.index.find_user_by_id(student_id)
+        if not isinstance(student, Student):
+            print("Student not found.")
+            return
+        record = student.record
+        print(f"\nRECORD OF {student_id} ({student.credits} credits registered)")
+        completed = _prompt_list("Completed courses", ", ".join(record.completed))
+        groups = _prompt_list("Groups", ", ".join(record.groups))
+        current = "none" if record.max_credits is None else record.max_credits
+        limit = input(f"Credit limit [{current}]: ").strip()
+        if limit == "-":
+            max_credits = None
+        else:
+            try:
+                max_credits = int(limit) if limit else record.max_credits
+            except ValueError:
+                print("Invalid number. Keeping the current limit.")
+                max_credits = record.max_credits
+        try:
+            new_record = AcademicRecord(completed, groups, max_credits)
+        except ValueError as error:
+            print(f"Record not saved: {error}.")
+            return
+        self.set_student_record(student, new_record)
+        self.record("set_record", student_id, new_record.to_dict())
+        print("Student record saved.")
+
     # View students
     def view_all_students(self):
         if not self.students:
@@ -269,7 +658,7 @@ class RegistrationSystem:
 
     # Register new student
     def register_new_student(self):
-        student_id = f"S{len(self.students)+1:03}"
+        student_id = self.next_student_id()
         print(f"\nGenerated Student ID: {student_id}")
 
         while True:
@@ -287,7 +676,9 @@ class RegistrationSystem:
                 break
             print("Password must be at least 6 characters.")
 
-        self.students.append(Student(username, password, student_id))
+        student = Student(username, hash_password(password), student_id)
+        self.add_student(student)
+        self.record("add_student", username, student.password, student_id)
         print(f"\nStudent registered successfully! Student ID: {student_id}")
 
     # Delete student
@@ -296,33 +687,73 @@ class RegistrationSystem:
         if not self.students:
             return
         student_id = input("\nEnter Student ID to delete: ").strip()
-        for student in self.students:
-            if student.get_user_id() == student_id:
-                self.students.remove(student)
-                print("Student deleted successfully.")
-                return
+        student = self.index.find_user_by_id(student_id)
+        if isinstance(student, Student):
+            freed = self.remove_student(student)
+            self.record("delete_student", student_id)
+            for course in freed:
+                self.fill_from_waitlist(course)
+            print(f"Student deleted successfully (dropped from {len(freed)} course(s)).")
+            return
         print("Student not found.")
 
+    # Bulk registration: apply many (student_id, course_id[, priority])
+    # requests at once and return one BatchResult per request
+    def register_batch(self, requests):
+        return register_batch(self, requests)
+
     # Helper: find course by ID
     def find_course_by_id(self, course_id):
-        for course in self.courses:
-            if course.get_course_id().lower() == course_id.lower():
-                return course
-        return None
+        return self.index.find_course(course_id)
+
+    # Helper: next free student id (S001, S002, ...)
+    def next_student_id(self):
+        number = len(self.students) + 1
+        while self.index.find_user_by_id(f"S{number:03}") is not None:
+            number += 1
+        return f"S{number:03}"
 
     # Helper: check if username exists
     def is_username_taken(self, username):
-        for u in self.students + self.admins:
-            if u.get_username() == username:
-                return True
-        return False
+        return self.index.is_username_taken(username)
+
 
+# Prompt for a separated list, showing the current value: blank keeps it,
+# "-" clears it.
+def _prompt_list(label, current, separator=","):
+    text = input(f"{label} [{current or 'none'}]: ").strip()
+    if not text:
+        text = current
+    elif text == "-":
+        text = ""
+    return [item.strip() for item in text.split(separator) if item.strip()]
 
-def start_registration_system():
+
+def start_registration_system(data_file=None, sample_data=True, script=None, output=None,
+                              migrate_passwords=False):
     """Create a RegistrationSystem instance and start the program.
 
     This helper keeps object creation out of `main.py` while preserving
-    the original program behavior.
+    the original program behavior. `data_file` replaces DATA_FILE; with
+    `script` the operations in that file ("-" for stdin) are run headless
+    instead of showing the menus (see headless.py). `migrate_passwords`
+    hashes every plaintext password, saves and exits.
     """
-    system = RegistrationSystem()
-    system.run()
\ No newline at end of file
+    storage = open_storage(data_file) if data_file else None
+    if migrate_passwords:
+        system = RegistrationSystem(storage, sample_data)
+        try:
+            system.migrate_passwords()
+        finally:
+            system.storage.close()
+        return
+    if script is None:
+        system = RegistrationSystem(storage, sample_data)
+        system.run()
+        return
+    with contextlib.redirect_stdout(sys.stderr):
+        system = RegistrationSystem(storage, sample_data)
+    try:
+        run_file(system, script, output)
+    finally:
+        system.storage.close()
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+registry_index.py
+Defines the `RegistryIndex` class, a set of hash maps that let the
+`RegistrationSystem` find courses and users in constant time instead of
+walking its `courses`, `students` and `admins` lists.
+
+The index never owns any objects: the lists on `RegistrationSystem` stay
+the source of truth for ordering and display, and the system keeps the
+index in sync whenever it creates, deletes or loads an entity.
+"""
+
+
+class RegistryIndex:
+    # OOP - Encapsulation:
+    # The dictionaries are private to the index; callers go through the
+    # add_*/remove_*/find_* methods so the keys are always normalized the
+    # same way (course ids are case-folded, usernames and user ids are exact).
+    def __init__(self):
+        self._courses_by_id = {}
+        self._admins_by_username = {}
+        self._students_by_username = {}
+        self._users_by_id = {}
+
+    @staticmethod
+    def course_key(course_id):
+        return course_id.casefold()
+
+    # Courses
+    def add_course(self, course):
+        # The first course loaded with a given id wins, matching the order
+        # in which the old linear scan would have found it.
+        self._courses_by_id.setdefault(self.course_key(course.get_course_id()), course)
+
+    def remove_course(self, course):
+        key = self.course_key(course.get_course_id())
+        if self._courses_by_id.get(key) is course:
+            del self._courses_by_id[key]
+
+    def find_course(self, course_id):
+        return self._courses_by_id.get(self.course_key(course_id))
+
+    # Users
+    def add_admin(self, admin):
+        self._admins_by_username.setdefault(admin.get_username(), admin)
+        self._users_by_id.setdefault(admin.get_user_id(), admin)
+
+    def add_student(self, student):
+        self._students_by_username.setdefault(student.get_username(), student)
+        self._users_by_id.setdefault(student.get_user_id(), student)
+
+    def remove_user(self, user):
+        for mapping, key in ((self._admins_by_username, user.get_username()),
+                             (self._students_by_username, user.get_username()),
+                             (self._users_by_id, user.get_user_id())):
+            if mapping.get(key) is user:
+                del mapping[key]
+
+    def find_admin(self, username):
+        return self._admins_by_username.get(username)
+
+    def find_student(self, username):
+        return self._students_by_username.get(username)
+
+    def find_user_by_id(self, user_id):
+        return self._users_by_id.get(user_id)
+
+    def is_username_taken(self, username):
+        return username in self._admins_by_username or username in self._students_by_username
+
+    # Rebuild every map from scratch, e.g. after the lists were replaced wholesale.
+    def rebuild(self, courses, students, admins):
+        self.__init__()
+        for course in courses:
+            self.add_course(course)
+        for student in students:
+            self.add_student(student)
+        for admin in admins:
+            self.add_admin(admin)
@@ -0,0 +1,354 @@
+"""
+rules.py
+Registration rules beyond capacity and time conflicts: prerequisites,
+co-requisites, exclusions, section restrictions and per-student credit
+limits.
+
+Rules are declared per course as plain data and saved with it (the
+"credits" and "rules" keys of a course in data.json):
+
+    {"course_id": "CS201", ..., "credits": 4,
+     "rules": {"prerequisites": [["CS101"], ["MATH101", "MATH102"]],
+               "corequisites": ["CS201L"],
+               "exclusions": ["CS200"],
+               "restricted_to": ["cs-major", "cs-minor"]}}
+
+- prerequisites: every group needs one completed course (above: CS101,
+  and MATH101 or MATH102);
+- corequisites: each must be completed or already registered;
+- exclusions: none may be completed or registered;
+- restricted_to: the student must belong to one of these groups.
+
+Each student has an `AcademicRecord`: completed course ids, group names
+and an optional credit limit (without one, credits are not limited). It
+is saved as the "completed", "groups" and "max_credits" keys of the
+student.
+
+`RuleEngine` compiles all of this once, when it is loaded or changed:
+
+- every course id that some rule names, and every group name, gets a
+  bit (other courses have bit 0, so the bitsets stay as small as the
+  set of courses the rules are about);
+- a course's rules become a few integer masks;
+- a record becomes bitsets of completed courses and groups.
+
+Each student also keeps a running bitset and credit total of their
+registered courses, updated by enroll/unenroll. When a rule names a
+course for the first time, the records and registrations that include
+it get the new bit. `check_rules` is then a
+handful of integer ANDs, however long a student's history is.
+
+The engine also keeps the prerequisite graph:
+
+- `check_graph` reports cycles (courses nobody could ever take);
+- `all_prerequisites` lists a course's transitive prerequisites in an
+  order they can be taken in.
+
+Rules are checked when a student registers or joins a waitlist; later
+changes (dropping a co-requisite, say) do not undo a registration.
+"""
+
+# Reasons a registration can be refused by the rules, as returned by
+# check_rules (and so by Student.check_registration).
+PREREQUISITE_MISSING = "prerequisite"
+COREQUISITE_MISSING = "corequisite"
+EXCLUDED = "excluded"
+RESTRICTED = "restricted"
+CREDIT_LIMIT = "credit_limit"
+
+RULE_KEYS = ("prerequisites", "corequisites", "exclusions", "restricted_to")
+
+
+def _id_list(value, what):
+    if isinstance(value, str) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{what} must be a list of strings")
+    return tuple(item.strip() for item in value if item.strip())
+
+
+def check_rules(student, course):
+    # Return the rule `course` breaks for `student`, or None.
+    record = student.record
+    if record.max_credits is not None and student.credits + course.credits > record.max_credits:
+        return CREDIT_LIMIT
+    rules = course.rules
+    if rules is None:
+        return None
+    if rules.restricted_mask and not record.group_bits & rules.restricted_mask:
+        return RESTRICTED
+    completed = record.completed_bits
+    for mask in rules.prerequisite_masks:
+        if not completed & mask:
+            return PREREQUISITE_MISSING
+    taken = completed | student.registered_bits
+    if taken & rules.corequisite_mask != rules.corequisite_mask:
+        return COREQUISITE_MISSING
+    if taken & rules.exclusion_mask:
+        return EXCLUDED
+    return None
+
+
+def explain(student, course, reason):
+    # A human-readable detail for a rule refusal (slow path, for messages).
+    rules = course.rules
+    completed = {course_id.casefold() for course_id in student.record.completed}
+    registered = {c.get_course_id().casefold() for c in student.registered_courses}
+    if reason == CREDIT_LIMIT:
+        return (f"{student.credits} credits registered + {course.credits} would exceed "
+                f"the limit of {student.record.max_credits}.")
+    if rules is None:
+        return None
+    if reason == RESTRICTED:
+        return "Open only to: " + ", ".join(rules.restricted_to) + "."
+    if reason == PREREQUISITE_MISSING:
+        missing = [" or ".join(group) for group in rules.prerequisites
+                   if not any(c.casefold() in completed for c in group)]
+        return "Still needed: " + "; ".join(missing) + "."
+    if reason == COREQUISITE_MISSING:
+        missing = [c for c in rules.corequisites if c.casefold() not in completed | registered]
+        return "Register for (or complete) first: " + ", ".join(missing) + "."
+    if reason == EXCLUDED:
+        clashes = [c for c in rules.exclusions if c.casefold() in completed | registered]
+        return "Not open to students who took: " + ", ".join(clashes) + "."
+    return None
+
+
+class CourseRules:
+    # OOP - Encapsulation:
+    # The declared rules (tuples of course ids and group names) and their
+    # compiled masks, which are filled in by RuleEngine.compile_rules.
+    __slots__ = ("prerequisites", "corequisites", "exclusions", "restricted_to",
+                 "prerequisite_masks", "corequisite_mask", "exclusion_mask", "restricted_mask")
+
+    def __init__(self, prerequisites=(), corequisites=(), exclusions=(), restricted_to=()):
+        # A prerequisite group may be given as a single course id.
+        if isinstance(prerequisites, str):
+            raise ValueError("prerequisites must be a list of course ids or groups")
+        groups = ([group] if isinstance(group, str) else group for group in prerequisites)
+        self.prerequisites = tuple(g for g in (_id_list(g, "a prerequisite group") for g in groups) if g)
+        self.corequisites = _id_list(corequisites, "corequisites")
+        self.exclusions = _id_list(exclusions, "exclusions")
+        self.restricted_to = _id_list(restricted_to, "restricted_to")
+        self.prerequisite_masks = ()
+        self.corequisite_mask = self.exclusion_mask = self.restricted_mask = 0
+
+    @classmethod
+    def from_dict(cls, data):
+        # Raises ValueError for anything that is not a valid rules object.
+        if not isinstance(data, dict):
+            raise ValueError("rules must be an object")
+        unknown = set(data) - set(RULE_KEYS)
+        if unknown:
+            raise ValueError(f"unknown rule(s): {', '.join(sorted(unknown))} "
+                             f"(choose from {', '.join(RULE_KEYS)})")
+        try:
+            return cls(**data)
+        except TypeError:
+            raise ValueError("rules must hold lists of course ids or group names") from None
+
+    def to_dict(self):
+        return {key: [list(g) for g in value] if key == "prerequisites" else list(value)
+                for key in RULE_KEYS for value in (getattr(self, key),) if value}
+
+    def is_empty(self):
+        return not (self.prerequisites or self.corequisites or self.exclusions or self.restricted_to)
+
+
+class AcademicRecord:
+    # OOP - Encapsulation:
+    # What a student has completed and which groups (major, year, cohort)
+    # they belong to, with the compiled bitsets.
+    __slots__ = ("completed", "groups", "max_credits", "completed_bits", "group_bits")
+
+    def __init__(self, completed=(), groups=(), max_credits=None):
+        self.completed = _id_list(completed, "completed")
+        self.groups = _id_list(groups, "groups")
+        if max_credits is not None and (isinstance(max_credits, bool) or not isinstance(max_credits, int)
+                                        or max_credits < 0):
+            raise ValueError("max_credits must be a non-negative whole number")
+        self.max_credits = max_credits
+        self.completed_bits = self.group_bits = 0
+
+    @classmethod
+    def from_dict(cls, data):
+        # Takes a student's saved item; keys other than the record's are ignored.
+        return cls(data.get("completed", ()), data.get("groups", ()), data.get("max_credits"))
+
+    def to_dict(self):
+        record = {}
+        if self.completed:
+            record["completed"] = list(self.completed)
+        if self.groups:
+            record["groups"] = list(self.groups)
+        if self.max_credits is not None:
+            record["max_credits"] = self.max_credits
+        return record
+
+    def is_empty(self):
+        return not self.to_dict()
+
+
+# Shared by every student without a record of their own (see Student).
+NO_RECORD = AcademicRecord()
+
+
+class RuleEngine:
+    # OOP - Encapsulation:
+    # Hands out the bit numbers and keeps the prerequisite graph
+    # (`_requires`: case-folded course id -> the ids it directly needs).
+    # Only ids named by a rule get a bit; `_courses` finds the course of
+    # an id and `_unbitted` the records that completed an id with no bit
+    # yet, so both can be updated when one is handed out. Bits are never
+    # reused, so a deleted course that is created again gets its old bit
+    # and students' completions still count.
+    def __init__(self):
+        self._course_bits = {}
+        self._group_bits = {}
+        self._courses = {}
+        self._unbitted = {}
+        self._requires = {}
+        self._order = None
+
+    def course_bit(self, course_id):
+        # The bit of a course id that a rule names, handed out on first use.
+        key = course_id.casefold()
+        bit = self._course_bits.get(key)
+        if bit is None:
+            bit = self._course_bits[key] = 1 << len(self._course_bits)
+            for record in self._unbitted.pop(key, ()):
+                record.completed_bits |= bit
+            course = self._courses.get(key)
+            if course is not None:
+                self._set_course_bit(course, bit)
+        return bit
+
+    def group_bit(self, name):
+        key = name.casefold()
+        bit = self._group_bits.get(key)
+        if bit is None:
+            bit = self._group_bits[key] = 1 << len(self._group_bits)
+        return bit
+
+    def _mask(self, course_ids):
+        mask = 0
+        for course_id in course_ids:
+            mask |= self.course_bit(course_id)
+        return mask
+
+    def _set_course_bit(self, course, bit):
+        course.bit = bit
+        for student in course.enrolled_students:
+            student.registered_bits |= bit
+
+    def add_course(self, course):
+        key = course.course_id.casefold()
+        self._courses[key] = course
+        bit = self._course_bits.get(key, 0)
+        if bit:
+            self._set_course_bit(course, bit)
+        if course.rules is not None:
+            self.compile_rules(course)
+
+    def remove_course(self, course):
+        key = course.course_id.casefold()
+        if self._courses.get(key) is course:
+            del self._courses[key]
+        self._forget_requires(key)
+
+    def _forget_requires(self, key):
+        if self._requires.pop(key, None) is not None:
+            self._order = None
+
+    def compile_rules(self, course):
+        rules = course.rules
+        rules.prerequisite_masks = tuple(self._mask(group) for group in rules.prerequisites)
+        rules.corequisite_mask = self._mask(rules.corequisites)
+        rules.exclusion_mask = self._mask(rules.exclusions)
+        rules.restricted_mask = 0
+        for name in rules.restricted_to:
+            rules.restricted_mask |= self.group_bit(name)
+        key = course.course_id.casefold()
+        required = {c.casefold() for group in rules.prerequisites for c in group}
+        if required:
+            self._requires[key] = required
+        else:
+            self._requires.pop(key, None)
+        self._order = None
+
+    # Replace a course's rules (None or empty clears them) and, if given,
+    # its credits. Enrolled students' running credit totals follow.
+    def set_rules(self, course, rules, credits=None):
+        course.rules = None if rules is None or rules.is_empty() else rules
+        if course.rules is None:
+            self._forget_requires(course.course_id.casefold())
+        else:
+            self.compile_rules(course)
+        if credits is not None and credits != course.credits:
+            for student in course.enrolled_students:
+                student.credits += credits - course.credits
+            course.credits = credits
+
+    def set_record(self, student, record):
+        if record.is_empty():
+            student.record = NO_RECORD
+            return
+        record.completed_bits = 0
+        for course_id in record.completed:
+            key = course_id.casefold()
+            bit = self._course_bits.get(key)
+            if bit is None:
+                self._unbitted.setdefault(key, []).append(record)
+            else:
+                record.completed_bits |= bit
+        record.group_bits = 0
+        for name in record.groups:
+            record.group_bits |= self.group_bit(name)
+        student.record = record
+
+    def _topological_order(self):
+        # (order, cycles): the courses with rules, prerequisites first, and
+        # every cycle found, each as a list of ids ending where it started.
+        if self._order is not None:
+            return self._order
+        order = []
+        cycles = []
+        state = {}
+        for root in sorted(self._requires):
+            if root in state:
+                continue
+            state[root] = 1
+            path = [root]
+            stack = [iter(sorted(self._requires.get(root, ())))]
+            while stack:
+                key = next(stack[-1], None)
+                if key is None:
+                    stack.pop()
+                    done = path.pop()
+                    state[done] = 2
+                    order.append(done)
+                elif state.get(key) == 1:
+                    cycles.append(path[path.index(key):] + [key])
+                elif key not in state:
+                    state[key] = 1
+                    path.append(key)
+                    stack.append(iter(sorted(self._requires.get(key, ()))))
+        self._order = order, cycles
+        return self._order
+
+    def check_graph(self):
+        # Problems in the prerequisite graph, as human-readable strings.
+        _, cycles = self._topological_order()
+        return [f"prerequisite cycle: {' -> '.join(cycle)}" for cycle in cycles]
+
+    def all_prerequisites(self, course_id):
+        # Case-folded ids of everything `course_id` needs, directly or not,
+        # in an order they can be taken in.
+        order, _ = self._topological_order()
+        needed = set()
+        pending = [course_id.casefold()]
+        while pending:
+            for key in self._requires.get(pending.pop(), ()):
+                if key not in needed:
+                    needed.add(key)
+                    pending.append(key)
+        rank = {key: position for position, key in enumerate(order)}
+        return sorted(needed, key=lambda key: (rank.get(key, -1), key))
@@ -0,0 +1,148 @@
+"""
+schedule.py
+Parses course schedule strings such as "MWF 10-11", "TTH 1-2:30",
+"Thu 9-10:15" or "M2-3" into compact time intervals, and provides
+`IntervalIndex`, the per-student structure used to answer "does this
+course overlap anything I am already taking?" with a binary search.
+
+Intervals are measured in minutes on a single week-long axis
+(day * 1440 + minute of day), so an overlap test is a plain comparison of
+two integers regardless of the day. Hours written without am/pm follow
+the usual timetable convention: 8-11 are morning, 12 is noon and 1-7 are
+afternoon/evening; an end time earlier than its start is moved to the
+afternoon ("11-1" is 11:00-13:00).
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+MINUTES_PER_DAY = 24 * 60
+DAY_CODES = {"M": 0, "T": 1, "TU": 1, "W": 2, "TH": 3, "R": 3, "F": 4,
+             "S": 5, "SA": 5, "SU": 6, "U": 6}
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+_SEGMENT = re.compile(
+    r"^\s*([A-Za-z]+?)\s*"
+    r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*-\s*"
+    r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*$",
+    re.IGNORECASE,
+)
+# Day names ("Thu", "Thursday") are tried before the one- and two-letter
+# codes, so "Sat" is Saturday rather than Tuesday + Saturday.
+_DAY_TOKEN = re.compile(r"MON(?:DAY)?|TUE(?:SDAY|S)?|WED(?:NESDAY)?|THU(?:RSDAY|RS|R)?|FRI(?:DAY)?"
+                        r"|SAT(?:URDAY)?|SUN(?:DAY)?|TH|TU|SA|SU|[MTWRFSU]")
+_DAY_NUMBERS = {name.upper(): number for number, name in enumerate(DAY_NAMES)}
+
+
+def _parse_days(text):
+    text = text.upper()
+    days = []
+    pos = 0
+    while pos < len(text):
+        match = _DAY_TOKEN.match(text, pos)
+        if match is None:
+            return None
+        token = match.group()
+        day = DAY_CODES.get(token)
+        days.append(_DAY_NUMBERS[token[:3]] if day is None else day)
+        pos = match.end()
+    return sorted(set(days))
+
+
+def _to_minutes(hour, minute, meridiem):
+    hour = int(hour)
+    minute = int(minute or 0)
+    if hour > 23 or minute > 59:
+        return None
+    if meridiem:
+        if hour == 0 or hour > 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.lower() == "pm" else 0)
+    elif 1 <= hour <= 7:
+        hour += 12
+    return hour * 60 + minute
+
+
+@lru_cache(maxsize=4096)
+def parse_schedule(schedule):
+    """Return a sorted tuple of (start, end) week-minute intervals, or None.
+
+    Several meeting patterns may be separated by commas or semicolons,
+    e.g. "MW 10-11, F 1-2". None means the text was not recognised; callers
+    then fall back to comparing the raw strings.
+    """
+    intervals = []
+    for segment in re.split(r"[;,]", schedule or ""):
+        if not segment.strip():
+            continue
+        match = _SEGMENT.match(segment)
+        if match is None:
+            return None
+        day_text, sh, sm, smer, eh, em, emer = match.groups()
+        days = _parse_days(day_text)
+        start = _to_minutes(sh, sm, smer)
+        end = _to_minutes(eh, em, emer)
+        if not days or start is None or end is None:
+            return None
+        if end <= start and not emer and end + 12 * 60 <= MINUTES_PER_DAY:
+            end += 12 * 60
+        if end <= start:
+            return None
+        for day in days:
+            base = day * MINUTES_PER_DAY
+            intervals.append((base + start, base + end))
+    if not intervals:
+        return None
+    return tuple(sorted(intervals))
+
+
+def meeting_days(intervals):
+    # The set of day numbers (0 = Monday) covered by parsed intervals.
+    return {start // MINUTES_PER_DAY for start, _ in intervals or ()}
+
+
+class IntervalIndex:
+    # OOP - Encapsulation:
+    # Stores the intervals of one owner's courses sorted by start time in
+    # two parallel lists (`_starts` for bisecting, `_entries` for the end
+    # and owning course). Overlaps are found by bisecting to the window of
+    # intervals that could possibly reach the query, which stays correct
+    # even if the stored intervals overlap each other.
+    __slots__ = ("_starts", "_entries", "_max_length")
+
+    def __init__(self):
+        self._starts = []
+        self._entries = []
+        self._max_length = 0
+
+    def add(self, owner, intervals):
+        for start, end in intervals:
+            pos = bisect_right(self._starts, start)
+            self._starts.insert(pos, start)
+            self._entries.insert(pos, (start, end, owner))
+            self._max_length = max(self._max_length, end - start)
+
+    def remove(self, owner, intervals):
+        for start, _ in intervals:
+            pos = bisect_left(self._starts, start)
+            while pos < len(self._starts) and self._starts[pos] == start:
+                if self._entries[pos][2] is owner:
+                    del self._starts[pos]
+                    del self._entries[pos]
+                    break
+                pos += 1
+
+    def overlapping(self, intervals):
+        # Return the owner of the first stored interval that overlaps any of
+        # `intervals`, or None.
+        for start, end in intervals:
+            lo = bisect_right(self._starts, start - self._max_length)
+            hi = bisect_left(self._starts, end)
+            for pos in range(lo, hi):
+                if self._entries[pos][1] > start:
+                    return self._entries[pos][2]
+        return None
+
+    def __len__(self):
+        return len(self._entries)
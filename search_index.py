@@ -0,0 +1,216 @@
+"""
+search_index.py
+Defines `SearchIndex`, an in-memory inverted index for finding courses
+by words from their id, name or instructor instead of the exact id.
+
+Text is lower-cased and split into alphanumeric tokens. Course ids are
+also split at letter/digit boundaries, so "CS101" can be found by "cs",
+"101" or "cs101". Every query word is treated as a prefix ("calc"
+finds "Calculus"), and a course must match all the words.
+
+Results are ranked by field: id, then name, then instructor. An exact
+word match scores twice a prefix match. Ties are broken by course id.
+Postings are kept per (token, field weight), both as a set (for
+membership tests) and as a list sorted by course id. A query only reads
+as far into those lists as it needs for `limit` results, so its cost
+follows `limit`, not the number of matching courses:
+
+- A one-word query walks its score levels from best to worst, merging
+  each level's sorted lists lazily (`heapq.merge`), and stops once
+  `limit` results are found.
+- A longer query walks the smallest word's lists the same way and
+  checks each course against the other words. It stops once no course
+  still to come can score high enough to make the page.
+
+The index is updated incrementally as courses are added and removed.
+"""
+
+import heapq
+import re
+from bisect import bisect_left, insort
+from itertools import islice
+
+# Score of a match in each field; an exact token match counts double.
+FIELD_WEIGHTS = (("course_id", 4), ("course_name", 2), ("instructor", 1))
+
+# Levels with at most this many entries are sorted rather than merged.
+SMALL_LEVEL = 512
+
+_WORD = re.compile(r"[0-9a-z]+")
+_ID_PART = re.compile(r"[a-z]+|[0-9]+")
+
+
+def tokenize(text):
+    return _WORD.findall(text.casefold())
+
+
+def course_tokens(course):
+    # {token: best field weight} for one course.
+    tokens = {}
+    for field, weight in FIELD_WEIGHTS:
+        text = getattr(course, field)
+        words = tokenize(text)
+        if field == "course_id":
+            words += _ID_PART.findall(text.casefold())
+        for word in words:
+            if tokens.get(word, 0) < weight:
+                tokens[word] = weight
+    return tokens
+
+
+class SearchIndex:
+    # OOP - Encapsulation:
+    # `_postings` maps each token to {field weight: (set, sorted list) of
+    # entries}, `_vocabulary` keeps the tokens sorted so a prefix is a
+    # contiguous range found by bisection, and `_entries` holds each
+    # course's entry and tokens. An entry is (case-folded course id,
+    # id(course), course), so entries sort by course id without calling
+    # any Python code.
+    def __init__(self, courses=()):
+        self._postings = {}
+        self._vocabulary = []
+        self._entries = {}
+        # Built in bulk: the lists are sorted once at the end.
+        for course in courses:
+            self.add_course(course, sort=False)
+        for postings in self._postings.values():
+            for _, ordered in postings.values():
+                ordered.sort()
+
+    def add_course(self, course, sort=True):
+        if course in self._entries:
+            return
+        entry = (course.course_id.casefold(), id(course), course)
+        tokens = course_tokens(course)
+        self._entries[course] = (entry, tokens)
+        for token, weight in tokens.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._vocabulary, token)
+            members, ordered = postings.setdefault(weight, (set(), []))
+            members.add(entry)
+            if sort:
+                insort(ordered, entry)
+            else:
+                ordered.append(entry)
+
+    def remove_course(self, course):
+        entry, tokens = self._entries.pop(course, (None, None))
+        if entry is None:
+            return
+        for token, weight in tokens.items():
+            postings = self._postings[token]
+            members, ordered = postings[weight]
+            members.discard(entry)
+            del ordered[bisect_left(ordered, entry)]
+            if not members:
+                del postings[weight]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def _prefix_range(self, prefix):
+        # Tokens starting with `prefix` are vocabulary[start:end].
+        start = bisect_left(self._vocabulary, prefix)
+        end = bisect_left(self._vocabulary, prefix + "\uffff", start)
+        return start, end
+
+    def _levels(self, word, start, end):
+        # [(score, [sorted entry lists])] for one query word, best first.
+        levels = {}
+        for token in self._vocabulary[start:end]:
+            exact = token == word
+            for weight, (_, ordered) in self._postings[token].items():
+                levels.setdefault(weight * 2 if exact else weight, []).append(ordered)
+        return sorted(levels.items(), reverse=True)
+
+    def _scorer(self, word, start, end):
+        # A function giving an entry's best score for `word` (0 if it does
+        # not match). Few tokens: look the entry up in their sets; many
+        # (a short prefix): scan the course's own handful of tokens.
+        if end - start <= 4:
+            sets = [(weight * 2 if token == word else weight, members)
+                    for token in self._vocabulary[start:end]
+                    for weight, (members, _) in self._postings[token].items()]
+            sets.sort(key=lambda item: item[0], reverse=True)
+
+            def look_up(entry):
+                for score, members in sets:
+                    if entry in members:
+                        return score
+                return 0
+            return look_up
+
+        def score(entry):
+            best = 0
+            for token, weight in self._entries[entry[2]][1].items():
+                if token.startswith(word):
+                    best = max(best, weight * 2 if token == word else weight)
+            return best
+        return score
+
+    @staticmethod
+    def _walk(levels):
+        # Yield (score, entry) best level first, each level in course id
+        # order; an entry is yielded once, at its best level. Small levels
+        # spread over many tokens are cheaper to sort whole than to merge.
+        seen = set()
+        for score, lists in levels:
+            if len(lists) == 1:
+                ordered = lists[0]
+            elif sum(map(len, lists)) <= SMALL_LEVEL:
+                ordered = sorted(set().union(*lists))
+            else:
+                ordered = heapq.merge(*lists)
+            previous = None
+            for entry in ordered:
+                if entry is previous or entry in seen:
+                    continue
+                previous = entry
+                seen.add(entry)
+                yield score, entry
+
+    def search(self, query, limit=20):
+        # Return up to `limit` courses matching every word of `query`, best first.
+        words = []
+        for word in dict.fromkeys(tokenize(query)):
+            start, end = self._prefix_range(word)
+            size = sum(len(members) for token in self._vocabulary[start:end]
+                       for members, _ in self._postings[token].values())
+            if size == 0:
+                return []
+            words.append((size, word, start, end))
+        if not words or limit <= 0:
+            return []
+        words.sort()
+
+        _, word, start, end = words[0]
+        levels = self._levels(word, start, end)
+        if len(words) == 1:
+            return [entry[2] for _, entry in islice(self._walk(levels), limit)]
+
+        # The smallest word drives; a course at its score level `score` can
+        # total at most score + `rest`. `best` holds the top (-total, entry)
+        # keys so far, sorted.
+        others = [self._scorer(word, start, end) for _, word, start, end in words[1:]]
+        rest = sum(self._levels(word, start, end)[0][0] for _, word, start, end in words[1:])
+        best = []
+        for score, entry in self._walk(levels):
+            if len(best) == limit and best[-1] < (-(score + rest), entry):
+                # Nothing from here on (same or lower level, later id) can
+                # rank above the last kept result.
+                break
+            total = score
+            for scorer in others:
+                matched = scorer(entry)
+                if not matched:
+                    break
+                total += matched
+            else:
+                insort(best, (-total, entry))
+                del best[limit:]
+        return [entry[2] for _, entry in best]
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,500 @@
+"""
+server.py
+An asyncio HTTP/JSON front end for the registration system, built only on
+the standard library. One process holds one shared `RegistrationSystem`
+and serves many users at once through a `RegistrationService`.
+
+Endpoints (request and response bodies are JSON):
+
+    POST   /login              {"username", "password"} -> {"token", "role", "user_id"}
+    POST   /logout
+    GET    /courses?department=&instructor=&day=&open=&sort=&cursor=&limit=
+    GET    /courses/search?q=&limit=
+    GET    /me/courses                                   (student)
+    POST   /register           {"course_id"}             (student)
+    POST   /drop               {"course_id"}             (student)
+    GET    /me/waitlists                                 (student)
+    POST   /waitlist           {"course_id"}             (student)
+    POST   /waitlist/leave     {"course_id"}             (student)
+    POST   /courses            {"course_id", "course_name", "instructor",
+                                "schedule", "max_students"}   (admin)
+    DELETE /courses/<course_id>?force=1                  (admin)
+    GET    /students?offset=&limit=                      (admin)
+    POST   /students           {"username", "password"}  (admin)
+    DELETE /students/<user_id>                           (admin)
+    GET    /stats?top=                                   (admin)
+    GET    /courses/<course_id>/rules
+    PUT    /courses/<course_id>/rules {"credits", "rules"}  (admin)
+    GET    /me/record                                    (student)
+    PUT    /students/<user_id>/record {"completed", "groups",
+                                       "max_credits"}    (admin)
+    POST   /window             {"seconds", "course_ids", "seed", "policy",
+                                "waitlist"}              (admin)
+    POST   /window/close                                 (admin)
+    GET    /window
+
+While a registration window is open (see lottery.py), `/register` for a
+course it covers answers 202 {"status": "queued"}; the queued requests
+are resolved by lottery when the window closes, after `seconds` or on
+`/window/close`. Students see the outcome in `/me/courses`.
+
+Authenticated requests send `Authorization: Bearer <token>`. Connections
+are kept alive between requests (HTTP/1.1). `/courses` pages with the
+catalog cursor (see catalog.py): pass the returned `next_cursor` back as
+`cursor` to get the next page.
+
+    python server.py [--host 127.0.0.1] [--port 8080] [--data data.json]
+                     [--snapshot catalog.snap] [--snapshot-interval 1.0]
+                     [--metrics metrics.json] [--profile cprofile|tracemalloc]
+
+With `--snapshot`, the catalog is also published as a read-only snapshot
+(see catalog_snapshot.py). It is republished at most every
+`--snapshot-interval` seconds while changes are coming in, for replica
+processes to serve browsing from.
+"""
+
+import argparse
+import asyncio
+import json
+import secrets
+import signal
+import threading
+import time
+from itertools import islice
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import instrumentation
+import lottery
+from admin import Admin
+from catalog import query_courses
+from catalog_snapshot import SnapshotPublisher
+from registration_service import RegistrationService, OK, UNKNOWN_COURSE, UNKNOWN_STUDENT
+from registration_system import RegistrationSystem
+from storage import open_storage
+from student import Student
+
+MAX_PAGE = 500
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden",
+           404: "Not Found", 409: "Conflict", 413: "Payload Too Large"}
+MAX_BODY = 64 * 1024
+
+
+def course_to_dict(course):
+    return {
+        "course_id": course.get_course_id(),
+        "course_name": course.get_course_name(),
+        "instructor": course.get_instructor(),
+        "schedule": course.get_schedule(),
+        "max_students": course.get_max_students(),
+        "enrolled": len(course.get_enrolled_students()),
+        "waitlisted": len(course.get_waitlist()),
+    }
+
+
+def _http_status(status):
+    if status == OK:
+        return 200
+    if status == lottery.QUEUED:
+        return 202
+    if status in (UNKNOWN_COURSE, UNKNOWN_STUDENT):
+        return 404
+    return 409
+
+
+def _page(items, query):
+    try:
+        offset = max(0, int(query.get("offset", ["0"])[0]))
+        limit = min(MAX_PAGE, max(1, int(query.get("limit", ["50"])[0])))
+    except ValueError:
+        offset, limit = 0, 50
+    return list(islice(items, offset, offset + limit)), offset, limit
+
+
+class JsonServer:
+    # OOP - Abstraction:
+    # The HTTP/1.1 keep-alive loop. Subclasses answer each request in
+    # `dispatch(method, target, headers, body)` with (status, payload);
+    # paths in OFF_LOOP_PATHS, or every request when OFF_LOOP is set, are
+    # dispatched on a worker thread.
+    OFF_LOOP_PATHS = ()
+    OFF_LOOP = False
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                        asyncio.CancelledError, ConnectionError):
+                    # Client went away, sent garbage, or the server is shutting down.
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close")
+                # After a bad length or an oversized body (which is never
+                # read) the next request cannot be found in the stream, so
+                # the connection is closed after the reply.
+                length = headers.get("content-length") or "0"
+                if not (length.isascii() and length.isdigit()):
+                    status, payload = 400, {"error": "invalid Content-Length"}
+                    keep_alive = False
+                elif int(length) > MAX_BODY:
+                    status, payload = 413, {"error": "body too large"}
+                    keep_alive = False
+                else:
+                    length = int(length)
+                    body = await reader.readexactly(length) if length else b""
+                    if self.OFF_LOOP or urlsplit(target).path.rstrip("/") in self.OFF_LOOP_PATHS:
+                        status, payload = await asyncio.get_running_loop().run_in_executor(
+                            None, self.dispatch, method, target, headers, body)
+                    else:
+                        status, payload = self.dispatch(method, target, headers, body)
+
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+        finally:
+            writer.close()
+
+
+class RegistrationServer(JsonServer):
+    # OOP - Inheritance:
+    # The server translates HTTP requests into RegistrationService calls;
+    # it keeps only the table of logged-in sessions itself, whose changes
+    # take `sessions_lock`.
+    # Every request is dispatched on a worker thread: a password check
+    # takes tens of milliseconds, and any operation may wait for the
+    # service's gate while a checkpoint, snapshot or lottery holds it. The
+    # event loop itself never waits. Reads take RegistrationService.reading.
+    OFF_LOOP = True
+
+    def __init__(self, system):
+        self.system = system
+        self.service = RegistrationService(system)
+        self.sessions = {}
+        self.sessions_lock = threading.Lock()
+        self.window = None
+        self.window_lock = threading.Lock()
+        self.window_closes_at = None
+        self.window_closing = None
+        self.publisher = None
+        # The event loop, for scheduling from worker threads (set by serve).
+        self.loop = None
+
+    def dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+        query = parse_qs(url.query)
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"error": "invalid JSON"}
+        if not isinstance(data, dict):
+            return 400, {"error": "expected a JSON object"}
+
+        if method == "POST" and parts == ["login"]:
+            return self.login(data)
+
+        token = headers.get("authorization", "").removeprefix("Bearer ").strip()
+        user = self.sessions.get(token)
+        if user is None:
+            return 401, {"error": "login required"}
+
+        try:
+            if method == "POST" and parts == ["logout"]:
+                with self.sessions_lock:
+                    self.sessions.pop(token, None)
+                return 200, {"status": OK}
+            if method == "GET" and parts == ["courses"]:
+                with self.service.reading():
+                    return 200, self.list_courses(query)
+            if method == "GET" and parts == ["courses", "search"]:
+                limit = min(MAX_PAGE, max(1, int(query.get("limit", ["20"])[0])))
+                with self.service.reading():
+                    results = self.system.search_index.search(query.get("q", [""])[0], limit)
+                    return 200, {"courses": [course_to_dict(c) for c in results]}
+            if method == "GET" and parts == ["window"]:
+                return 200, self.window_summary()
+            if method == "GET" and len(parts) == 3 and parts[0] == "courses" and parts[2] == "rules":
+                with self.service.reading():
+                    return self.course_rules(parts[1])
+            if isinstance(user, Student):
+                status, payload = self.student_request(user, method, parts, data)
+            elif isinstance(user, Admin):
+                status, payload = self.admin_request(method, parts, data, query)
+            else:
+                return 404, {"error": "not found"}
+            if status == 200 and method != "GET" and self.publisher is not None:
+                self.publisher.changed()
+            return status, payload
+        except (KeyError, TypeError, ValueError) as error:
+            return 400, {"error": f"bad request: {error}"}
+        return 404, {"error": "not found"}
+
+    def list_courses(self, query):
+        def param(name):
+            return query.get(name, [None])[0]
+
+        limit = min(MAX_PAGE, max(1, int(param("limit") or 50)))
+        page = query_courses(self.system.courses, department=param("department"),
+                             instructor=param("instructor"), day=param("day"),
+                             open_only=param("open") in ("1", "true", "yes"),
+                             sort=param("sort") or "id", cursor=param("cursor"), limit=limit)
+        return {"courses": [course_to_dict(c) for c in page.courses],
+                "next_cursor": page.next_cursor, "total": page.total}
+
+    def login(self, data):
+        user = self.system.authenticate(str(data.get("username", "")), str(data.get("password", "")))
+        if user is None:
+            return 401, {"error": "invalid credentials"}
+        token = secrets.token_hex(16)
+        with self.sessions_lock:
+            self.sessions[token] = user
+        role = "admin" if isinstance(user, Admin) else "student"
+        return 200, {"token": token, "role": role, "user_id": user.get_user_id()}
+
+    def student_request(self, student, method, parts, data):
+        if method == "GET" and parts == ["me", "courses"]:
+            # A lottery or another session may be changing these.
+            with self.service.reading([student]) as status:
+                if status != OK:
+                    return _http_status(status), {"status": status}
+                return 200, {"courses": [course_to_dict(c) for c in student.get_registered_courses()]}
+        if method == "POST" and parts == ["register"]:
+            course_id = str(data["course_id"])
+            window = self.window
+            if window is not None and not window.is_closed() and window.covers(course_id):
+                if self.system.find_course_by_id(course_id) is None:
+                    return 404, {"status": UNKNOWN_COURSE}
+                status = window.submit(student.get_user_id(), course_id)
+                if status != lottery.WINDOW_CLOSED:
+                    return _http_status(status), {"status": status}
+            status = self.service.register(student.get_user_id(), course_id)
+            return _http_status(status), {"status": status}
+        if method == "POST" and parts == ["drop"]:
+            status = self.service.drop(student.get_user_id(), str(data["course_id"]))
+            return _http_status(status), {"status": status}
+        if method == "GET" and parts == ["me", "record"]:
+            with self.service.reading([student]):
+                return 200, dict(student.record.to_dict(), credits=student.credits,
+                                 max_credits=student.record.max_credits)
+        if method == "GET" and parts == ["me", "waitlists"]:
+            with self.service.reading([student]) as status:
+                if status != OK:
+                    return _http_status(status), {"status": status}
+                return 200, {"waitlists": [{"course_id": c.get_course_id(),
+                                            "position": c.get_waitlist().position(student)}
+                                           for c in student.waitlisted_courses]}
+        if method == "POST" and parts == ["waitlist"]:
+            status = self.service.join_waitlist(student.get_user_id(), str(data["course_id"]))
+            return _http_status(status), {"status": status}
+        if method == "POST" and parts == ["waitlist", "leave"]:
+            status = self.service.leave_waitlist(student.get_user_id(), str(data["course_id"]))
+            return _http_status(status), {"status": status}
+        return 404, {"error": "not found"}
+
+    def admin_request(self, method, parts, data, query):
+        if method == "POST" and parts == ["courses"]:
+            status = self.service.create_course(
+                str(data["course_id"]), str(data["course_name"]), str(data["instructor"]),
+                str(data["schedule"]), int(data["max_students"]))
+            return _http_status(status), {"status": status}
+        if method == "DELETE" and len(parts) == 2 and parts[0] == "courses":
+            force = query.get("force", ["0"])[0] in ("1", "true", "yes")
+            status = self.service.delete_course(parts[1], force)
+            return _http_status(status), {"status": status}
+        if method == "GET" and parts == ["students"]:
+            with self.service.reading():
+                page, offset, limit = _page(self.system.students, query)
+                return 200, {"students": [{"user_id": s.get_user_id(), "username": s.get_username()}
+                                          for s in page],
+                             "offset": offset, "limit": limit, "total": len(self.system.students)}
+        if method == "POST" and parts == ["students"]:
+            password = str(data["password"])
+            if len(password) < 6:
+                return 400, {"error": "password must be at least 6 characters"}
+            status, student_id = self.service.add_student(str(data["username"]), password)
+            return _http_status(status), {"status": status, "user_id": student_id}
+        if method == "GET" and parts == ["stats"]:
+            with self.service.reading():
+                return 200, self.stats_summary(query)
+        if method == "POST" and parts == ["window"]:
+            return self.open_window(data)
+        if method == "POST" and parts == ["window", "close"]:
+            if self.window is None or self.window.is_closed():
+                return 409, {"error": "no registration window is open"}
+            return 200, self.close_window(self.window)
+        if method == "PUT" and len(parts) == 3 and parts[0] == "courses" and parts[2] == "rules":
+            credits = data.get("credits")
+            status = self.service.set_course_rules(parts[1], data.get("rules"),
+                                                   None if credits is None else int(credits))
+            return _http_status(status), {"status": status}
+        if method == "PUT" and len(parts) == 3 and parts[0] == "students" and parts[2] == "record":
+            status = self.service.set_student_record(parts[1], data)
+            return _http_status(status), {"status": status}
+        if method == "DELETE" and len(parts) == 2 and parts[0] == "students":
+            status = self.service.delete_student(parts[1])
+            if status == OK:
+                with self.sessions_lock:
+                    for token in [t for t, user in self.sessions.items() if user.get_user_id() == parts[1]]:
+                        del self.sessions[token]
+            return _http_status(status), {"status": status}
+        return 404, {"error": "not found"}
+
+    def course_rules(self, course_id):
+        course = self.system.find_course_by_id(course_id)
+        if course is None:
+            return 404, {"status": UNKNOWN_COURSE}
+        return 200, {"course_id": course.get_course_id(), "credits": course.get_credits(),
+                     "rules": course.rules.to_dict() if course.rules is not None else {},
+                     "requires": self.system.prerequisite_chain(course)}
+
+    def open_window(self, data):
+        course_ids = data.get("course_ids")
+        if course_ids is not None:
+            course_ids = [str(c) for c in course_ids]
+            unknown = [c for c in course_ids if self.system.find_course_by_id(c) is None]
+            if unknown:
+                return 404, {"error": f"unknown courses: {', '.join(unknown)}"}
+        seed = data.get("seed")
+        seconds = data.get("seconds")
+        seconds = None if seconds is None else float(seconds)
+        window = lottery.RegistrationWindow(course_ids, None if seed is None else int(seed),
+                                            str(data.get("policy", "random")), bool(data.get("waitlist")))
+        # Two admins may open a window at the same time.
+        with self.window_lock:
+            if self.window is not None and not self.window.is_closed():
+                return 409, {"error": "a registration window is already open"}
+            self.window = window
+            self.window_closes_at = None if seconds is None else time.monotonic() + seconds
+        if seconds is not None:
+            self.window_closing = asyncio.run_coroutine_threadsafe(
+                self.close_window_later(window, seconds), self.loop)
+        return 200, self.window_summary()
+
+    async def close_window_later(self, window, seconds):
+        # The lottery pauses registrations while it runs, so it runs off
+        # the event loop. Its errors are reported here rather than lost.
+        await asyncio.sleep(seconds)
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.close_window, window)
+        except Exception as error:
+            print(f"Closing the registration window failed: {error!r}", flush=True)
+
+    def close_window(self, window):
+        window.close(self.system, self.service)
+        if self.publisher is not None:
+            self.publisher.changed()
+        return self.window_summary()
+
+    def window_summary(self):
+        window = self.window
+        if window is None:
+            return {"state": "none"}
+        summary = {"state": "closed" if window.is_closed() else "open", "policy": window.policy,
+                   "course_ids": window.course_ids}
+        if not window.is_closed():
+            summary["requests"] = len(window)
+            if self.window_closes_at is not None:
+                remaining = self.window_closes_at - time.monotonic()
+                summary["closes_in"] = round(max(0.0, remaining), 1)
+        elif window.outcome is not None:
+            counts = {}
+            for result in window.outcome.results:
+                counts[result.status] = counts.get(result.status, 0) + 1
+            summary.update(seed=window.outcome.seed, requests=len(window.outcome.results), results=counts)
+        return summary
+
+    def stats_summary(self, query):
+        stats = self.system.stats
+        top = max(0, min(100, int(query.get("top", ["10"])[0])))
+        sections, seats, enrolled = stats.totals()
+        return {"sections": sections, "seats": seats, "enrolled": enrolled,
+                "fullest": [{"course_id": c.get_course_id(), "enrolled": len(c.enrolled_students),
+                             "max_students": c.get_max_students()} for c in stats.top_fullest(top)],
+                "departments": {name: {"sections": s, "seats": t, "enrolled": e}
+                                for name, (s, t, e) in stats.department_summary().items()}}
+
+
+async def publish_snapshots(server, interval):
+    # Republish the snapshot after each burst of changes. Writing it reads
+    # the whole graph, so other operations wait for it; they wait on their
+    # worker threads, and the event loop keeps taking requests.
+    # A failed publish is reported and tried again at the next interval.
+    loop = asyncio.get_running_loop()
+    while True:
+        if server.publisher.dirty:
+            try:
+                await loop.run_in_executor(None, server.service.run_exclusive, server.publisher.publish)
+            except Exception as error:
+                print(f"Publishing the catalog snapshot failed: {error!r}", flush=True)
+        await asyncio.sleep(interval)
+
+
+async def serve(host, port, system, snapshot=None, snapshot_interval=1.0):
+    server = RegistrationServer(system)
+    server.loop = asyncio.get_running_loop()
+    publishing = None
+    if snapshot:
+        server.publisher = SnapshotPublisher(system, snapshot)
+        publishing = asyncio.ensure_future(publish_snapshots(server, snapshot_interval))
+    listener = await asyncio.start_server(server.handle_connection, host, port, backlog=4096)
+    print(f"Serving on http://{host}:{port}", flush=True)
+    # Ctrl+C and SIGTERM stop the server between requests, so storage is
+    # checkpointed on either.
+    serving = asyncio.ensure_future(listener.serve_forever())
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, serving.cancel)
+    async with listener:
+        try:
+            await serving
+        except asyncio.CancelledError:
+            pass
+    if publishing is not None:
+        publishing.cancel()
+        server.publisher.publish_if_changed()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the registration system over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data", default=RegistrationSystem.DATA_FILE,
+                        help="data file (.json, or .db/.sqlite for SQLite)")
+    parser.add_argument("--snapshot", help="also publish a read-only catalog snapshot to this file")
+    parser.add_argument("--snapshot-interval", type=float, default=1.0,
+                        help="seconds between snapshot refreshes while changes come in")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args.metrics, args.profile)
+
+    system = RegistrationSystem(storage=open_storage(args.data))
+    try:
+        asyncio.run(serve(args.host, args.port, system, args.snapshot, args.snapshot_interval))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        system.storage.checkpoint(system)
+        system.storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+sqlite_storage.py
+Defines `SqliteStorage`, a `Storage` backend that keeps the registry in
+an SQLite database using only the standard library `sqlite3` module.
+
+Courses, users, enrollments and waitlists live in separate indexed tables.
+Course credits and rules, and students' academic records, are kept in
+two side tables (`course_rules`, `student_records`) holding the same
+JSON objects as data.json, so older databases only gain new tables. Every
+change recorded by the system is a single indexed INSERT/DELETE,
+committed immediately, and the database runs in WAL mode so readers are
+not blocked by a writer. All SQL is kept in module-level constants so
+`sqlite3`'s statement cache reuses the prepared statements.
+
+The backend covers durability only. It changes how state is made
+durable, not where it is served from: `load` still builds the whole
+object graph, and lookups use the in-memory hash indexes
+(registry_index.py) like the JSON backend. The search index,
+statistics, rules and waitlists all work on that graph, so memory grows
+with the registry whichever backend is used. Lazy, query-backed loading
+(memory-bounded operation) is out of scope. What SQLite removes is the
+periodic rewrite of the whole data file: there is nothing to compact,
+and a restart reads indexed tables instead of replaying a journal.
+"""
+
+import json
+import sqlite3
+import threading
+
+from storage import Storage, load_rules, load_record
+from course import Course
+from student import Student
+from admin import Admin
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    course_id TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    course_name TEXT NOT NULL,
+    instructor TEXT NOT NULL,
+    schedule TEXT NOT NULL,
+    max_students INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT NOT NULL UNIQUE,
+    username TEXT NOT NULL,
+    password TEXT NOT NULL,
+    role TEXT NOT NULL CHECK (role IN ('admin', 'student'))
+);
+CREATE INDEX IF NOT EXISTS users_by_username ON users (username);
+CREATE TABLE IF NOT EXISTS enrollments (
+    student_id TEXT NOT NULL,
+    course_id TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (student_id, course_id)
+);
+CREATE INDEX IF NOT EXISTS enrollments_by_course ON enrollments (course_id);
+CREATE TABLE IF NOT EXISTS waitlists (
+    position INTEGER PRIMARY KEY,
+    student_id TEXT NOT NULL,
+    course_id TEXT NOT NULL COLLATE NOCASE,
+    UNIQUE (course_id, student_id)
+);
+CREATE INDEX IF NOT EXISTS waitlists_by_student ON waitlists (student_id);
+CREATE TABLE IF NOT EXISTS course_rules (
+    course_id TEXT NOT NULL PRIMARY KEY COLLATE NOCASE,
+    credits INTEGER NOT NULL,
+    rules TEXT
+);
+CREATE TABLE IF NOT EXISTS student_records (
+    student_id TEXT NOT NULL PRIMARY KEY,
+    record TEXT NOT NULL
+);
+"""
+
+INSERT_COURSE = "INSERT OR IGNORE INTO courses VALUES (?, ?, ?, ?, ?)"
+DELETE_COURSE = "DELETE FROM courses WHERE course_id = ?"
+INSERT_USER = "INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?)"
+DELETE_USER = "DELETE FROM users WHERE user_id = ?"
+UPDATE_PASSWORD = "UPDATE users SET password = ? WHERE user_id = ?"
+INSERT_ENROLLMENT = "INSERT OR IGNORE INTO enrollments VALUES (?, ?)"
+DELETE_ENROLLMENT = "DELETE FROM enrollments WHERE student_id = ? AND course_id = ?"
+DELETE_COURSE_ENROLLMENTS = "DELETE FROM enrollments WHERE course_id = ?"
+DELETE_STUDENT_ENROLLMENTS = "DELETE FROM enrollments WHERE student_id = ?"
+INSERT_WAITLIST = "INSERT OR IGNORE INTO waitlists (student_id, course_id) VALUES (?, ?)"
+DELETE_WAITLIST = "DELETE FROM waitlists WHERE student_id = ? AND course_id = ?"
+DELETE_COURSE_WAITLIST = "DELETE FROM waitlists WHERE course_id = ?"
+DELETE_STUDENT_WAITLISTS = "DELETE FROM waitlists WHERE student_id = ?"
+UPSERT_RULES = "INSERT OR REPLACE INTO course_rules VALUES (?, ?, ?)"
+DELETE_RULES = "DELETE FROM course_rules WHERE course_id = ?"
+UPSERT_RECORD = "INSERT OR REPLACE INTO student_records VALUES (?, ?)"
+DELETE_RECORD = "DELETE FROM student_records WHERE student_id = ?"
+
+SELECT_COURSES = "SELECT course_id, course_name, instructor, schedule, max_students FROM courses ORDER BY rowid"
+SELECT_USERS = "SELECT username, password, user_id, role FROM users ORDER BY rowid"
+SELECT_ENROLLMENTS = "SELECT student_id, course_id FROM enrollments ORDER BY rowid"
+SELECT_WAITLISTS = "SELECT student_id, course_id FROM waitlists ORDER BY position"
+SELECT_RULES = "SELECT course_id, credits, rules FROM course_rules"
+SELECT_RECORDS = "SELECT student_id, record FROM student_records"
+
+
+class SqliteStorage(Storage):
+    # OOP - Inheritance:
+    # SqliteStorage implements the same Storage interface as JsonStorage,
+    # so RegistrationSystem does not know which backend it is using.
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def load(self, system):
+        # Rows are streamed from the cursors, so only the objects being
+        # built are held in memory, never a full copy of the tables.
+        connection = self._connection
+        loaded_anything = False
+        # Rules and records are few, so they are read up front and attached
+        # as their courses and students are built.
+        rules = {course_id.casefold(): (credits, text)
+                 for course_id, credits, text in connection.execute(SELECT_RULES)}
+        records = dict(connection.execute(SELECT_RECORDS))
+        for row in connection.execute(SELECT_COURSES):
+            credits, text = rules.get(row[0].casefold(), (None, None))
+            course = Course(*row, credits)
+            load_rules(course, json.loads(text) if text else None)
+            system.add_course(course)
+            loaded_anything = True
+        for username, password, user_id, role in connection.execute(SELECT_USERS):
+            if role == "admin":
+                system.add_admin(Admin(username, password, user_id))
+            else:
+                student = Student(username, password, user_id)
+                text = records.get(user_id)
+                load_record(student, json.loads(text) if text else None)
+                system.add_student(student)
+            loaded_anything = True
+        for student_id, course_id in connection.execute(SELECT_ENROLLMENTS):
+            system.load_enrollment(student_id, course_id)
+        for student_id, course_id in connection.execute(SELECT_WAITLISTS):
+            system.load_waitlist(student_id, course_id)
+        if not loaded_anything:
+            print("No existing data found. Starting fresh system.")
+
+    def record(self, operation, *args):
+        self.record_many([(operation, *args)])
+
+    def record_many(self, operations):
+        # One transaction for the whole batch.
+        with self._lock, self._connection as connection:
+            for operation, *args in operations:
+                self._execute(connection, operation, args)
+
+    def _execute(self, connection, operation, args):
+        if operation == "create_course":
+            connection.execute(INSERT_COURSE, args)
+        elif operation == "delete_course":
+            connection.execute(DELETE_COURSE_ENROLLMENTS, args)
+            connection.execute(DELETE_COURSE_WAITLIST, args)
+            connection.execute(DELETE_RULES, args)
+            connection.execute(DELETE_COURSE, args)
+        elif operation == "add_student":
+            connection.execute(INSERT_USER, (args[2], args[0], args[1], "student"))
+        elif operation == "delete_student":
+            connection.execute(DELETE_STUDENT_ENROLLMENTS, args)
+            connection.execute(DELETE_STUDENT_WAITLISTS, args)
+            connection.execute(DELETE_RECORD, args)
+            connection.execute(DELETE_USER, args)
+        elif operation == "register":
+            # Enrolling also takes the student off the course's waitlist.
+            connection.execute(INSERT_ENROLLMENT, args)
+            connection.execute(DELETE_WAITLIST, args)
+        elif operation == "drop":
+            connection.execute(DELETE_ENROLLMENT, args)
+        elif operation == "waitlist":
+            connection.execute(INSERT_WAITLIST, args)
+        elif operation == "unwaitlist":
+            connection.execute(DELETE_WAITLIST, args)
+        elif operation == "set_rules":
+            course_id, credits, rules = args
+            connection.execute(UPSERT_RULES, (course_id, credits, json.dumps(rules) if rules else None))
+        elif operation == "set_record":
+            student_id, record = args
+            if record:
+                connection.execute(UPSERT_RECORD, (student_id, json.dumps(record)))
+            else:
+                connection.execute(DELETE_RECORD, (student_id,))
+        elif operation == "set_password":
+            connection.execute(UPDATE_PASSWORD, (args[1], args[0]))
+        else:
+            print(f"Ignoring unknown storage operation: {operation}")
+
+    def save(self, system):
+        # Replace the whole database contents in one transaction.
+        with self._lock, self._connection as connection:
+            connection.execute("DELETE FROM student_records")
+            connection.execute("DELETE FROM course_rules")
+            connection.execute("DELETE FROM waitlists")
+            connection.execute("DELETE FROM enrollments")
+            connection.execute("DELETE FROM users")
+            connection.execute("DELETE FROM courses")
+            connection.executemany(INSERT_COURSE, (
+                (c.get_course_id(), c.get_course_name(), c.get_instructor(),
+                 c.get_schedule(), c.get_max_students()) for c in system.courses))
+            connection.executemany(INSERT_USER, (
+                (a.get_user_id(), a.get_username(), a.password, "admin") for a in system.admins))
+            connection.executemany(INSERT_USER, (
+                (s.get_user_id(), s.get_username(), s.password, "student") for s in system.students))
+            connection.executemany(INSERT_ENROLLMENT, (
+                (s.get_user_id(), c.get_course_id())
+                for s in system.students for c in s.get_registered_courses()))
+            connection.executemany(INSERT_WAITLIST, (
+                (s.get_user_id(), c.get_course_id())
+                for c in system.courses for s in c.get_waitlist()))
+            connection.executemany(UPSERT_RULES, (
+                (c.get_course_id(), c.get_credits(), json.dumps(c.rules.to_dict()) if c.rules else None)
+                for c in system.courses if c.rules is not None or c.credits != Course.DEFAULT_CREDITS))
+            connection.executemany(UPSERT_RECORD, (
+                (s.get_user_id(), json.dumps(s.record.to_dict()))
+                for s in system.students if not s.record.is_empty()))
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,217 @@
+"""
+storage.py
+Defines the storage interface used by `RegistrationSystem` and the
+default `JsonStorage` backend (the `data.json` snapshot plus its journal).
+
+A storage backend is responsible for three things:
+
+- `load(system)`: build the system's courses, users, enrollments and
+  waitlists.
+- `record(operation, *args)`: make one change durable as soon as it
+  happens (the operations are the ones `RegistrationSystem.apply_operation`
+  understands: create_course, delete_course, add_student, delete_student,
+  register, drop, waitlist, unwaitlist, set_rules, set_record and
+  set_password).
+- `save(system)`: write a complete copy of the system's state.
+
+`open_storage(path)` picks the backend from the file name, so a path
+ending in `.db`, `.sqlite` or `.sqlite3` uses `SqliteStorage`.
+"""
+
+import os
+import threading
+
+from json_stream import iter_json_items, write_json_sections
+from journal import Journal
+from course import Course
+from student import Student
+from admin import Admin
+from rules import CourseRules, AcademicRecord
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+# Attach saved rules to a course (or a record to a student) before it is
+# added to the system, which compiles them. Invalid data is reported and
+# skipped rather than stopping the load.
+def load_rules(course, rules):
+    if rules:
+        try:
+            course.rules = CourseRules.from_dict(rules)
+        except ValueError as error:
+            print(f"Ignoring invalid rules for {course.get_course_id()}: {error}")
+
+
+def load_record(student, record):
+    if record:
+        try:
+            student.record = AcademicRecord.from_dict(record)
+        except ValueError as error:
+            print(f"Ignoring invalid record for {student.get_user_id()}: {error}")
+
+
+class Storage:
+    # OOP - Abstraction:
+    # RegistrationSystem only talks to this interface, so the same menus
+    # work on top of a JSON file or an SQLite database.
+    def load(self, system):
+        raise NotImplementedError
+
+    def record(self, operation, *args):
+        raise NotImplementedError
+
+    # Record a batch of (operation, *args) tuples; backends may do this in
+    # one write or one transaction.
+    def record_many(self, operations):
+        for operation, *args in operations:
+            self.record(operation, *args)
+
+    def save(self, system):
+        raise NotImplementedError
+
+    # True when enough has been recorded that `checkpoint` should run.
+    def needs_checkpoint(self):
+        return False
+
+    # Persist anything still pending (at the end of a session, or when
+    # needs_checkpoint says so).
+    def checkpoint(self, system):
+        pass
+
+    def close(self):
+        pass
+
+
+class JsonStorage(Storage):
+    # Number of journaled operations after which the snapshot is rewritten.
+    COMPACT_EVERY = 1000
+    # fsync every journal entry (survives power loss, not just a crash).
+    JOURNAL_FSYNC = False
+
+    # OOP - Inheritance:
+    # JsonStorage implements the Storage interface with a full snapshot in
+    # `path` plus an append-only `Journal` of the changes made since.
+    def __init__(self, path):
+        self.path = path
+        self.journal = Journal(path + ".journal", fsync=self.JOURNAL_FSYNC)
+        self._lock = threading.Lock()
+
+    def load(self, system):
+        # The file is read record by record (see json_stream.py) and each
+        # object is built as soon as its record has been parsed.
+        pending_enrollments = []
+        pending_waitlists = []
+        try:
+            with open(self.path, "r") as file:
+                for section, item in iter_json_items(file):
+                    if section == "courses":
+                        course = Course(
+                            item["course_id"],
+                            item["course_name"],
+                            item["instructor"],
+                            item["schedule"],
+                            item["max_students"],
+                            item.get("credits")
+                        )
+                        load_rules(course, item.get("rules"))
+                        system.add_course(course)
+                    elif section == "students":
+                        student = Student(item["username"], item["password"], item["user_id"])
+                        load_record(student, item)
+                        system.add_student(student)
+                    elif section == "admins":
+                        system.add_admin(Admin(item["username"], item["password"], item["user_id"]))
+                    elif section == "enrollments":
+                        # Enrollments are [student_id, course_id] edges. They are
+                        # written last, but tolerate hand-edited files that list
+                        # them before the students or courses they refer to.
+                        if not system.load_enrollment(*item):
+                            pending_enrollments.append(item)
+                    elif section == "waitlists":
+                        # [student_id, course_id] edges in queue order.
+                        if not system.load_waitlist(*item):
+                            pending_waitlists.append(item)
+
+        except FileNotFoundError:
+            print("No existing data found. Starting fresh system.")
+
+        for student_id, course_id in pending_enrollments:
+            if not system.load_enrollment(student_id, course_id):
+                print(f"Skipping enrollment of unknown student/course: {student_id} -> {course_id}")
+        for student_id, course_id in pending_waitlists:
+            if not system.load_waitlist(student_id, course_id):
+                print(f"Skipping waitlist entry of unknown student/course: {student_id} -> {course_id}")
+
+        # Re-apply the changes made since the snapshot was written.
+        for operation, args in self.journal.replay():
+            system.apply_operation(operation, args)
+
+    def record(self, operation, *args):
+        with self._lock:
+            self.journal.append(operation, *args)
+
+    def record_many(self, operations):
+        with self._lock:
+            self.journal.append_many(operations)
+
+    def needs_checkpoint(self):
+        return len(self.journal) >= self.COMPACT_EVERY
+
+    def save(self, system):
+        # Compaction: write a complete snapshot to a temporary file, swap it
+        # in atomically, and only then empty the journal. A crash at any point
+        # leaves either the old snapshot plus journal or the new snapshot.
+        sections = [
+            ("courses", (
+                {
+                    "course_id": c.get_course_id(),
+                    "course_name": c.get_course_name(),
+                    "instructor": c.get_instructor(),
+                    "schedule": c.get_schedule(),
+                    "max_students": c.get_max_students(),
+                    "credits": c.get_credits(),
+                    **({"rules": c.rules.to_dict()} if c.rules is not None else {})
+                } for c in system.courses
+            )),
+            ("students", (
+                {"username": s.get_username(), "password": s.password, "user_id": s.get_user_id(),
+                 **s.record.to_dict()}
+                for s in system.students
+            )),
+            ("admins", (
+                {"username": a.get_username(), "password": a.password, "user_id": a.get_user_id()}
+                for a in system.admins
+            )),
+            ("enrollments", (
+                [s.get_user_id(), c.get_course_id()]
+                for s in system.students for c in s.get_registered_courses()
+            )),
+            ("waitlists", (
+                [s.get_user_id(), c.get_course_id()]
+                for c in system.courses for s in c.get_waitlist()
+            )),
+        ]
+        temp_file = self.path + ".tmp"
+        with self._lock:
+            with open(temp_file, "w") as file:
+                write_json_sections(file, sections)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_file, self.path)
+            self.journal.reset()
+
+    def checkpoint(self, system):
+        # Fold the session's journal into the snapshot, if anything changed.
+        if len(self.journal):
+            self.save(system)
+
+    def close(self):
+        self.journal.close()
+
+
+def open_storage(path):
+    # Choose the backend from the file name.
+    if path.lower().endswith(SQLITE_SUFFIXES):
+        from sqlite_storage import SqliteStorage
+        return SqliteStorage(path)
+    return JsonStorage(path)
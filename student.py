@@ -4,10 +4,58 @@ Defines the `Student` class which models a student user in the system.
 
 Students can register for courses, drop them, view their own registered
 courses, and the class enforces simple constraints (capacity and schedule
-conflicts). The class reuses authentication behavior from `User`.
+conflicts). Schedule conflicts are answered by an `IntervalIndex` over the
+parsed meeting times of the student's courses. Prerequisites, credit
+limits and the other course rules are checked against the student's
+`record` and running `credits`/`registered_bits` (see rules.py). When a
+course is full the student can join its waitlist instead. The class reuses
+authentication behavior from `User`.
 """
 
 from user import User
+from ordered_set import OrderedSet
+from schedule import IntervalIndex
+from rules import (check_rules, explain, NO_RECORD, PREREQUISITE_MISSING, COREQUISITE_MISSING,
+                   EXCLUDED, RESTRICTED, CREDIT_LIMIT)
+
+# Reasons a registration can be refused, as returned by check_registration.
+COURSE_FULL = "full"
+TIME_CONFLICT = "conflict"
+ALREADY_REGISTERED = "duplicate"
+
+# Reasons joining a waitlist can be refused, as returned by check_waitlist.
+ALREADY_WAITLISTED = "waitlisted"
+SEATS_AVAILABLE = "open"
+WAITLIST_FULL = "waitlist_full"
+
+REGISTRATION_MESSAGES = {
+    COURSE_FULL: "Registration failed: Course is full.",
+    TIME_CONFLICT: "Registration failed: Time conflict with another course.",
+    ALREADY_REGISTERED: "You are already registered for this course.",
+    PREREQUISITE_MISSING: "Registration failed: Prerequisites not met.",
+    COREQUISITE_MISSING: "Registration failed: Co-requisites not met.",
+    EXCLUDED: "Registration failed: Excluded by a course you have taken.",
+    RESTRICTED: "Registration failed: This section is restricted.",
+    CREDIT_LIMIT: "Registration failed: Credit limit reached.",
+}
+
+WAITLIST_MESSAGES = {
+    ALREADY_REGISTERED: "You are already registered for this course.",
+    ALREADY_WAITLISTED: "You are already on the waitlist for this course.",
+    SEATS_AVAILABLE: "This course has open seats; register for it instead.",
+    WAITLIST_FULL: "The waitlist for this course is full.",
+    TIME_CONFLICT: "Cannot join waitlist: Time conflict with another course.",
+    PREREQUISITE_MISSING: "Cannot join waitlist: Prerequisites not met.",
+    COREQUISITE_MISSING: "Cannot join waitlist: Co-requisites not met.",
+    EXCLUDED: "Cannot join waitlist: Excluded by a course you have taken.",
+    RESTRICTED: "Cannot join waitlist: This section is restricted.",
+    CREDIT_LIMIT: "Cannot join waitlist: Credit limit reached.",
+}
+
+# Shared by every student who is not on any waitlist, so a large registry
+# does not hold an empty set per student. Never modified; add_to_waitlist
+# replaces it with a student's own set.
+_NO_WAITLISTS = OrderedSet()
 
 
 class Student(User):
@@ -16,38 +64,148 @@ class Student(User):
     # OOP - Encapsulation:
     # Student keeps its registered courses in `registered_courses` and provides
     # methods to interact with them (register_course, drop_course, view_registered_courses).
+    __slots__ = ("registered_courses", "_schedule_index", "_unparsed_schedules", "waitlisted_courses",
+                 "record", "credits", "registered_bits")
+
     def __init__(self, username, password, student_id):
         super().__init__(username, password, student_id)
-        self.registered_courses = []
-
-    def register_course(self, course):
-        if course.is_full():
-            print("Registration failed: Course is full.")
-            return
+        self.registered_courses = OrderedSet()
+        self._schedule_index = IntervalIndex()
+        # Counts of registered schedules that could not be parsed; these are
+        # still compared by exact string as before. Created on first use.
+        self._unparsed_schedules = None
+        self.waitlisted_courses = _NO_WAITLISTS
+        # Shared empty record until RuleEngine.set_record gives one; the
+        # credits and bits of the registered courses are kept by enroll.
+        self.record = NO_RECORD
+        self.credits = 0
+        self.registered_bits = 0
 
+    # Return the reason `course` cannot be added, or None if it can.
+    # Students already waiting for the course have first claim on its seats.
+    def check_registration(self, course):
+        if course.is_full() or course.has_waitlist_ahead_of(self):
+            return COURSE_FULL
         if self.has_time_conflict(course):
-            print("Registration failed: Time conflict with another course.")
-            return
-
+            return TIME_CONFLICT
         if course in self.registered_courses:
-            print("You are already registered for this course.")
-            return
+            return ALREADY_REGISTERED
+        return check_rules(self, course)
 
-        self.registered_courses.append(course)
-        course.add_student(self)
+    # register_course and drop_course return True when the enrollment changed.
+    def register_course(self, course):
+        reason = self.check_registration(course)
+        if reason is not None:
+            print(REGISTRATION_MESSAGES[reason])
+            detail = explain(self, course, reason)
+            if detail:
+                print(detail)
+            return False
+
+        self.enroll(course)
         print(f"Successfully registered for: {course.get_course_name()}")
+        return True
 
     def drop_course(self, course):
         if course in self.registered_courses:
-            self.registered_courses.remove(course)
-            course.remove_student(self)
+            self.unenroll(course)
             print(f"Successfully dropped: {course.get_course_name()}")
+            return True
+        print("You are not registered for this course.")
+        return False
+
+    # Return the reason this student cannot wait for `course`, or None.
+    def check_waitlist(self, course):
+        if course in self.registered_courses:
+            return ALREADY_REGISTERED
+        if course in self.waitlisted_courses:
+            return ALREADY_WAITLISTED
+        if not course.is_full() and not course.has_waitlist_ahead_of(self):
+            return SEATS_AVAILABLE
+        if course.get_waitlist().is_full():
+            return WAITLIST_FULL
+        if self.has_time_conflict(course):
+            return TIME_CONFLICT
+        return check_rules(self, course)
+
+    # join_waitlist and leave_waitlist return True when the waitlist changed.
+    def join_waitlist(self, course):
+        reason = self.check_waitlist(course)
+        if reason is not None:
+            print(WAITLIST_MESSAGES[reason])
+            return False
+
+        self.add_to_waitlist(course)
+        position = course.get_waitlist().position(self)
+        print(f"Added to the waitlist for {course.get_course_name()} (position {position}).")
+        return True
+
+    def leave_waitlist(self, course):
+        if course in self.waitlisted_courses:
+            self.remove_from_waitlist(course)
+            print(f"Left the waitlist for: {course.get_course_name()}")
+            return True
+        print("You are not on the waitlist for this course.")
+        return False
+
+    # Link/unlink both sides of a waitlist entry without any checks or output.
+    def add_to_waitlist(self, course):
+        if self.waitlisted_courses is _NO_WAITLISTS:
+            self.waitlisted_courses = OrderedSet()
+        self.waitlisted_courses.add(course)
+        course.get_waitlist().add(self)
+
+    def remove_from_waitlist(self, course):
+        self.waitlisted_courses.discard(course)
+        course.get_waitlist().discard(self)
+
+    # Leave every waitlist (used when the student is deleted).
+    def clear_waitlists(self):
+        for course in list(self.waitlisted_courses):
+            self.remove_from_waitlist(course)
+
+    # Link/unlink both sides of an enrollment without any checks or output.
+    # Enrolling also takes the student off the course's waitlist.
+    def enroll(self, course):
+        if course in self.registered_courses:
+            return
+        if course in self.waitlisted_courses:
+            self.remove_from_waitlist(course)
+        self.registered_courses.add(course)
+        self.credits += course.credits
+        if course.bit:
+            self.registered_bits |= course.bit
+        intervals = course.get_time_intervals()
+        if intervals is None:
+            schedule = course.get_schedule()
+            if self._unparsed_schedules is None:
+                self._unparsed_schedules = {}
+            self._unparsed_schedules[schedule] = self._unparsed_schedules.get(schedule, 0) + 1
         else:
-            print("You are not registered for this course.")
+            self._schedule_index.add(course, intervals)
+        course.add_student(self)
+
+    def unenroll(self, course):
+        if course not in self.registered_courses:
+            return
+        self.registered_courses.discard(course)
+        self.credits -= course.credits
+        if course.bit:
+            self.registered_bits &= ~course.bit
+        intervals = course.get_time_intervals()
+        if intervals is None:
+            schedule = course.get_schedule()
+            remaining = self._unparsed_schedules.pop(schedule) - 1
+            if remaining:
+                self._unparsed_schedules[schedule] = remaining
+        else:
+            self._schedule_index.remove(course, intervals)
+        course.remove_student(self)
 
     def view_registered_courses(self):
         if not self.registered_courses:
             print("You are not registered for any courses.")
+            self.view_waitlists()
             return
 
         print("\nYour Registered Courses:")
@@ -56,19 +214,35 @@ class Student(User):
         print("--------------------------------------------------")
 
         for course in self.registered_courses:
-            print(f"{course.get_course_id():<15} "
-                  f"{course.get_course_name():<20} "
-                  f"{course.get_schedule():<15} "
-                  f"{course.get_instructor():<10}")
+            print(f"{course.course_id:<15} "
+                  f"{course.course_name:<20} "
+                  f"{course.schedule:<15} "
+                  f"{course.instructor:<10}")
 
         print("--------------------------------------------------")
         print(f"Total registered: {len(self.registered_courses)} courses")
+        self.view_waitlists()
+
+    def view_waitlists(self):
+        if not self.waitlisted_courses:
+            return
+        print("\nYour Waitlists:")
+        for course in self.waitlisted_courses:
+            position = course.get_waitlist().position(self)
+            print(f"{course.get_course_id():<15} {course.get_course_name():<20} position {position}")
 
     def has_time_conflict(self, new_course):
-        for course in self.registered_courses:
-            if course.get_schedule() == new_course.get_schedule():
-                return True
-        return False
+        return self.get_conflicting_course(new_course) is not None
+
+    def get_conflicting_course(self, new_course):
+        intervals = new_course.get_time_intervals()
+        if intervals is None:
+            # Unrecognised schedule text: fall back to exact string equality.
+            if self._unparsed_schedules and new_course.get_schedule() in self._unparsed_schedules:
+                return next(c for c in self.registered_courses
+                            if c.get_schedule() == new_course.get_schedule())
+            return None
+        return self._schedule_index.overlapping(intervals)
 
     def get_registered_courses(self):
         return self.registered_courses
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+tests/test_journal.py
+Journal replay, including a tail torn by a crash, and restarting the
+system from a snapshot plus its journal.
+
+    python -m pytest tests
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from journal import Journal
+from registration_system import RegistrationSystem
+from storage import JsonStorage
+
+
+def quietly(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "data.json.journal")
+        self.journal = Journal(self.path)
+        self.addCleanup(self.journal.close)
+
+    def replay(self):
+        return quietly(lambda: list(self.journal.replay()))
+
+    def test_round_trip(self):
+        self.journal.append("register", "S001", "CS101")
+        self.journal.append_many([("drop", "S001", "CS101"), ("waitlist", "S002", "CS101")])
+        self.assertEqual(self.replay(), [("register", ["S001", "CS101"]), ("drop", ["S001", "CS101"]),
+                                         ("waitlist", ["S002", "CS101"])])
+        self.assertEqual(len(self.journal), 3)
+
+    def test_missing_file_replays_nothing(self):
+        self.assertEqual(self.replay(), [])
+
+    def test_torn_tail_is_discarded_and_truncated(self):
+        self.journal.append("register", "S001", "CS101")
+        self.journal.close()
+        intact = os.path.getsize(self.path)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write('["register", "S002", "CS')
+        self.assertEqual(self.replay(), [("register", ["S001", "CS101"])])
+        self.assertEqual(os.path.getsize(self.path), intact)
+        # Later entries start on a clean line.
+        self.journal.append("drop", "S001", "CS101")
+        self.assertEqual(self.replay(), [("register", ["S001", "CS101"]), ("drop", ["S001", "CS101"])])
+
+    def test_damaged_entry_ends_replay(self):
+        self.journal.append("register", "S001", "CS101")
+        self.journal.close()
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write("not json\n")
+            file.write('["drop", "S001", "CS101"]\n')
+        self.assertEqual(self.replay(), [("register", ["S001", "CS101"])])
+        self.assertEqual(len(self.journal), 1)
+        with open(self.path, encoding="utf-8") as file:
+            self.assertEqual(file.read(), '["register", "S001", "CS101"]\n')
+
+    def test_reset_empties_the_journal(self):
+        self.journal.append("register", "S001", "CS101")
+        self.journal.reset()
+        self.assertEqual(self.replay(), [])
+        self.assertEqual(len(self.journal), 0)
+
+
+class RestartTest(unittest.TestCase):
+    # A system started on the same files sees every recorded change.
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "data.json")
+
+    def start(self):
+        system = quietly(RegistrationSystem, JsonStorage(self.path), False)
+        self.addCleanup(system.storage.close)
+        return system
+
+    @staticmethod
+    def change(system, operation, *args):
+        # Make a change in memory and record it, as the menus do.
+        system.apply_operation(operation, list(args))
+        system.record(operation, *args)
+
+    def test_journal_replayed_over_snapshot(self):
+        system = self.start()
+        self.change(system, "create_course", "CS101", "Intro", "Dr. Smith", "MWF 10-11", 30)
+        self.change(system, "add_student", "john", "secret", "S001")
+        self.change(system, "register", "S001", "CS101")
+        system.storage.close()
+        # The journal was never compacted, so the restart replays it.
+        self.assertFalse(os.path.exists(self.path))
+
+        restarted = self.start()
+        course = restarted.find_course_by_id("CS101")
+        student = restarted.index.find_user_by_id("S001")
+        self.assertIsNotNone(course)
+        self.assertIn(course, student.get_registered_courses())
+        self.assertIn(student, course.get_enrolled_students())
+
+    def test_torn_tail_after_snapshot(self):
+        system = self.start()
+        self.change(system, "create_course", "CS101", "Intro", "Dr. Smith", "MWF 10-11", 30)
+        self.change(system, "add_student", "john", "secret", "S001")
+        quietly(system.save_data)
+        self.change(system, "register", "S001", "CS101")
+        system.storage.close()
+        with open(self.path + ".journal", "a", encoding="utf-8") as file:
+            file.write('["drop", "S001"')
+
+        restarted = self.start()
+        student = restarted.index.find_user_by_id("S001")
+        self.assertEqual([c.get_course_id() for c in student.get_registered_courses()], ["CS101"])
@@ -0,0 +1,125 @@
+"""
+tests/test_rules.py
+The registration rules engine: prerequisites, co-requisites, exclusions,
+section restrictions and credit limits, checked with the compiled
+bitsets.
+
+    python -m pytest tests
+"""
+
+import unittest
+
+from course import Course
+from rules import (COREQUISITE_MISSING, CREDIT_LIMIT, EXCLUDED, PREREQUISITE_MISSING,
+                   RESTRICTED, AcademicRecord, CourseRules, RuleEngine, check_rules)
+from student import Student
+
+
+class RulesTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = RuleEngine()
+        self.courses = {}
+        for course_id in ("CS101", "CS201", "CS301", "MATH101", "MATH102"):
+            self.courses[course_id] = course = Course(course_id, course_id, "Staff", "TBA", 30)
+            self.engine.add_course(course)
+        self.student = Student("john", "secret", "S001")
+
+    def rules(self, course_id, **rules):
+        self.engine.set_rules(self.courses[course_id], CourseRules(**rules))
+
+    def record(self, **record):
+        self.engine.set_record(self.student, AcademicRecord(**record))
+
+    def check(self, course_id):
+        return check_rules(self.student, self.courses[course_id])
+
+    def test_no_rules(self):
+        self.assertIsNone(self.check("CS101"))
+
+    def test_prerequisite(self):
+        self.rules("CS201", prerequisites=["CS101"])
+        self.assertEqual(self.check("CS201"), PREREQUISITE_MISSING)
+        self.record(completed=["cs101"])
+        self.assertIsNone(self.check("CS201"))
+
+    def test_any_course_of_a_group_counts(self):
+        self.rules("CS301", prerequisites=[["MATH101", "MATH102"], "CS201"])
+        self.record(completed=["MATH102"])
+        self.assertEqual(self.check("CS301"), PREREQUISITE_MISSING)
+        self.record(completed=["MATH102", "CS201"])
+        self.assertIsNone(self.check("CS301"))
+
+    def test_record_set_before_the_rule(self):
+        # The completed id has no bit yet; it is given one by the rule.
+        self.record(completed=["CS101"])
+        self.rules("CS201", prerequisites=["CS101"])
+        self.assertIsNone(self.check("CS201"))
+
+    def test_corequisite_can_be_taken_alongside(self):
+        self.rules("CS201", corequisites=["MATH101"])
+        self.assertEqual(self.check("CS201"), COREQUISITE_MISSING)
+        self.student.enroll(self.courses["MATH101"])
+        self.assertIsNone(self.check("CS201"))
+
+    def test_exclusion(self):
+        self.rules("MATH102", exclusions=["MATH101"])
+        self.assertIsNone(self.check("MATH102"))
+        self.student.enroll(self.courses["MATH101"])
+        self.assertEqual(self.check("MATH102"), EXCLUDED)
+
+    def test_restricted_section(self):
+        self.rules("CS301", restricted_to=["Honors"])
+        self.record(groups=["cs-major"])
+        self.assertEqual(self.check("CS301"), RESTRICTED)
+        self.record(groups=["cs-major", "honors"])
+        self.assertIsNone(self.check("CS301"))
+
+    def test_credit_limit(self):
+        self.record(max_credits=6)
+        self.student.enroll(self.courses["CS101"])
+        self.assertIsNone(self.check("MATH101"))
+        self.student.enroll(self.courses["MATH101"])
+        self.assertEqual(self.check("MATH102"), CREDIT_LIMIT)
+
+    def test_no_credit_limit_without_a_record(self):
+        for course_id in ("CS101", "MATH101", "MATH102", "CS201"):
+            self.student.enroll(self.courses[course_id])
+        self.assertIsNone(self.check("CS301"))
+
+    def test_credits_change_follows_enrolled_students(self):
+        self.record(max_credits=7)
+        self.student.enroll(self.courses["CS101"])
+        self.engine.set_rules(self.courses["CS101"], None, credits=4)
+        self.assertEqual(self.student.credits, 4)
+        self.assertIsNone(self.check("MATH101"))
+        self.engine.set_rules(self.courses["CS101"], None, credits=5)
+        self.assertEqual(self.check("MATH101"), CREDIT_LIMIT)
+
+    def test_course_added_after_its_rule_gets_its_bit(self):
+        self.rules("CS301", exclusions=["CS999"])
+        late = Course("CS999", "Late", "Staff", "TBA", 30)
+        self.engine.add_course(late)
+        self.student.enroll(late)
+        self.assertEqual(self.check("CS301"), EXCLUDED)
+
+    def test_all_prerequisites_in_order(self):
+        self.rules("CS301", prerequisites=["CS201", "MATH102"])
+        self.rules("CS201", prerequisites=["CS101"])
+        self.rules("MATH102", prerequisites=["MATH101"])
+        order = self.engine.all_prerequisites("CS301")
+        self.assertEqual(sorted(order), ["cs101", "cs201", "math101", "math102"])
+        self.assertLess(order.index("cs101"), order.index("cs201"))
+        self.assertLess(order.index("math101"), order.index("math102"))
+
+    def test_cycle_is_reported(self):
+        self.rules("CS201", prerequisites=["CS301"])
+        self.rules("CS301", prerequisites=["CS201"])
+        self.assertEqual(len(self.engine.check_graph()), 1)
+
+    def test_invalid_rules(self):
+        with self.assertRaises(ValueError):
+            CourseRules.from_dict({"prerequisites": "CS101"})
+        with self.assertRaises(ValueError):
+            CourseRules.from_dict({"required": ["CS101"]})
+        with self.assertRaises(ValueError):
+            AcademicRecord(max_credits=-1)
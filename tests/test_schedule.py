@@ -0,0 +1,55 @@
+"""
+tests/test_schedule.py
+Day-name parsing in schedule strings.
+
+    python -m pytest tests
+"""
+
+import unittest
+
+from catalog import parse_day
+from schedule import meeting_days, parse_schedule
+
+
+def days(schedule):
+    return sorted(meeting_days(parse_schedule(schedule)))
+
+
+class DayNameTest(unittest.TestCase):
+    def test_three_letter_names(self):
+        for number, text in enumerate(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]):
+            self.assertEqual(days(f"{text} 10-11"), [number], text)
+
+    def test_full_names(self):
+        for number, text in enumerate(["Monday", "Tuesday", "Wednesday", "Thursday",
+                                       "Friday", "Saturday", "Sunday"]):
+            self.assertEqual(days(f"{text} 10-11"), [number], text)
+
+    def test_codes(self):
+        self.assertEqual(days("MWF 10-11"), [0, 2, 4])
+        self.assertEqual(days("TTH 1-2:30"), [1, 3])
+        self.assertEqual(days("TuTh 1-2"), [1, 3])
+        self.assertEqual(days("MTWRF 8-9"), [0, 1, 2, 3, 4])
+        self.assertEqual(days("SA 9-10"), [5])
+        self.assertEqual(days("M2-3"), [0])
+
+    def test_joined_names(self):
+        self.assertEqual(days("MonWedFri 9-10"), [0, 2, 4])
+        self.assertEqual(days("Tues 9-10, Thurs 9-10"), [1, 3])
+
+    def test_saturday_does_not_meet_on_tuesday(self):
+        saturday = parse_schedule("Sat 10-11")
+        tuesday = parse_schedule("T 10:30-11")
+        self.assertFalse(any(s1 < e2 and s2 < e1 for s1, e1 in saturday for s2, e2 in tuesday))
+
+    def test_unknown_days(self):
+        self.assertIsNone(parse_schedule("Xyz 10-11"))
+        self.assertIsNone(parse_schedule("Mo 10-11"))
+
+    def test_agrees_with_catalog_day_filter(self):
+        for text in ["Thu", "Thursday", "TH", "Sat", "Sun", "Tue", "Wed"]:
+            self.assertEqual(days(f"{text} 10-11"), [parse_day(text)], text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+tests/test_waitlist.py
+Waitlist order, and promotion from the waitlist when a seat frees up in
+`RegistrationService`.
+
+    python -m pytest tests
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from course import Course
+from registration_service import RegistrationService, OK
+from registration_system import RegistrationSystem
+from storage import JsonStorage
+from student import COURSE_FULL, SEATS_AVAILABLE, Student
+from waitlist import Waitlist
+
+
+class WaitlistTest(unittest.TestCase):
+    def test_first_in_first_out(self):
+        waitlist = Waitlist(10)
+        waitlist.add("a")
+        waitlist.add("b")
+        waitlist.add("a")
+        self.assertEqual(list(waitlist), ["a", "b"])
+        self.assertEqual(waitlist.peek(), "a")
+        self.assertEqual(waitlist.position("b"), 2)
+
+    def test_leaving_and_rejoining_goes_to_the_back(self):
+        waitlist = Waitlist(10)
+        for student in "abc":
+            waitlist.add(student)
+        waitlist.discard("a")
+        waitlist.add("a")
+        self.assertEqual(list(waitlist), ["b", "c", "a"])
+        self.assertEqual(len(waitlist), 3)
+        self.assertIsNone(waitlist.position("d"))
+
+    def test_is_full(self):
+        waitlist = Waitlist(2)
+        waitlist.add("a")
+        self.assertFalse(waitlist.is_full())
+        waitlist.add("b")
+        self.assertTrue(waitlist.is_full())
+
+
+class PromotionTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "data.json")
+        self.system = self.start()
+        self.service = RegistrationService(self.system, checkpoints=False)
+        self.course = self.add_course("CS101", "MWF 10-11", 1)
+        self.students = [self.add_student(f"S00{n}") for n in range(1, 4)]
+
+    def start(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            system = RegistrationSystem(JsonStorage(self.path), sample_data=False)
+        self.addCleanup(system.storage.close)
+        return system
+
+    def add_course(self, course_id, schedule, capacity):
+        course = Course(course_id, course_id, "Dr. Smith", schedule, capacity)
+        self.system.add_course(course)
+        self.system.record("create_course", course_id, course_id, "Dr. Smith", schedule, capacity)
+        return course
+
+    def add_student(self, student_id):
+        student = Student(student_id.lower(), "secret", student_id)
+        self.system.add_student(student)
+        self.system.record("add_student", student.get_username(), "secret", student_id)
+        return student
+
+    def test_drop_promotes_the_front_of_the_waitlist(self):
+        first, second, third = self.students
+        self.assertEqual(self.service.register("S001", "CS101"), OK)
+        self.assertEqual(self.service.register("S002", "CS101"), COURSE_FULL)
+        self.assertEqual(self.service.join_waitlist("S002", "CS101"), OK)
+        self.assertEqual(self.service.join_waitlist("S003", "CS101"), OK)
+
+        self.assertEqual(self.service.drop("S001", "CS101"), OK)
+        self.assertEqual(list(self.course.get_enrolled_students()), [second])
+        self.assertEqual(list(self.course.get_waitlist()), [third])
+        self.assertNotIn(self.course, second.waitlisted_courses)
+
+    def test_promotion_is_recorded(self):
+        self.service.register("S001", "CS101")
+        self.service.join_waitlist("S002", "CS101")
+        self.service.drop("S001", "CS101")
+        self.system.storage.close()
+
+        restarted = self.start()
+        course = restarted.find_course_by_id("CS101")
+        self.assertEqual([s.get_user_id() for s in course.get_enrolled_students()], ["S002"])
+        self.assertEqual(len(course.get_waitlist()), 0)
+
+    def test_conflicting_student_is_skipped(self):
+        first, second, third = self.students
+        self.add_course("MATH201", "MWF 10-11", 5)
+        self.service.register("S001", "CS101")
+        self.service.join_waitlist("S002", "CS101")
+        self.service.join_waitlist("S003", "CS101")
+        # S002 now meets at the same time elsewhere, so cannot take the seat.
+        self.assertEqual(self.service.register("S002", "MATH201"), OK)
+
+        self.service.drop("S001", "CS101")
+        self.assertEqual(list(self.course.get_enrolled_students()), [third])
+        self.assertEqual(len(self.course.get_waitlist()), 0)
+        self.assertNotIn(self.course, second.waitlisted_courses)
+
+    def test_free_seat_goes_to_the_waitlist_first(self):
+        first, second, third = self.students
+        self.service.register("S001", "CS101")
+        self.service.join_waitlist("S002", "CS101")
+        # Free the seat without promoting anyone.
+        first.unenroll(self.course)
+        self.assertEqual(self.service.register("S003", "CS101"), COURSE_FULL)
+        self.assertEqual(self.service.join_waitlist("S003", "CS101"), OK)
+        self.assertEqual(self.service.register("S002", "CS101"), OK)
+        self.assertEqual(list(self.course.get_waitlist()), [third])
+
+    def test_no_waitlist_while_seats_are_open(self):
+        self.assertEqual(self.service.join_waitlist("S001", "CS101"), SEATS_AVAILABLE)
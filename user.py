@@ -3,16 +3,23 @@ user.py
 Defines the `User` base class which represents a person that can
 authenticate in the system (either a Student or Admin).
 
-`User` stores basic identity information (username, password, user_id)
-and provides simple authentication and accessor methods used by
-subclasses and other modules.
+`User` stores basic identity information (username, password hash,
+user_id) and provides simple authentication and accessor methods used by
+subclasses and other modules. Passwords are hashed with `credentials.py`.
+Users are slotted (no per-instance `__dict__`) because a large registry
+holds hundreds of thousands of them.
 """
 
+from credentials import hash_password, is_hashed, verify_password
+
+
 class User:
     # OOP - Encapsulation:
     # User stores its data (username, password, user_id) and exposes
     # accessor methods (get_user_id, get_username) so internal state is
     # not manipulated directly by external code.
+    __slots__ = ("username", "password", "user_id")
+
     def __init__(self, username, password, user_id):
         self.username = username
         self.password = password
@@ -22,7 +29,15 @@ class User:
         # OOP - Polymorphism:
         # `login` is defined here on the base `User` class and is used
         # polymorphically for both `Admin` and `Student` instances.
-        return self.username == input_username and self.password == input_password
+        return self.username == input_username and verify_password(input_password, self.password)
+
+    # Replace a plaintext password (from an old data file) with its hash.
+    # Returns True if anything changed.
+    def migrate_password(self):
+        if is_hashed(self.password):
+            return False
+        self.password = hash_password(self.password)
+        return True
 
     def logout(self):
         print(f"Logging out... Goodbye, {self.username}!")
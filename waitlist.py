@@ -0,0 +1,88 @@
+"""
+waitlist.py
+Defines `Waitlist`, the first-in first-out queue of students waiting for
+a seat in a full course.
+
+Students join at the back and are promoted from the front. A student can
+also leave from anywhere in the queue. That removal only forgets the
+student's ticket. The queue entry stays behind and is skipped when it
+reaches the front. Joining, leaving and finding the next student all
+take amortised constant time, whatever the length of the queue.
+"""
+
+from collections import deque
+
+
+class Waitlist:
+    # OOP - Encapsulation:
+    # The queue of (ticket, student) entries and the ticket of each waiting
+    # student are private. A queue entry is live only while its ticket
+    # still matches, so a student who leaves and rejoins goes to the back.
+    __slots__ = ("max_size", "_queue", "_tickets", "_next_ticket")
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        # Most courses never have a waitlist, so the deque (which allocates
+        # a block of slots up front) is only created by the first add.
+        self._queue = ()
+        self._tickets = {}
+        self._next_ticket = 0
+
+    # Append `student` (no size check; callers check is_full first).
+    def add(self, student):
+        if student in self._tickets:
+            return
+        if not self._queue:
+            self._queue = deque()
+        self._tickets[student] = self._next_ticket
+        self._queue.append((self._next_ticket, student))
+        self._next_ticket += 1
+
+    def discard(self, student):
+        if self._tickets.pop(student, None) is None:
+            return
+        # Keep dead entries from piling up when many students leave.
+        if len(self._queue) > 2 * len(self._tickets) + 32:
+            self._queue = deque(entry for entry in self._queue if self._is_live(entry))
+
+    # The student at the front of the queue, or None.
+    def peek(self):
+        queue = self._queue
+        while queue:
+            if self._is_live(queue[0]):
+                return queue[0][1]
+            queue.popleft()
+        return None
+
+    # 1-based place of `student` in the queue, or None.
+    def position(self, student):
+        for place, waiting in enumerate(self, 1):
+            if waiting is student:
+                return place
+        return None
+
+    def is_full(self):
+        return len(self._tickets) >= self.max_size
+
+    def clear(self):
+        self._queue = ()
+        self._tickets.clear()
+
+    def _is_live(self, entry):
+        ticket, student = entry
+        return self._tickets.get(student) == ticket
+
+    def __contains__(self, student):
+        return student in self._tickets
+
+    def __iter__(self):
+        return (student for ticket, student in list(self._queue) if self._tickets.get(student) == ticket)
+
+    def __len__(self):
+        return len(self._tickets)
+
+    def __bool__(self):
+        return bool(self._tickets)
+
+    def __repr__(self):
+        return f"Waitlist({list(self)!r}, max_size={self.max_size})"